@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for ConcurrentTodoManager
+
+Runs the same read-only workload on several threads twice: once with every
+read serialized behind one exclusive lock, and once through
+ConcurrentTodoManager, whose readers share its lock. Concurrent reads
+should never be slower than serialized ones; the script exits non-zero
+when they are by more than --tolerance. A mixed read/write workload's
+throughput is reported as well.
+
+Usage:
+    python benchmarks/bench_concurrency.py
+    python benchmarks/bench_concurrency.py --threads 16 --todos 50000 --output concurrency.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from concurrent_manager import ConcurrentTodoManager
+from todo_manager import TodoManager
+
+PRIORITIES = ["high", "medium", "low"]
+TAGS = ["work", "home"]
+
+
+def fill(manager, count):
+    """Adds count synthetic todos to manager."""
+    manager.add_many({"task": f"Task {i}", "priority": PRIORITIES[i % 3], "tags": [TAGS[i % 2]]}
+                     for i in range(count))
+
+
+def read(manager, rng):
+    """Runs one read operation picked at random."""
+    roll = rng.random()
+    if roll < 0.4:
+        manager.search_todos(f"task {rng.randrange(100)}")
+    elif roll < 0.8:
+        list(manager.query(tag=rng.choice(TAGS), status="pending", limit=20))
+    else:
+        manager.get_todo_by_id(rng.randrange(1, 100))
+
+
+def mixed(manager, rng, seed, i):
+    """Runs one operation of a workload that is two-thirds reads."""
+    if rng.random() < 0.33:
+        manager.add_todo(f"Task {seed}-{i}", priority=rng.choice(PRIORITIES), tags=[rng.choice(TAGS)])
+    else:
+        read(manager, rng)
+
+
+def run_threads(threads, operations, step):
+    """Calls step(rng, seed, i) operations times on each of threads threads and returns the seconds taken."""
+    errors = []
+
+    def work(seed):
+        rng = random.Random(seed)
+        try:
+            for i in range(operations):
+                step(rng, seed, i)
+        except Exception as e:  # Re-raised below so a failing run never reports a time
+            errors.append(e)
+
+    workers = [threading.Thread(target=work, args=(seed,)) for seed in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare concurrent and serialized reads")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--operations", type=int, default=1500, help="Operations per thread")
+    parser.add_argument("--todos", type=int, default=10_000, help="Todos loaded before timing")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed slowdown of concurrent over serialized reads (default 10%%)")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+    total = args.threads * args.operations
+
+    plain, lock = TodoManager(), threading.Lock()
+    fill(plain, args.todos)
+
+    def serialized(rng, seed, i):
+        with lock:
+            read(plain, rng)
+
+    concurrent = ConcurrentTodoManager()
+    fill(concurrent, args.todos)
+    results = {
+        "threads": args.threads,
+        "serialized_reads_s": run_threads(args.threads, args.operations, serialized),
+        "concurrent_reads_s": run_threads(args.threads, args.operations,
+                                          lambda rng, seed, i: read(concurrent, rng)),
+        "mixed_s": run_threads(args.threads, args.operations, lambda rng, seed, i: mixed(concurrent, rng, seed, i)),
+    }
+    concurrent.check_indexes()
+
+    for name, label in (("serialized_reads_s", "serialized reads"), ("concurrent_reads_s", "concurrent reads"),
+                        ("mixed_s", "mixed workload")):
+        elapsed = results[name]
+        print(f"{label:<18} {total} operations on {args.threads} threads in {elapsed:.2f}s "
+              f"({total / elapsed:.0f} ops/s)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    slowdown = results["concurrent_reads_s"] / results["serialized_reads_s"] - 1
+    if slowdown > args.tolerance:
+        print(f"REGRESSION: concurrent reads are {slowdown:.0%} slower than serialized reads")
+        sys.exit(1)
+    print("Concurrent reads are no slower than serialized reads.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: bytes per todo for the legacy dict layout versus TodoRecord
+
+Besides the stored todos alone, rows with the text index and with a full
+TodoManager show what the indexes add on top of the records.
+
+Usage: python benchmarks/bench_memory.py [--sizes 100000 1000000]
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from text_index import TextIndex
+from todo_manager import TodoManager
+from todo_record import TodoRecord, intern_tags, now_timestamp
+
+PRIORITIES = ["high", "medium", "low"]
+TAGS = [["work"], ["home", "urgent"], []]
+
+
+def legacy_todo(i):
+    """Builds a todo the way TodoManager stored it before TodoRecord."""
+    return {
+        "id": i,
+        "task": f"Task number {i}",
+        "description": "",
+        "status": "pending",
+        "priority": PRIORITIES[i % 3],
+        "tags": list(TAGS[i % 3]),
+        "created_at": datetime.now().isoformat()
+    }
+
+
+def record_todo(i):
+    """Builds the same todo as a compact TodoRecord."""
+    return TodoRecord(i, f"Task number {i}", "", "pending", PRIORITIES[i % 3],
+                      intern_tags(TAGS[i % 3]), now_timestamp())
+
+
+def measure(build, size):
+    """Returns the bytes allocated per item by build() for size items."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(size)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return (after - before) / size
+
+
+def build_store(factory):
+    return lambda size: {i: factory(i) for i in range(1, size + 1)}
+
+
+def build_indexed(size):
+    """Builds TodoRecords plus the text index TodoManager keeps over them."""
+    todos, index = {}, TextIndex()
+    for i in range(1, size + 1):
+        todos[i] = record_todo(i)
+        index.add(i, todos[i].task)
+    return todos, index
+
+
+def build_manager(size):
+    manager = TodoManager()
+    for i in range(size):
+        manager.add_todo(f"Task number {i}", priority=PRIORITIES[i % 3], tags=TAGS[i % 3])
+    return manager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--skip-manager", action="store_true",
+                        help="Only measure the stored todos, not a full TodoManager with its indexes")
+    args = parser.parse_args()
+
+    layouts = {
+        "legacy dict": build_store(legacy_todo),
+        "TodoRecord": build_store(record_todo),
+        "TodoRecord + text index": build_indexed,
+    }
+    if not args.skip_manager:
+        layouts["TodoManager"] = build_manager
+
+    print(f"{'bytes per todo':<24}" + "".join(f"{size:>12}" for size in args.sizes))
+    for name, build in layouts.items():
+        print(f"{name:<24}" + "".join(f"{measure(build, size):>10.0f} B" for size in args.sizes))
+
+
+if __name__ == "__main__":
+    main()
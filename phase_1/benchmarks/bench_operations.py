@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Operation benchmark for TodoManager at growing collection sizes
+
+Fills a TodoManager with synthetic todos for each size and times the core
+operations, reporting ops/s, p50/p99 latency and peak memory. Each size runs
+in its own subprocess so peak memory is measured per size.
+
+Usage:
+    python benchmarks/bench_operations.py --output results.json
+    python benchmarks/bench_operations.py --sizes 1000 10000 --baseline results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from todo_manager import TodoManager
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+PRIORITIES = ["high", "medium", "low"]
+WORDS = ["deploy", "review", "write", "plan", "fix", "test", "call", "buy", "clean", "read"]
+TAGS = ["work", "home", "urgent", "later"]
+# Operations over the whole collection are sampled less often than point operations
+POINT_SAMPLES = 10_000
+BULK_SAMPLES = 30
+
+
+def percentile(sorted_values, fraction):
+    """Returns the value at the given fraction of a sorted list."""
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies_ns):
+    """Turns raw per-call latencies into ops/s and percentiles."""
+    latencies_ns.sort()
+    total = sum(latencies_ns)
+    return {
+        "samples": len(latencies_ns),
+        "ops_per_sec": len(latencies_ns) / (total / 1e9) if total else float('inf'),
+        "p50_us": percentile(latencies_ns, 0.50) / 1000,
+        "p99_us": percentile(latencies_ns, 0.99) / 1000,
+    }
+
+
+def timed(calls):
+    """Runs each zero-argument callable once and returns its latency in nanoseconds."""
+    clock = time.perf_counter_ns
+    latencies = []
+    for call in calls:
+        start = clock()
+        call()
+        latencies.append(clock() - start)
+    return latencies
+
+
+def peak_memory_bytes():
+    """Returns the peak resident set size of this process, or None where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_size(size, seed=42):
+    """Benchmarks every operation at one collection size."""
+    rng = random.Random(seed)
+    manager = TodoManager()
+    results = {}
+
+    adds = []
+    for i in range(size):
+        words = rng.sample(WORDS, 2)
+        adds.append(lambda i=i, words=words: manager.add_todo(
+            f"{words[0].title()} item {i}", f"Remember to {words[1]}",
+            rng.choice(PRIORITIES), [rng.choice(TAGS)]))
+    results["add_todo"] = summarize(timed(adds))
+
+    point_samples = min(POINT_SAMPLES, size)
+    ids = rng.sample(range(1, size + 1), point_samples)
+    results["get_todo_by_id"] = summarize(timed(lambda todo_id=todo_id: manager.get_todo_by_id(todo_id)
+                                                for todo_id in ids))
+    results["complete_todo"] = summarize(timed(lambda todo_id=todo_id: manager.complete_todo(todo_id)
+                                               for todo_id in ids))
+
+    bulk_samples = BULK_SAMPLES
+    results["search_todos"] = summarize(timed(lambda: manager.search_todos(rng.choice(WORDS))
+                                              for _ in range(bulk_samples)))
+    results["filter_todos"] = summarize(timed(lambda: manager.filter_todos("tag", rng.choice(TAGS))
+                                              for _ in range(bulk_samples)))
+    results["sort_todos"] = summarize(timed(lambda: manager.sort_todos(rng.choice(["priority", "id"]))
+                                            for _ in range(bulk_samples)))
+    return {"operations": results, "peak_memory_bytes": peak_memory_bytes()}
+
+
+def run_in_subprocess(size):
+    """Runs one size in a fresh interpreter so its peak memory is not mixed with other sizes."""
+    output = subprocess.run([sys.executable, __file__, "--worker", str(size)],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def find_regressions(results, baseline, threshold):
+    """Lists operations whose p50 latency grew by more than threshold compared with the baseline."""
+    regressions = []
+    for size, current in results["sizes"].items():
+        previous = baseline.get("sizes", {}).get(size)
+        if previous is None:
+            continue
+        for operation, stats in current["operations"].items():
+            before = previous["operations"].get(operation)
+            if before and before["p50_us"] and stats["p50_us"] > before["p50_us"] * (1 + threshold):
+                regressions.append((size, operation, before["p50_us"], stats["p50_us"]))
+    return regressions
+
+
+def print_report(results):
+    print(f"{'size':>9} {'operation':<16} {'ops/s':>12} {'p50 (us)':>10} {'p99 (us)':>10}")
+    for size, current in results["sizes"].items():
+        for operation, stats in current["operations"].items():
+            print(f"{size:>9} {operation:<16} {stats['ops_per_sec']:>12.0f} "
+                  f"{stats['p50_us']:>10.1f} {stats['p99_us']:>10.1f}")
+        peak = current["peak_memory_bytes"]
+        if peak is not None:
+            print(f"{size:>9} {'peak memory':<16} {peak / 2 ** 20:>10.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TodoManager operations at growing sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against results saved earlier with --output")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative p50 slowdown that counts as a regression (default 0.25)")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        print(json.dumps(run_size(args.worker)))
+        return
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sizes": {},
+    }
+    for size in args.sizes:
+        print(f"Benchmarking {size} todos...", file=sys.stderr)
+        results["sizes"][str(size)] = run_in_subprocess(size)
+
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for size, operation, before, after in regressions:
+            print(f"REGRESSION {operation} at {size} todos: p50 {before:.1f}us -> {after:.1f}us")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the todo CLI
+
+Runs short CLI commands in fresh interpreters and reports the median wall
+time of each, and how much of it comes on top of a bare interpreter. The
+fast path's total cold start, interpreter included, is checked against a
+startup budget.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 30 --budget-ms 50 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Name -> (arguments after the interpreter, extra environment)
+SCENARIOS = {
+    "import todo_manager": (["-c", "import todo_manager"], {}),
+    "fast path: complete": ([os.path.join(SRC, "fast_cli.py"), "complete", "1"], {"TODO_PLAIN": "1"}),
+    "typer, plain: list": ([os.path.join(SRC, "fast_cli.py"), "list"], {"TODO_PLAIN": "1"}),
+    "typer, rich: list": ([os.path.join(SRC, "fast_cli.py"), "list"], {"TODO_PLAIN": "0"}),
+}
+
+
+def median_ms(args, env, runs):
+    """Returns the median wall time of running the interpreter with args, in milliseconds."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, env=env, cwd=SRC, check=False,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI cold-start time")
+    parser.add_argument("--runs", type=int, default=15, help="Runs per scenario (the median is reported)")
+    parser.add_argument("--budget-ms", type=float, default=50.0,
+                        help="Allowed fast-path cold start, interpreter included (default 50)")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as store:
+        env = dict(os.environ, TODO_STORE=store, PYTHONPATH=SRC)
+        env.pop("TODO_STATS", None)
+        # Installed CLIs run from cached bytecode, so let the warm-up run write it
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        # One todo so that the commands have something to do; also warms the bytecode cache
+        subprocess.run([sys.executable, os.path.join(SRC, "fast_cli.py"), "add", "Benchmark todo"],
+                       env=dict(env, TODO_PLAIN="1"), check=True, stdout=subprocess.DEVNULL)
+
+        baseline = median_ms(["-c", "pass"], env, args.runs)
+        results = {"python": sys.version.split()[0], "interpreter_ms": baseline,
+                   "budget_ms": args.budget_ms, "scenarios": {}}
+        print(f"{'bare interpreter':<24} {baseline:8.1f} ms")
+        for name, (command, extra_env) in SCENARIOS.items():
+            total = median_ms(command, dict(env, **extra_env), args.runs)
+            results["scenarios"][name] = {"total_ms": total, "overhead_ms": total - baseline}
+            print(f"{name:<24} {total:8.1f} ms  (+{total - baseline:.1f} ms)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    fast = results["scenarios"]["fast path: complete"]["total_ms"]
+    if fast > args.budget_ms:
+        print(f"OVER BUDGET: the fast path takes {fast:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        sys.exit(1)
+    print(f"Fast path within the {args.budget_ms:.0f} ms budget.")
+
+
+if __name__ == "__main__":
+    main()
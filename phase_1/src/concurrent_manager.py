@@ -0,0 +1,167 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterator, Optional
+from todo_manager import TodoManager
+from todo_record import TodoRecord
+from todo_views import TodoSequence
+
+
+class RWLock:
+    """Many-readers/single-writer lock that prefers waiting writers.
+
+    Both sides are reentrant for the thread holding them, and the writer
+    may also take the read side, so locked methods can call each other.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None  # Ident of the thread holding the write side
+        self._write_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def _read_depth(self) -> int:
+        return getattr(self._local, "depth", 0)
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """Holds the lock for reading."""
+        me = threading.get_ident()
+        if self._writer == me or self._read_depth():
+            # Already inside the lock on this thread; waiting here would deadlock
+            self._local.depth = self._read_depth() + 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+
+        with self._condition:
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        self._local.depth = 1
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """Holds the lock exclusively."""
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._write_depth += 1
+            else:
+                if self._read_depth():
+                    raise RuntimeError("Cannot upgrade a read lock to a write lock")
+                self._waiting_writers += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._condition.wait()
+                finally:
+                    self._waiting_writers -= 1
+                self._writer = me
+                self._write_depth = 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._write_depth -= 1
+                if not self._write_depth:
+                    self._writer = None
+                    self._condition.notify_all()
+
+
+def _reads(method: Callable) -> Callable:
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock.read():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+def _collects(method: Callable) -> Callable:
+    """Runs a lazy TodoManager method under the read lock and returns an iterator over its results."""
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock.read():
+            return iter(list(method(self, *args, **kwargs)))
+    return locked
+
+
+def _writes(method: Callable) -> Callable:
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock.write():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+class ConcurrentTodoManager(TodoManager):
+    """TodoManager that can be shared between threads.
+
+    Reads run in parallel under a shared lock and mutations, including ID
+    allocation, run one at a time under the exclusive side. Results that
+    would otherwise stay tied to the live store (list_todos, query and the
+    iter_* methods) are materialized while the lock is held.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._lock = RWLock()
+        super().__init__(*args, **kwargs)
+
+    iter_todos = _collects(TodoManager.iter_todos)
+    iter_filter = _collects(TodoManager.iter_filter)
+    iter_sorted = _collects(TodoManager.iter_sorted)
+    iter_created = _collects(TodoManager.iter_created)
+    query = _collects(TodoManager.query)
+
+    get_next_id = _reads(TodoManager.get_next_id)
+    get_todo_by_id = _reads(TodoManager.get_todo_by_id)
+    filter_todos = _reads(TodoManager.filter_todos)
+    sort_todos = _reads(TodoManager.sort_todos)
+    top_n = _reads(TodoManager.top_n)
+    created_between = _reads(TodoManager.created_between)
+    newest = _reads(TodoManager.newest)
+    list_tags = _reads(TodoManager.list_tags)
+    plan_query = _reads(TodoManager.plan_query)
+    snapshot = _reads(TodoManager.snapshot)
+    check_indexes = _reads(TodoManager.check_indexes)
+
+    add_todo = _writes(TodoManager.add_todo)
+    complete_todo = _writes(TodoManager.complete_todo)
+    delete_todo = _writes(TodoManager.delete_todo)
+    update_todo = _writes(TodoManager.update_todo)
+    set_priority = _writes(TodoManager.set_priority)
+    add_tags = _writes(TodoManager.add_tags)
+    add_many = _writes(TodoManager.add_many)
+    complete_many = _writes(TodoManager.complete_many)
+    delete_many = _writes(TodoManager.delete_many)
+    tag_many = _writes(TodoManager.tag_many)
+    rename_tag = _writes(TodoManager.rename_tag)
+    delete_tag = _writes(TodoManager.delete_tag)
+    checkpoint = _writes(TodoManager.checkpoint)
+    close = _writes(TodoManager.close)
+
+    def list_todos(self) -> TodoSequence:
+        """Returns a read-only view of the todos as they were when called."""
+        with self._lock.read():
+            return TodoSequence(dict(self.todos))
+
+    def iter_search(self, keyword: str, mode: str = "and", fuzzy: bool = False,
+                    offset: int = 0, limit: Optional[int] = None) -> Iterator[TodoRecord]:
+        """Searches todos by keyword; see TodoManager.iter_search."""
+        if fuzzy and not self._text_index.fuzzy_enabled:
+            # Building the trigram index mutates shared state
+            with self._lock.write():
+                self._text_index.enable_fuzzy()
+        with self._lock.read():
+            return iter(list(TodoManager.iter_search(self, keyword, mode, fuzzy, offset, limit)))
@@ -0,0 +1,213 @@
+"""
+Todo daemon: one long-running process that owns the TodoManager
+
+The daemon listens on a Unix domain socket and runs CLI commands against a
+single in-memory manager, so commands skip interpreter start-up, imports and
+replaying the store, and in-memory state survives between commands.
+
+Protocol: newline-delimited JSON. A client sends one request per line,
+{"argv": [...], "plain": bool, "width": int or null, "cwd": str or null},
+and runs it in cwd, so relative paths mean what they do to the client. For each request it
+sends any number of {"out": text} and {"err": text} lines followed by
+{"exit": code}. A connection may carry many requests one after another,
+which is the fastest way for scripts to drive the daemon.
+
+This module is imported by the thin client before anything heavy, so the
+server side imports Typer and the CLI only when a daemon starts.
+"""
+import io
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+SOCKET_NAME = "todo.sock"
+# Output is sent to the client in chunks of about this many characters
+CHUNK_SIZE = 64 * 1024
+
+
+def socket_path(store: Optional[str] = None) -> Optional[str]:
+    """Returns where the daemon listens: TODO_SOCKET, else todo.sock in the store directory.
+
+    store defaults to TODO_STORE; None means there is no daemon to talk to.
+    """
+    path = os.environ.get("TODO_SOCKET")
+    if path:
+        return path
+    store = store or os.environ.get("TODO_STORE")
+    return os.path.join(store, SOCKET_NAME) if store else None
+
+
+def _send(connection_file, message: Dict) -> None:
+    connection_file.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b"\n")
+
+
+def forward(argv: List[str], path: Optional[str] = None, plain: bool = True,
+            width: Optional[int] = None) -> Optional[int]:
+    """Runs argv on the daemon, copying its output here, and returns the exit code.
+
+    Returns None when no daemon is listening, so the caller can run the
+    command in-process instead.
+    """
+    path = path or socket_path()
+    if not path or not os.path.exists(path):
+        return None
+    # Imported only when there may be a daemon: commands run in-process never need it
+    import socket
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+    except OSError:
+        # A stale socket file from a daemon that is no longer running
+        client.close()
+        return None
+
+    with client, client.makefile('rwb') as connection:
+        _send(connection, {"argv": argv, "plain": plain, "width": width, "cwd": os.getcwd()})
+        connection.flush()
+        try:
+            for line in connection:
+                message = json.loads(line)
+                if "out" in message:
+                    sys.stdout.write(message["out"])
+                elif "err" in message:
+                    sys.stderr.write(message["err"])
+                else:
+                    sys.stdout.flush()
+                    return message["exit"]
+        except BrokenPipeError:
+            # The reader went away (e.g. piped into head); drop the rest quietly
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+    raise ConnectionError("The todo daemon closed the connection before the command finished")
+
+
+class _Channel(io.TextIOBase):
+    """Text stream that forwards what is written to one output channel of a client."""
+
+    def __init__(self, connection_file, name: str):
+        self._connection = connection_file
+        self._name = name
+        self._buffer: List[str] = []
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return False
+
+    def write(self, text: str) -> int:
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= CHUNK_SIZE:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if self._buffer:
+            _send(self._connection, {self._name: "".join(self._buffer)})
+            self._buffer, self._size = [], 0
+
+
+class TodoDaemon:
+    """Serves CLI commands for one TodoManager over a Unix domain socket.
+
+    Connections are accepted on separate threads, but commands run one at a
+    time: the CLI keeps its output settings in module globals and the
+    standard streams are redirected while a command runs.
+    """
+
+    def __init__(self, manager, path: str):
+        import threading
+        self.manager = manager
+        self.path = path
+        self._lock = threading.Lock()
+        self._server = None
+
+    def execute(self, argv: List[str], plain: bool, width: Optional[int], stdout: _Channel, stderr: _Channel,
+                cwd: Optional[str] = None) -> int:
+        """Runs one command with its output sent to the given channels and returns the exit code.
+
+        With a cwd the command runs in that directory, the client's, and the
+        daemon's own is restored afterwards.
+        """
+        import fast_cli
+        import main as cli
+        with self._lock:
+            streams = sys.stdin, sys.stdout, sys.stderr
+            # No prompts: the daemon has no terminal to ask on
+            sys.stdin, sys.stdout, sys.stderr = io.StringIO(), stdout, stderr
+            directory = os.getcwd()
+            try:
+                if cwd:
+                    os.chdir(cwd)
+                code = fast_cli.run(argv, self.manager, plain)
+                if code is None:
+                    cli.prepare_request(self.manager, plain, width)
+                    try:
+                        cli.app(args=argv, prog_name="todo-cli")
+                        code = 0
+                    except SystemExit as e:
+                        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except Exception as e:
+                print(f"Error: {e}", file=stderr)
+                code = 1
+            finally:
+                os.chdir(directory)
+                sys.stdin, sys.stdout, sys.stderr = streams
+        stdout.flush()
+        stderr.flush()
+        return code
+
+    def serve_forever(self) -> None:
+        """Listens until interrupted, then closes the manager and removes the socket."""
+        import socketserver
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    request = json.loads(line)
+                    stdout, stderr = _Channel(self.wfile, "out"), _Channel(self.wfile, "err")
+                    code = daemon.execute(request["argv"], request.get("plain", True), request.get("width"),
+                                          stdout, stderr, request.get("cwd"))
+                    _send(self.wfile, {"exit": code})
+                    self.wfile.flush()
+
+        if is_listening(self.path):
+            raise RuntimeError(f"A todo daemon is already listening on {self.path}")
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._server = socketserver.ThreadingUnixStreamServer(self.path, Handler)
+        self._server.daemon_threads = True
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.manager.close()
+
+    def shutdown(self) -> None:
+        """Stops serve_forever from another thread."""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+def is_listening(path: str) -> bool:
+    """Returns True if a daemon accepts connections on path."""
+    if not os.path.exists(path):
+        return False
+    import socket
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
@@ -0,0 +1,173 @@
+"""
+Fast start for the todo CLI
+
+When a todo daemon is running, main() forwards the command to it and is
+done. Otherwise, scripts that call the CLI thousands of times mostly run a
+few mutations with positional arguments only; main() answers those
+directly with plain output, loading neither Typer nor Rich, and hands
+everything else (options, --help, malformed input, interactive terminals)
+to the full CLI in main.py, which also produces the proper usage errors.
+"""
+import atexit
+import os
+import sys
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+from plain_output import wants_plain_output
+from daemon import SOCKET_NAME, forward
+
+if TYPE_CHECKING:
+    from todo_manager import TodoManager
+
+
+def open_manager(storage_path: Optional[str], stats_path: Optional[str], **options) -> "TodoManager":
+    """Creates a TodoManager on the given storage, recording stats to stats_path if set."""
+    # Imported here so that commands forwarded to a daemon never load the manager
+    from todo_manager import TodoManager
+    manager = TodoManager(storage_path=storage_path, **options)
+    if stats_path is not None:
+        atexit.register(manager.enable_instrumentation().merge_into, stats_path)
+    return manager
+
+
+def _add(manager: "TodoManager", args: List[str]) -> int:
+    todo = manager.add_todo(*args)
+    print(f"Added todo: {todo['task']} (ID: {todo['id']})")
+    print(f"Priority: {todo['priority']}")
+    if todo['description']:
+        print(f"Description: {todo['description']}")
+    return 0
+
+
+def _complete(manager: "TodoManager", args: List[str]) -> int:
+    result = manager.complete_many(int(arg) for arg in args)
+    for todo_id in result.succeeded:
+        print(f"Marked todo {todo_id} as completed")
+    for _, error in result.failed:
+        print(f"Error: {error}")
+    return 0 if result.ok else 1
+
+
+def _delete(manager: "TodoManager", args: List[str]) -> int:
+    todo_id = int(args[0])
+    manager.delete_todo(todo_id)
+    print(f"Deleted todo {todo_id}")
+    return 0
+
+
+def _priority(manager: "TodoManager", args: List[str]) -> int:
+    todo_id, level = int(args[0]), args[1].lower()
+    manager.set_priority(todo_id, level)
+    print(f"Set priority to {level} for todo {todo_id}")
+    return 0
+
+
+def _tag(manager: "TodoManager", args: List[str]) -> int:
+    todo_id = int(args[0])
+    manager.add_tags(todo_id, args[1:])
+    print(f"Added tags {', '.join(args[1:])} to todo {todo_id}")
+    return 0
+
+
+# Command -> (handler returning the exit code, allowed argument counts, positions holding IDs)
+COMMANDS: Dict[str, Tuple[Callable[["TodoManager", List[str]], int], range, slice]] = {
+    "add": (_add, range(1, 3), slice(0)),
+    "complete": (_complete, range(1, sys.maxsize), slice(None)),
+    "delete": (_delete, range(1, 2), slice(None)),
+    "priority": (_priority, range(2, 3), slice(1)),
+    "tag": (_tag, range(2, sys.maxsize), slice(1)),
+}
+
+
+def is_fast(argv: List[str], plain: bool) -> bool:
+    """Returns True when argv is a command this module can run: positional arguments only, plain output."""
+    if not argv or argv[0] not in COMMANDS or not plain:
+        return False
+    if os.environ.get("TODO_FORMAT", "table").lower() != "table":
+        # Machine-readable output is produced by the full CLI
+        return False
+    _, counts, id_positions = COMMANDS[argv[0]]
+    args = argv[1:]
+    # Checked up front so that a command either runs here completely or not at all
+    return (len(args) in counts and not any(arg.startswith("-") for arg in args)
+            and all(arg.isdigit() for arg in args[id_positions]))
+
+
+def run(argv: List[str], manager: Optional["TodoManager"] = None, plain: Optional[bool] = None) -> Optional[int]:
+    """Runs a fast command and returns its exit code, or None if the full CLI must handle argv.
+
+    Without a manager one is opened on the configured store. plain defaults
+    to wants_plain_output(); the daemon passes the client's setting instead.
+    """
+    if not is_fast(argv, wants_plain_output() if plain is None else plain):
+        return None
+    if manager is None:
+        from persistence import StoreLockedError
+        try:
+            manager = open_manager(os.environ.get("TODO_STORE"), os.environ.get("TODO_STATS"))
+        except StoreLockedError as e:
+            print(f"Error: {e}")
+            return 1
+    try:
+        return COMMANDS[argv[0]][0](manager, argv[1:])
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+
+def split_store(argv: List[str]) -> Tuple[List[str], Optional[str]]:
+    """Takes a --store option out of argv, returning the remaining arguments and the store (or None).
+
+    Only the global options before the command are searched: --store after
+    it is an error the full CLI reports, not an option to strip.
+    """
+    index = 0
+    while index < len(argv) and argv[index].startswith("-"):
+        arg = argv[index]
+        if arg == "--store" and index + 1 < len(argv):
+            return argv[:index] + argv[index + 2:], argv[index + 1]
+        if arg.startswith("--store="):
+            return argv[:index] + argv[index + 1:], arg[len("--store="):]
+        # The only other global option with a value
+        index += 2 if arg == "--format" else 1
+    return argv, None
+
+
+def forward_to_daemon(argv: List[str]) -> Optional[int]:
+    """Runs argv on a running daemon and returns the exit code, or None to run it in this process.
+
+    A command given an explicit --store goes to the daemon listening in that
+    store, if there is one, so that two processes never write the same log.
+    """
+    argv, store = split_store(argv)
+    if not argv or argv[0] == "daemon":
+        # The interactive menu and starting a daemon always run here
+        return None
+    output_format = os.environ.get("TODO_FORMAT")
+    if output_format and "--format" not in argv:
+        # The daemon does not see this process's environment
+        argv = ["--format", output_format] + argv
+    plain = wants_plain_output()
+    if plain:
+        width = None
+    else:
+        import shutil
+        width = shutil.get_terminal_size().columns
+    path = None if store is None else os.path.join(store, SOCKET_NAME)
+    return forward(argv, path=path, plain=plain, width=width)
+
+
+def main():
+    """Console entry point: a running daemon first, then the fast path, then the full Typer CLI."""
+    code = forward_to_daemon(sys.argv[1:])
+    if code is None:
+        code = run(sys.argv[1:])
+    if code is None:
+        import main as cli
+        # The daemon was asked above
+        cli.main(forward=False)
+    else:
+        sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from typing import Dict, List, Set, Tuple
+
+
+def trigrams(term: str) -> Set[str]:
+    """Returns the padded character trigrams of a term."""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Trigram index over vocabulary terms for typo-tolerant lookups."""
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = {}  # trigram -> terms containing it
+        self._term_grams: Dict[str, Set[str]] = {}
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._term_grams
+
+    def add(self, term: str) -> None:
+        """Adds a vocabulary term to the index."""
+        if term in self._term_grams:
+            return
+        grams = trigrams(term)
+        self._term_grams[term] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(term)
+
+    def remove(self, term: str) -> None:
+        """Removes a vocabulary term from the index."""
+        grams = self._term_grams.pop(term, None)
+        if grams is None:
+            return
+        for gram in grams:
+            terms = self._postings[gram]
+            terms.discard(term)
+            if not terms:
+                del self._postings[gram]
+
+    def similar(self, term: str, threshold: float = 0.3) -> List[Tuple[str, float]]:
+        """Returns (term, similarity) pairs for indexed terms close to term, best first.
+
+        Similarity is the Jaccard coefficient of the two trigram sets.
+        """
+        grams = trigrams(term)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._postings.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        matches = []
+        for candidate, overlap in shared.items():
+            score = overlap / (len(grams) + len(self._term_grams[candidate]) - overlap)
+            if score >= threshold:
+                matches.append((candidate, score))
+        matches.sort(key=lambda item: (-item[1], item[0]))
+        return matches
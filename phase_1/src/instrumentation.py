@@ -0,0 +1,235 @@
+import json
+import os
+import threading
+from collections import deque
+from collections.abc import Iterator as IteratorABC, Sequence
+from functools import wraps
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+# Public TodoManager methods that are timed when instrumentation is enabled
+INSTRUMENTED_METHODS = [
+    "add_todo", "list_todos", "snapshot", "complete_todo", "delete_todo", "update_todo",
+    "set_priority", "add_tags", "list_tags", "rename_tag", "delete_tag",
+    "add_many", "complete_many", "delete_many", "tag_many",
+    "get_todo_by_id", "iter_todos", "iter_search", "iter_filter", "iter_sorted",
+    "iter_created", "search_todos", "filter_todos", "sort_todos", "top_n", "created_between", "newest", "query", "checkpoint",
+]
+
+# Latency samples kept per operation for the percentiles (the most recent ones win)
+MAX_SAMPLES = 1000
+
+
+class ScanCounter(threading.local):
+    """The todo IDs the instrumented call running on this thread has examined.
+
+    Indexes and scans add the candidates they touch, but only while active
+    is set, so without instrumentation they pay a single attribute check.
+    """
+
+    active = False
+    scanned = 0
+
+    def add(self, count: int) -> None:
+        if self.active:
+            self.scanned += count
+
+
+scan_counter = ScanCounter()
+
+
+def counted(todo_ids: Iterable[int]) -> Iterable[int]:
+    """Returns todo_ids, counting each ID drawn from it as scanned while a call is instrumented."""
+    if not scan_counter.active:
+        return todo_ids
+    return _counting(todo_ids)
+
+
+def _counting(todo_ids: Iterable[int]) -> Iterator[int]:
+    counter = scan_counter
+    for todo_id in todo_ids:
+        if counter.active:
+            counter.scanned += 1
+        yield todo_id
+
+
+def percentile(sorted_values: List[int], fraction: float) -> int:
+    """Returns the nearest-rank value at the given fraction of a sorted list."""
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class OperationStats:
+    """Call count, latency, items returned (or changed) and todos scanned for one operation."""
+
+    __slots__ = ("calls", "total_ns", "items", "scanned", "samples")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.items = 0
+        self.scanned = 0
+        self.samples: deque = deque(maxlen=MAX_SAMPLES)
+
+    def record(self, elapsed_ns: int, items: int, scanned: int = 0) -> None:
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        self.items += items
+        self.scanned += scanned
+        self.samples.append(elapsed_ns)
+
+    def summary(self) -> Dict[str, float]:
+        samples = sorted(self.samples)
+        return {
+            "calls": self.calls,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / self.calls / 1e3 if self.calls else 0.0,
+            "p50_us": percentile(samples, 0.50) / 1e3 if samples else 0.0,
+            "p99_us": percentile(samples, 0.99) / 1e3 if samples else 0.0,
+            "items": self.items,
+            "scanned": self.scanned,
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "total_ns": self.total_ns, "items": self.items,
+                "scanned": self.scanned, "samples": list(self.samples)}
+
+    def merge_state(self, state: Dict[str, Any]) -> None:
+        self.calls += state["calls"]
+        self.total_ns += state["total_ns"]
+        self.items += state["items"]
+        # Stats files written before scans were counted have no "scanned"
+        self.scanned += state.get("scanned", 0)
+        self.samples.extend(state["samples"])
+
+
+def count_items(result: Any) -> int:
+    """Returns how many todos a method returned or changed.
+
+    This is the size of the result; the todos a method looked at to produce
+    it are counted separately, as scanned (see ScanCounter).
+    """
+    if isinstance(result, Sequence):
+        # Lists and views of todos; a single TodoRecord is a Mapping and counts as one
+        return len(result)
+    if type(result) is int:
+        # Tag operations return the number of todos they changed
+        return result
+    succeeded = getattr(result, "succeeded", None)
+    if succeeded is not None:
+        # BatchResult
+        return len(succeeded) + len(result.failed)
+    # A record or a success flag
+    return 1 if result else 0
+
+
+class Instrumentation:
+    """Per-method call counts, latency percentiles, items returned and todos scanned.
+
+    Methods are timed by wrapping them on a single instance, so objects that
+    are never instrumented run the plain class methods with no overhead.
+    Iterators are timed across their consumption: the latency of an iter_*
+    call is the time spent producing its items, recorded once it is
+    exhausted or closed, excluding the time the caller spends between items.
+    Only the outermost instrumented call is recorded: the iter_search behind
+    search_todos, for one, is part of search_todos's time, items and scans.
+    A call scanning as many todos as there are is a full scan.
+    """
+
+    def __init__(self):
+        self.operations: Dict[str, OperationStats] = {}
+        self._lock = threading.Lock()
+        # How many instrumented calls are running on each thread
+        self._active = threading.local()
+
+    def install(self, target: Any, names: Iterable[str] = INSTRUMENTED_METHODS) -> None:
+        """Replaces the named methods on target with timed wrappers."""
+        for name in names:
+            setattr(target, name, self.wrap(name, getattr(target, name)))
+
+    def wrap(self, name: str, method: Callable) -> Callable:
+        @wraps(method)
+        def timed(*args, **kwargs):
+            if getattr(self._active, "depth", 0):
+                # Called by another instrumented method, which accounts for it
+                return method(*args, **kwargs)
+            start = perf_counter_ns()
+            self._active.depth = 1
+            scan_counter.active, scan_counter.scanned = True, 0
+            try:
+                result = method(*args, **kwargs)
+            except Exception:
+                # Failed calls still count and cost time
+                self.record(name, perf_counter_ns() - start, 0, scan_counter.scanned)
+                raise
+            finally:
+                self._active.depth = 0
+                scan_counter.active = False
+            elapsed = perf_counter_ns() - start
+            if isinstance(result, IteratorABC):
+                return self._timed_iterator(name, result, elapsed, scan_counter.scanned)
+            self.record(name, elapsed, count_items(result), scan_counter.scanned)
+            return result
+        return timed
+
+    def _timed_iterator(self, name: str, iterator: Iterator, elapsed: int, scanned: int) -> Iterator:
+        items = 0
+        try:
+            while True:
+                start = perf_counter_ns()
+                depth = getattr(self._active, "depth", 0)
+                self._active.depth = depth + 1
+                active, before = scan_counter.active, scan_counter.scanned
+                scan_counter.active = True
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self._active.depth = depth
+                    scanned += scan_counter.scanned - before
+                    scan_counter.active = active
+                    elapsed += perf_counter_ns() - start
+                items += 1
+                yield item
+        finally:
+            self.record(name, elapsed, items, scanned)
+
+    def record(self, name: str, elapsed_ns: int, items: int, scanned: int = 0) -> None:
+        with self._lock:
+            stats = self.operations.get(name)
+            if stats is None:
+                stats = self.operations[name] = OperationStats()
+            stats.record(elapsed_ns, items, scanned)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Returns a summary per operation, slowest cumulative time first."""
+        with self._lock:
+            summaries = {name: stats.summary() for name, stats in self.operations.items()}
+        return dict(sorted(summaries.items(), key=lambda item: -item[1]["total_ms"]))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.operations.clear()
+
+    def merge_into(self, path: str) -> None:
+        """Adds the stats collected so far to those saved in a JSON file, so they accumulate across runs."""
+        combined = load_stats(path)
+        with self._lock:
+            for name, stats in self.operations.items():
+                combined.setdefault(name, OperationStats()).merge_state(stats.to_state())
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({name: stats.to_state() for name, stats in combined.items()}, f)
+        os.replace(tmp_path, path)
+
+
+def load_stats(path: str) -> Dict[str, OperationStats]:
+    """Loads stats saved by Instrumentation.merge_into (empty if the file does not exist)."""
+    operations: Dict[str, OperationStats] = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for name, state in json.load(f).items():
+                operations[name] = OperationStats()
+                operations[name].merge_state(state)
+    return operations
@@ -1,18 +1,105 @@
+import builtins
+import json
+import os
+import signal
 import sys
 import typer
-from typing import List
-from rich.console import Console
-from rich.table import Table
-from rich.text import Text
-from rich.panel import Panel
-from rich.prompt import Prompt, IntPrompt
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, TextIO, Tuple
 from todo_manager import TodoManager
+from persistence import StoreLockedError
+from todo_record import to_timestamp
+from instrumentation import load_stats
+from plain_output import PlainConsole, PlainTable, wants_plain_output
+from fast_cli import forward_to_daemon, open_manager
+from output_formats import FORMATS, write_records
+
+# Rich (or its plain stand-ins) is bound by set_output
+console: Any = None
+Table: Any = None
+
+
+def set_output(plain: bool, file: Optional[TextIO] = None, width: Optional[int] = None):
+    """Selects plain text output for pipes and scripts, or Rich for terminals.
+
+    Plain output goes to file, or stdout when it is None. Rich output uses
+    width columns, or the terminal's width when it is None.
+    """
+    global console, Table
+    if plain:
+        console, Table = PlainConsole(file), PlainTable
+        return
+    # Imported here so plain runs never pay for loading Rich
+    from rich.console import Console
+    from rich.table import Table
+    # Create console with force_terminal and force unicode to handle Windows legacy console compatibility
+    console = Console(force_terminal=True, force_interactive=True, width=width)
 
 
-# Create console with force_terminal and force unicode to handle Windows legacy console compatibility
-console = Console(force_terminal=True, force_interactive=True)
+set_output(wants_plain_output())
 app = typer.Typer()
 
+# Todos rendered per table; only one page is held in memory at a time
+PAGE_SIZE = 50
+
+# Directory for durable storage; without one, todos only live as long as the process
+storage_path: Optional[str] = os.environ.get("TODO_STORE")
+
+# Output of commands that produce todos: "table" for people, or a machine-readable format from FORMATS
+output_format: str = "table"
+
+# When set, each run records per-method stats and adds them to this JSON file (see the hidden `stats` command)
+stats_path: Optional[str] = os.environ.get("TODO_STATS")
+
+
+# The manager owned by a running daemon; commands use it instead of opening the store themselves
+shared_manager: Optional[TodoManager] = None
+
+
+def get_manager(**options) -> TodoManager:
+    """Creates the TodoManager for a command, backed by the configured storage if any."""
+    if shared_manager is not None:
+        return shared_manager
+    return open_manager(storage_path, stats_path, **options)
+
+
+def prepare_request(manager: TodoManager, plain: bool, width: Optional[int]):
+    """Resets the per-command settings before the daemon runs a client's command on manager."""
+    global shared_manager, output_format
+    shared_manager = manager
+    output_format = "table"
+    set_output(plain, width=width)
+
+
+@app.callback()
+def configure(store: Optional[Path] = typer.Option(None, "--store", envvar="TODO_STORE", file_okay=False,
+                                                   help="Directory to keep todos in between runs (in-memory only when unset)"),
+              format: str = typer.Option("table", "--format", envvar="TODO_FORMAT",
+                                         help="Output format: table, json, ndjson or csv")):
+    """Manage todos from the command line."""
+    global storage_path, output_format
+    if store is not None:
+        storage_path = str(store)
+    format = format.lower()
+    if format not in FORMATS:
+        raise typer.BadParameter(f"must be one of: {', '.join(FORMATS)}", param_hint="--format")
+    output_format = format
+    if output_format != "table":
+        # stdout carries only the data; messages and errors go to stderr as plain text
+        set_output(plain=True, file=sys.stderr)
+
+
+def machine_output() -> bool:
+    """Returns True when --format asks for json, ndjson or csv instead of tables."""
+    return output_format != "table"
+
+
+def emit(records: Iterable[Mapping], **options):
+    """Streams records to stdout in the --format format, without any table layout."""
+    write_records(records, output_format, sys.stdout, **options)
+
 
 def show_menu():
     """Display the main menu options."""
@@ -31,11 +118,170 @@ def show_menu():
 """
     # Ensure menu_text is always a string and handle potential type issues
     menu_text = str(menu_text)
+    if isinstance(console, PlainConsole):
+        console.print(menu_text)
+        return
+    from rich.panel import Panel
     console.print(Panel(menu_text, title="[bold green]Welcome to Todo Manager[/bold green]", border_style="cyan"))
 
 
+def time_bound(moment: Optional[datetime]) -> Optional[int]:
+    """Converts a --since/--until value into the manager's microsecond timestamps."""
+    return None if moment is None else to_timestamp(moment)
+
+
+def status_text(todo: Mapping) -> str:
+    """Returns the coloured status label for a todo."""
+    return "[green]Completed[/green]" if todo['status'] == 'completed' else "[yellow]Pending[/yellow]"
+
+
+def new_todo_table(with_description: bool = False, show_header: bool = True) -> Table:
+    """Creates an empty todo table, optionally with a description column."""
+    table = Table(show_header=show_header, header_style="bold magenta")
+    table.add_column("ID", style="dim", width=5)
+    table.add_column("Task", min_width=20)
+    if with_description:
+        table.add_column("Description", min_width=20)
+        table.add_column("Priority", width=10)
+        table.add_column("Tags", min_width=15)
+        table.add_column("Status", width=10)
+    else:
+        table.add_column("Status", width=10)
+        table.add_column("Priority", width=10)
+        table.add_column("Tags", min_width=15)
+    return table
+
+
+def add_todo_row(table: Table, todo: Mapping, with_description: bool = False):
+    """Adds one todo as a row matching new_todo_table's columns."""
+    tags = ', '.join(todo['tags']) if todo['tags'] else 'None'
+    if with_description:
+        table.add_row(str(todo['id']), todo['task'], todo['description'], todo['priority'].title(), tags,
+                      status_text(todo))
+    else:
+        table.add_row(str(todo['id']), todo['task'], status_text(todo), todo['priority'].title(), tags)
+
+
+def build_todo_table(todos: Iterable[Mapping], with_description: bool = False,
+                     show_header: bool = True) -> Tuple[Table, int]:
+    """Streams todos from an iterator straight into a table; returns it with its row count."""
+    table = new_todo_table(with_description, show_header)
+    count = 0
+    for todo in todos:
+        add_todo_row(table, todo, with_description)
+        count += 1
+    return table, count
+
+
+def build_status_tables(todos: Iterable[Mapping]) -> Tuple[Optional[Table], Optional[Table]]:
+    """Streams todos from an iterator into separate pending and completed tables.
+
+    A table is None when no todo has that status.
+    """
+    tables: Dict[str, Optional[Table]] = {"pending": None, "completed": None}
+    for todo in todos:
+        table = tables[todo['status']]
+        if table is None:
+            table = tables[todo['status']] = new_todo_table(with_description=True)
+        add_todo_row(table, todo, with_description=True)
+    return tables["pending"], tables["completed"]
+
+
+def print_status_tables(pending_table: Optional[Table], completed_table: Optional[Table]):
+    """Prints the tables from build_status_tables under their headings."""
+    if pending_table is not None:
+        console.print("\n[bold blue]Pending Todos:[/bold blue]")
+        console.print(pending_table)
+    if completed_table is not None:
+        console.print("\n[bold green]Completed Todos:[/bold green]")
+        console.print(completed_table)
+
+
+def is_interactive() -> bool:
+    """Returns True when a user at a terminal can page back and forth through results."""
+    return not isinstance(console, PlainConsole) and sys.stdin.isatty() and sys.stdout.isatty()
+
+
+# Callbacks for show_pages: fetch(offset, limit) returns a fresh iterator over the results,
+# show_page(todos, first) prints one page
+PageFetcher = Callable[[int, Optional[int]], Iterator[Mapping]]
+PagePrinter = Callable[[List[Mapping], bool], None]
+
+
+def show_pages(fetch: PageFetcher, show_page: PagePrinter, page_size: int = PAGE_SIZE,
+               limit: Optional[int] = None) -> bool:
+    """Renders results one page at a time; returns False if there was nothing to show.
+
+    Only the current page is ever materialized, so memory use and the time
+    until the first rows appear do not depend on the number of results. At
+    an interactive terminal the user moves between pages, each fetched
+    again by offset; otherwise the pages are printed one after another from
+    a single pass over the results.
+    """
+    if not is_interactive():
+        stream = fetch(0, limit)
+        shown = 0
+        while True:
+            page = builtins.list(islice(stream, page_size))
+            if not page:
+                return shown > 0
+            show_page(page, shown == 0)
+            shown += len(page)
+
+    from rich.prompt import Prompt
+    offset = 0
+    while True:
+        # One extra todo tells whether there is a next page
+        wanted = page_size + 1 if limit is None else min(page_size + 1, limit - offset)
+        page = builtins.list(fetch(offset, wanted))
+        has_next = len(page) > page_size
+        page = page[:page_size]
+        if not page:
+            return offset > 0
+        show_page(page, offset == 0)
+        if offset == 0 and not has_next:
+            return True
+
+        console.print(f"[dim]Showing {offset + 1}-{offset + len(page)}[/dim]")
+        choices = (["n"] if has_next else []) + (["p"] if offset else []) + ["q"]
+        choice = Prompt.ask("[blue]Next page, previous page or quit?[/blue]", choices=choices, default=choices[0])
+        if choice == "q":
+            return True
+        offset += page_size if choice == "n" else -page_size
+
+
+def todo_table_pages(title: str, with_description: bool = False) -> PagePrinter:
+    """Returns a show_pages printer for a single todo table under title."""
+    def show_page(todos: List[Mapping], first: bool):
+        if first:
+            console.print(title)
+        # Plain output is one continuous table, so only its first page gets a header
+        table, _ = build_todo_table(todos, with_description, show_header=first or not isinstance(console, PlainConsole))
+        console.print(table)
+    return show_page
+
+
+def status_table_pages(title: str) -> PagePrinter:
+    """Returns a show_pages printer that splits each page into pending and completed tables.
+
+    Streamed output gets one continuous table with a status column instead:
+    split page by page, its sections would alternate between the statuses.
+    """
+    continuous = todo_table_pages(title, with_description=True)
+
+    def show_page(todos: List[Mapping], first: bool):
+        if not is_interactive():
+            continuous(todos, first)
+            return
+        if first:
+            console.print(title)
+        print_status_tables(*build_status_tables(todos))
+    return show_page
+
+
 def handle_add_task(manager: TodoManager):
     """Handle adding a new task."""
+    from rich.prompt import Prompt
     console.print("\n[bold yellow]Adding New Task[/bold yellow]")
 
     task = Prompt.ask("[blue]Enter task title[/blue]")
@@ -64,35 +310,14 @@ def handle_add_task(manager: TodoManager):
 
 def handle_view_tasks(manager: TodoManager):
     """Handle viewing all tasks."""
-    todos = manager.list_todos()
-
-    if not todos:
-        console.print("[yellow]No todos found.[/yellow]")
-        return
-
     # Create a unified table as requested
-    console.print("\n[bold blue]All Todos:[/bold blue]")
-    table = Table(show_header=True, header_style="bold magenta")
-    table.add_column("ID", style="dim", width=5)
-    table.add_column("Task", min_width=20)
-    table.add_column("Status", width=10)
-    table.add_column("Priority", width=10)
-    table.add_column("Tags", min_width=15)
-
-    for todo in todos:
-        status_text = "[green]Completed[/green]" if todo['status'] == 'completed' else "[yellow]Pending[/yellow]"
-        table.add_row(
-            str(todo['id']),
-            todo['task'],
-            status_text,
-            todo['priority'].title(),
-            ', '.join(todo['tags']) if todo['tags'] else 'None'
-        )
-    console.print(table)
+    if not show_pages(manager.iter_todos, todo_table_pages("\n[bold blue]All Todos:[/bold blue]")):
+        console.print("[yellow]No todos found.[/yellow]")
 
 
 def handle_complete_task(manager: TodoManager):
     """Handle completing a task."""
+    from rich.prompt import IntPrompt
     try:
         task_id = IntPrompt.ask("[blue]Enter the ID of the task to complete[/blue]")
         success = manager.complete_todo(task_id)
@@ -106,6 +331,7 @@ def handle_complete_task(manager: TodoManager):
 
 def handle_delete_task(manager: TodoManager):
     """Handle deleting a task."""
+    from rich.prompt import IntPrompt
     try:
         task_id = IntPrompt.ask("[blue]Enter the ID of the task to delete[/blue]")
         success = manager.delete_todo(task_id)
@@ -119,6 +345,7 @@ def handle_delete_task(manager: TodoManager):
 
 def handle_update_task(manager: TodoManager):
     """Handle updating a task."""
+    from rich.prompt import IntPrompt, Prompt
     try:
         task_id = IntPrompt.ask("[blue]Enter the ID of the task to update[/blue]")
 
@@ -158,6 +385,7 @@ def handle_update_task(manager: TodoManager):
 
 def handle_search_filter(manager: TodoManager):
     """Handle searching/filtering tasks."""
+    from rich.prompt import IntPrompt, Prompt
     console.print("\n[bold yellow]Search/Filter Options[/bold yellow]")
     console.print("[1] Search by keyword")
     console.print("[2] Filter by status")
@@ -170,157 +398,39 @@ def handle_search_filter(manager: TodoManager):
         if choice == 1:
             # Search by keyword
             keyword = Prompt.ask("[blue]Enter keyword to search[/blue]")
-            results = manager.search_todos(keyword)
-
-            if not results:
+            found = show_pages(lambda offset, limit: manager.iter_search(keyword, offset=offset, limit=limit),
+                               status_table_pages(f"\n[bold blue]Search Results for '{keyword}'[/bold blue]"))
+            if not found:
                 console.print(f"[yellow]No todos found containing '{keyword}'.[/yellow]")
-                return
-
-            console.print(f"\n[bold blue]Search Results for '{keyword}'[/bold blue]")
-            pending_results = [todo for todo in results if todo['status'] == 'pending']
-            completed_results = [todo for todo in results if todo['status'] == 'completed']
-
-            # Create a table for pending search results
-            if pending_results:
-                console.print("\n[bold blue]Pending Todos:[/bold blue]")
-                pending_table = Table(show_header=True, header_style="bold magenta")
-                pending_table.add_column("ID", style="dim", width=5)
-                pending_table.add_column("Task", min_width=20)
-                pending_table.add_column("Description", min_width=20)
-                pending_table.add_column("Priority", width=10)
-                pending_table.add_column("Tags", min_width=15)
-                pending_table.add_column("Status", width=10)
-
-                for todo in pending_results:
-                    pending_table.add_row(
-                        str(todo['id']),
-                        todo['task'],
-                        todo['description'],
-                        todo['priority'].title(),
-                        ', '.join(todo['tags']) if todo['tags'] else 'None',
-                        "[yellow]Pending[/yellow]"
-                    )
-                console.print(pending_table)
-
-            # Create a table for completed search results
-            if completed_results:
-                console.print("\n[bold green]Completed Todos:[/bold green]")
-                completed_table = Table(show_header=True, header_style="bold magenta")
-                completed_table.add_column("ID", style="dim", width=5)
-                completed_table.add_column("Task", min_width=20)
-                completed_table.add_column("Description", min_width=20)
-                completed_table.add_column("Priority", width=10)
-                completed_table.add_column("Tags", min_width=15)
-                completed_table.add_column("Status", width=10)
-
-                for todo in completed_results:
-                    completed_table.add_row(
-                        str(todo['id']),
-                        todo['task'],
-                        todo['description'],
-                        todo['priority'].title(),
-                        ', '.join(todo['tags']) if todo['tags'] else 'None',
-                        "[green]Completed[/green]"
-                    )
-                console.print(completed_table)
-
-        elif choice == 2:
+            return
+
+        if choice == 2:
             # Filter by status
-            status = Prompt.ask(
+            filter_type = "status"
+            value = Prompt.ask(
                 "[blue]Enter status to filter by (pending/completed)[/blue]",
                 choices=["pending", "completed"],
                 default="pending"
             )
-            results = manager.filter_todos("status", status)
-
-            if not results:
-                console.print(f"[yellow]No todos found with status '{status}'.[/yellow]")
-                return
-
-            console.print(f"\n[bold blue]Filtered Results (Status: {status.title()})[/bold blue]")
-            table = Table(show_header=True, header_style="bold magenta")
-            table.add_column("ID", style="dim", width=5)
-            table.add_column("Task", min_width=20)
-            table.add_column("Description", min_width=20)
-            table.add_column("Priority", width=10)
-            table.add_column("Tags", min_width=15)
-            table.add_column("Status", width=10)
-
-            for todo in results:
-                status_text = "[green]Completed[/green]" if todo['status'] == 'completed' else "[yellow]Pending[/yellow]"
-                table.add_row(
-                    str(todo['id']),
-                    todo['task'],
-                    todo['description'],
-                    todo['priority'].title(),
-                    ', '.join(todo['tags']) if todo['tags'] else 'None',
-                    status_text
-                )
-            console.print(table)
-
         elif choice == 3:
             # Filter by priority
-            priority = Prompt.ask(
+            filter_type = "priority"
+            value = Prompt.ask(
                 "[blue]Enter priority to filter by (high/medium/low)[/blue]",
                 choices=["high", "medium", "low"],
                 default="medium"
             )
-            results = manager.filter_todos("priority", priority)
-
-            if not results:
-                console.print(f"[yellow]No todos found with priority '{priority}'.[/yellow]")
-                return
-
-            console.print(f"\n[bold blue]Filtered Results (Priority: {priority.title()})[/bold blue]")
-            table = Table(show_header=True, header_style="bold magenta")
-            table.add_column("ID", style="dim", width=5)
-            table.add_column("Task", min_width=20)
-            table.add_column("Description", min_width=20)
-            table.add_column("Priority", width=10)
-            table.add_column("Tags", min_width=15)
-            table.add_column("Status", width=10)
-
-            for todo in results:
-                status_text = "[green]Completed[/green]" if todo['status'] == 'completed' else "[yellow]Pending[/yellow]"
-                table.add_row(
-                    str(todo['id']),
-                    todo['task'],
-                    todo['description'],
-                    todo['priority'].title(),
-                    ', '.join(todo['tags']) if todo['tags'] else 'None',
-                    status_text
-                )
-            console.print(table)
-
-        elif choice == 4:
+        else:
             # Filter by tag
-            tag = Prompt.ask("[blue]Enter tag to filter by[/blue]")
-            results = manager.filter_todos("tag", tag)
-
-            if not results:
-                console.print(f"[yellow]No todos found with tag '{tag}'.[/yellow]")
-                return
-
-            console.print(f"\n[bold blue]Filtered Results (Tag: {tag})[/bold blue]")
-            table = Table(show_header=True, header_style="bold magenta")
-            table.add_column("ID", style="dim", width=5)
-            table.add_column("Task", min_width=20)
-            table.add_column("Description", min_width=20)
-            table.add_column("Priority", width=10)
-            table.add_column("Tags", min_width=15)
-            table.add_column("Status", width=10)
-
-            for todo in results:
-                status_text = "[green]Completed[/green]" if todo['status'] == 'completed' else "[yellow]Pending[/yellow]"
-                table.add_row(
-                    str(todo['id']),
-                    todo['task'],
-                    todo['description'],
-                    todo['priority'].title(),
-                    ', '.join(todo['tags']) if todo['tags'] else 'None',
-                    status_text
-                )
-            console.print(table)
+            filter_type = "tag"
+            value = Prompt.ask("[blue]Enter tag to filter by[/blue]")
+
+        label = value if filter_type == "tag" else value.title()
+        found = show_pages(lambda offset, limit: manager.iter_filter(filter_type, value, offset, limit),
+                           todo_table_pages(f"\n[bold blue]Filtered Results ({filter_type.title()}: {label})[/bold blue]",
+                                            with_description=True))
+        if not found:
+            console.print(f"[yellow]No todos found with {filter_type} '{value}'.[/yellow]")
     except ValueError as e:
         console.print(f"[red]✗ Error:[/red] {e}")
     except Exception:
@@ -329,7 +439,8 @@ def handle_search_filter(manager: TodoManager):
 
 def interactive_menu():
     """Run the interactive menu loop."""
-    manager = TodoManager()
+    from rich.prompt import Prompt
+    manager = get_manager()
 
     console.print("[bold green]Welcome to the Interactive Todo Manager![/bold green]")
     console.print("[blue]Managing your tasks in this session...[/blue]\n")
@@ -386,16 +497,65 @@ def interactive_menu():
             console.print("[yellow]Returning to menu...[/yellow]")
 
 
+def load_todo_items(path: Path, priority: str, tags: List[str]) -> List[Dict]:
+    """Reads todos to import from a JSON list of objects or a text file with one title per line.
+
+    Priorities are lowercased as on the command line; add_many() checks the
+    type of every field and reports the items it rejects.
+    """
+    if path.suffix.lower() == ".json":
+        with open(path, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+        # The list command below shadows the builtin name in this module
+        if not isinstance(items, builtins.list) or not all(isinstance(item, dict) for item in items):
+            raise ValueError("JSON import files must contain a list of todo objects")
+        items = [{"priority": priority, "tags": tags, **item} for item in items]
+        for item in items:
+            if isinstance(item["priority"], str):
+                item["priority"] = item["priority"].lower()
+        return items
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return [{"task": line, "priority": priority, "tags": tags} for line in f if line.strip()]
+
+
 @app.command()
-def add(task: str = typer.Argument(..., help="Task title to add"),
+def add(task: Optional[str] = typer.Argument(None, help="Task title to add"),
         description: str = typer.Argument("", help="Optional description for the task"),
         priority: str = typer.Option("medium", "--priority", "-p", help="Priority level (high, medium, low)",
                                     case_sensitive=False),
-        tags: List[str] = typer.Option([], "--tag", "-t", help="Tags for the task (can be used multiple times)")):
-    """Add a new todo item."""
-    manager = TodoManager()
+        tags: List[str] = typer.Option([], "--tag", "-t", help="Tags for the task (can be used multiple times)"),
+        from_file: Optional[Path] = typer.Option(None, "--from-file", "-f", exists=True, dir_okay=False,
+                                                 help="Add every todo from a JSON list or a text file with one title per line")):
+    """Add a new todo item, or many at once with --from-file."""
+    manager = get_manager()
+    if from_file is not None:
+        try:
+            items = load_todo_items(from_file, priority.lower(), tags)
+        except (OSError, ValueError) as e:
+            console.print(f"[red]Error:[/red] {e}")
+            sys.exit(1)
+
+        result = manager.add_many(items)
+        if machine_output():
+            emit(result.succeeded)
+        if result.succeeded:
+            console.print(f"[green]Added {len(result.succeeded)} todos[/green] "
+                          f"(IDs {result.succeeded[0]['id']}-{result.succeeded[-1]['id']})")
+        for position, error in result.failed:
+            console.print(f"[red]Error:[/red] item {position + 1}: {error}")
+        if not result.ok:
+            sys.exit(1)
+        return
+
+    if task is None:
+        console.print("[red]Error:[/red] Provide a task title or use --from-file.")
+        sys.exit(1)
+
     try:
         new_todo = manager.add_todo(task, description, priority.lower(), tags)
+        if machine_output():
+            emit([new_todo])
         console.print(f"[green]Added todo:[/green] [bold]{new_todo['task']}[/bold] (ID: {new_todo['id']})")
         console.print(f"[blue]Priority:[/blue] {new_todo['priority']}")
         if new_todo['tags']:
@@ -408,55 +568,52 @@ def add(task: str = typer.Argument(..., help="Task title to add"),
 
 
 @app.command()
-def list():
+def list(limit: Optional[int] = typer.Option(None, "--limit", "-n", help="Only show the first N todos", min=0),
+         since: Optional[datetime] = typer.Option(None, "--since", help="Only todos created at or after this date/time"),
+         until: Optional[datetime] = typer.Option(None, "--until", help="Only todos created before this date/time"),
+         page_size: int = typer.Option(PAGE_SIZE, "--page-size", help="Todos shown per page", min=1)):
     """List all todo items."""
-    manager = TodoManager()
-    todos = manager.list_todos()
+    manager = get_manager()
+    if since is None and until is None:
+        fetch = manager.iter_todos
+    else:
+        start, end = time_bound(since), time_bound(until)
+        fetch = lambda offset, count: manager.iter_created(start, end, offset, count)
 
-    if not todos:
-        console.print("[yellow]No todos found.[/yellow]")
+    if machine_output():
+        emit(fetch(0, limit))
         return
 
     # Create a unified table as requested
-    console.print("\n[bold blue]All Todos:[/bold blue]")
-    table = Table(show_header=True, header_style="bold magenta")
-    table.add_column("ID", style="dim", width=5)
-    table.add_column("Task", min_width=20)
-    table.add_column("Status", width=10)
-    table.add_column("Priority", width=10)
-    table.add_column("Tags", min_width=15)
-
-    for todo in todos:
-        status_text = "[green]Completed[/green]" if todo['status'] == 'completed' else "[yellow]Pending[/yellow]"
-        table.add_row(
-            str(todo['id']),
-            todo['task'],
-            status_text,
-            todo['priority'].title(),
-            ', '.join(todo['tags']) if todo['tags'] else 'None'
-        )
-    console.print(table)
+    if not show_pages(fetch, todo_table_pages("\n[bold blue]All Todos:[/bold blue]"), page_size, limit):
+        console.print("[yellow]No todos found.[/yellow]")
 
 
 @app.command()
-def complete(id: int = typer.Argument(..., help="ID of the todo to complete")):
-    """Mark a todo item as completed."""
-    manager = TodoManager()
-    try:
-        success = manager.complete_todo(id)
-        if success:
-            console.print(f"[green]Marked todo {id} as completed[/green]")
-    except ValueError as e:
-        console.print(f"[red]Error:[/red] {e}")
+def complete(ids: List[int] = typer.Argument(..., help="IDs of the todos to complete")):
+    """Mark one or more todo items as completed."""
+    manager = get_manager()
+    result = manager.complete_many(ids)
+    if machine_output():
+        emit(map(manager.get_todo_by_id, result.succeeded))
+    for id in result.succeeded:
+        console.print(f"[green]Marked todo {id} as completed[/green]")
+    for _, error in result.failed:
+        console.print(f"[red]Error:[/red] {error}")
+    if not result.ok:
         sys.exit(1)
 
 
 @app.command()
 def delete(id: int = typer.Argument(..., help="ID of the todo to delete")):
     """Delete a todo item."""
-    manager = TodoManager()
+    manager = get_manager()
     try:
+        todo = manager.get_todo_by_id(id)
         success = manager.delete_todo(id)
+        if machine_output():
+            # The todo as it was just before it was deleted
+            emit([todo])
         if success:
             console.print(f"[red]Deleted todo {id}[/red]")
     except ValueError as e:
@@ -469,7 +626,7 @@ def update(id: int = typer.Argument(..., help="ID of the todo to update"),
            new_task: str = typer.Argument("", help="New task title (leave empty to keep current)"),
            new_description: str = typer.Argument("", help="New description (leave empty to keep current)")):
     """Update an existing todo item's title and/or description."""
-    manager = TodoManager()
+    manager = get_manager()
 
     # Determine which values to update
     task_to_update = new_task if new_task != "" else None
@@ -482,6 +639,8 @@ def update(id: int = typer.Argument(..., help="ID of the todo to update"),
 
     try:
         success = manager.update_todo(id, task_to_update, desc_to_update)
+        if machine_output():
+            emit([manager.get_todo_by_id(id)])
         if success:
             console.print(f"[green]Updated todo {id}[/green]")
             if task_to_update is not None:
@@ -497,9 +656,11 @@ def update(id: int = typer.Argument(..., help="ID of the todo to update"),
 def priority(id: int = typer.Argument(..., help="ID of the todo to set priority for"),
              priority_level: str = typer.Argument(..., help="Priority level (high, medium, low)")):
     """Set priority for a specific todo."""
-    manager = TodoManager()
+    manager = get_manager()
     try:
         success = manager.set_priority(id, priority_level.lower())
+        if machine_output():
+            emit([manager.get_todo_by_id(id)])
         if success:
             console.print(f"[green]Set priority to {priority_level.lower()} for todo {id}[/green]")
     except ValueError as e:
@@ -511,9 +672,11 @@ def priority(id: int = typer.Argument(..., help="ID of the todo to set priority
 def tag(id: int = typer.Argument(..., help="ID of the todo to add tags to"),
         tags: List[str] = typer.Argument(..., help="Tags to add to the task")):
     """Add tags to a specific todo."""
-    manager = TodoManager()
+    manager = get_manager()
     try:
         success = manager.add_tags(id, tags)
+        if machine_output():
+            emit([manager.get_todo_by_id(id)])
         if success:
             console.print(f"[green]Added tags {', '.join(tags)} to todo {id}[/green]")
     except ValueError as e:
@@ -521,12 +684,49 @@ def tag(id: int = typer.Argument(..., help="ID of the todo to add tags to"),
         sys.exit(1)
 
 
+@app.command()
+def tags(rename: Optional[Tuple[str, str]] = typer.Option(None, "--rename", help="Rename tag OLD to NEW on every todo"),
+         delete: Optional[str] = typer.Option(None, "--delete", help="Remove this tag from every todo")):
+    """List tags with their todo counts, or rename or delete a tag everywhere."""
+    manager = get_manager()
+    try:
+        if rename:
+            old_tag, new_tag = rename
+            changed = manager.rename_tag(old_tag, new_tag)
+            console.print(f"[green]Renamed tag '{old_tag}' to '{new_tag}' on {changed} todo(s)[/green]")
+            return
+        if delete is not None:
+            changed = manager.delete_tag(delete)
+            console.print(f"[green]Removed tag '{delete}' from {changed} todo(s)[/green]")
+            return
+    except ValueError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        sys.exit(1)
+
+    counts = manager.list_tags()
+    if machine_output():
+        emit(({"tag": tag_name, "count": count} for tag_name, count in counts.items()), fields=["tag", "count"])
+        return
+    if not counts:
+        console.print("[yellow]No tags in use.[/yellow]")
+        return
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Tag", min_width=15)
+    table.add_column("Todos", justify="right")
+    for tag_name, count in counts.items():
+        table.add_row(tag_name, str(count))
+    console.print(table)
+
+
 @app.command()
 def view(id: int = typer.Argument(..., help="ID of the todo to view details for")):
     """View detailed information about a specific todo."""
-    manager = TodoManager()
+    manager = get_manager()
     try:
         todo = manager.get_todo_by_id(id)
+        if machine_output():
+            emit([todo])
+            return
         console.print(f"\n[bold blue]Todo Details (ID: {todo['id']})[/bold blue]")
         console.print(f"[bold]Task:[/bold] {todo['task']}")
         console.print(f"[bold]Description:[/bold] {todo['description'] if todo['description'] else 'None'}")
@@ -540,123 +740,50 @@ def view(id: int = typer.Argument(..., help="ID of the todo to view details for"
 
 
 @app.command()
-def search(keyword: str = typer.Argument(..., help="Keyword to search for in tasks and descriptions")):
+def search(keyword: str = typer.Argument(..., help="Keyword to search for in tasks and descriptions"),
+           match_any: bool = typer.Option(False, "--any", help="Match todos containing any word instead of all words"),
+           fuzzy: bool = typer.Option(False, "--fuzzy", help="Tolerate typos by matching similar words"),
+           limit: Optional[int] = typer.Option(None, "--limit", "-n", help="Only show the N best matches", min=0),
+           page_size: int = typer.Option(PAGE_SIZE, "--page-size", help="Todos shown per page", min=1)):
     """Search for todos containing the keyword."""
-    manager = TodoManager()
-    results = manager.search_todos(keyword)
-
-    if not results:
-        console.print(f"[yellow]No todos found containing '{keyword}'.[/yellow]")
+    manager = get_manager(fuzzy=fuzzy)
+    mode = "or" if match_any else "and"
+    if machine_output():
+        emit(manager.iter_search(keyword, mode, fuzzy, limit=limit))
         return
-
-    console.print(f"\n[bold blue]Search Results for '{keyword}'[/bold blue]")
-    pending_results = [todo for todo in results if todo['status'] == 'pending']
-    completed_results = [todo for todo in results if todo['status'] == 'completed']
-
-    # Create a table for pending search results
-    if pending_results:
-        console.print("\n[bold blue]Pending Todos:[/bold blue]")
-        pending_table = Table(show_header=True, header_style="bold magenta")
-        pending_table.add_column("ID", style="dim", width=5)
-        pending_table.add_column("Task", min_width=20)
-        pending_table.add_column("Description", min_width=20)
-        pending_table.add_column("Priority", width=10)
-        pending_table.add_column("Tags", min_width=15)
-        pending_table.add_column("Status", width=10)
-
-        for todo in pending_results:
-            pending_table.add_row(
-                str(todo['id']),
-                todo['task'],
-                todo['description'],
-                todo['priority'].title(),
-                ', '.join(todo['tags']) if todo['tags'] else 'None',
-                "[yellow]Pending[/yellow]"
-            )
-        console.print(pending_table)
-
-    # Create a table for completed search results
-    if completed_results:
-        console.print("\n[bold green]Completed Todos:[/bold green]")
-        completed_table = Table(show_header=True, header_style="bold magenta")
-        completed_table.add_column("ID", style="dim", width=5)
-        completed_table.add_column("Task", min_width=20)
-        completed_table.add_column("Description", min_width=20)
-        completed_table.add_column("Priority", width=10)
-        completed_table.add_column("Tags", min_width=15)
-        completed_table.add_column("Status", width=10)
-
-        for todo in completed_results:
-            completed_table.add_row(
-                str(todo['id']),
-                todo['task'],
-                todo['description'],
-                todo['priority'].title(),
-                ', '.join(todo['tags']) if todo['tags'] else 'None',
-                "[green]Completed[/green]"
-            )
-        console.print(completed_table)
+    found = show_pages(lambda offset, count: manager.iter_search(keyword, mode, fuzzy, offset, count),
+                       status_table_pages(f"\n[bold blue]Search Results for '{keyword}'[/bold blue]"), page_size, limit)
+    if not found:
+        console.print(f"[yellow]No todos found containing '{keyword}'.[/yellow]")
 
 
 @app.command()
 def filter(filter_type: str = typer.Argument(..., help="Type of filter (status, priority, tag)"),
-           filter_value: str = typer.Argument(..., help="Value to filter by")):
+           filter_value: str = typer.Argument(..., help="Value to filter by"),
+           limit: Optional[int] = typer.Option(None, "--limit", "-n", help="Only show the first N todos", min=0),
+           since: Optional[datetime] = typer.Option(None, "--since", help="Only todos created at or after this date/time"),
+           until: Optional[datetime] = typer.Option(None, "--until", help="Only todos created before this date/time"),
+           page_size: int = typer.Option(PAGE_SIZE, "--page-size", help="Todos shown per page", min=1)):
     """Filter todos by status, priority, or tag."""
-    manager = TodoManager()
+    manager = get_manager()
     try:
-        results = manager.filter_todos(filter_type.lower(), filter_value.lower())
-
-        if not results:
-            console.print(f"[yellow]No todos found matching the filter ({filter_type}: {filter_value}).[/yellow]")
+        filter_type, filter_value = filter_type.lower(), filter_value.lower()
+        if since is None and until is None:
+            fetch = lambda offset, count: manager.iter_filter(filter_type, filter_value, offset, count)
+        elif filter_type in ("status", "priority", "tag"):
+            # The planner intersects the filter's index with the time range
+            start, end = time_bound(since), time_bound(until)
+            fetch = lambda offset, count: manager.query(**{filter_type: filter_value}, since=start, until=end,
+                                                        offset=offset, limit=count)
+        else:
+            raise ValueError("Filter type must be 'status', 'priority', or 'tag'")
+
+        if machine_output():
+            emit(fetch(0, limit))
             return
-
-        console.print(f"\n[bold blue]Filtered Results ({filter_type.title()}: {filter_value.title()})[/bold blue]")
-        pending_results = [todo for todo in results if todo['status'] == 'pending']
-        completed_results = [todo for todo in results if todo['status'] == 'completed']
-
-        # Create a table for pending filtered results
-        if pending_results:
-            console.print("\n[bold blue]Pending Todos:[/bold blue]")
-            pending_table = Table(show_header=True, header_style="bold magenta")
-            pending_table.add_column("ID", style="dim", width=5)
-            pending_table.add_column("Task", min_width=20)
-            pending_table.add_column("Description", min_width=20)
-            pending_table.add_column("Priority", width=10)
-            pending_table.add_column("Tags", min_width=15)
-            pending_table.add_column("Status", width=10)
-
-            for todo in pending_results:
-                pending_table.add_row(
-                    str(todo['id']),
-                    todo['task'],
-                    todo['description'],
-                    todo['priority'].title(),
-                    ', '.join(todo['tags']) if todo['tags'] else 'None',
-                    "[yellow]Pending[/yellow]"
-                )
-            console.print(pending_table)
-
-        # Create a table for completed filtered results
-        if completed_results:
-            console.print("\n[bold green]Completed Todos:[/bold green]")
-            completed_table = Table(show_header=True, header_style="bold magenta")
-            completed_table.add_column("ID", style="dim", width=5)
-            completed_table.add_column("Task", min_width=20)
-            completed_table.add_column("Description", min_width=20)
-            completed_table.add_column("Priority", width=10)
-            completed_table.add_column("Tags", min_width=15)
-            completed_table.add_column("Status", width=10)
-
-            for todo in completed_results:
-                completed_table.add_row(
-                    str(todo['id']),
-                    todo['task'],
-                    todo['description'],
-                    todo['priority'].title(),
-                    ', '.join(todo['tags']) if todo['tags'] else 'None',
-                    "[green]Completed[/green]"
-                )
-            console.print(completed_table)
+        title = f"\n[bold blue]Filtered Results ({filter_type.title()}: {filter_value.title()})[/bold blue]"
+        if not show_pages(fetch, status_table_pages(title), page_size, limit):
+            console.print(f"[yellow]No todos found matching the filter ({filter_type}: {filter_value}).[/yellow]")
 
     except ValueError as e:
         console.print(f"[red]Error:[/red] {e}")
@@ -664,78 +791,110 @@ def filter(filter_type: str = typer.Argument(..., help="Type of filter (status,
 
 
 @app.command()
-def sort(sort_type: str = typer.Argument(..., help="Type of sort (priority, id)")):
+def sort(sort_type: str = typer.Argument(..., help="Type of sort (priority, id)"),
+         limit: Optional[int] = typer.Option(None, "--limit", "-n", help="Only show the first N todos", min=0),
+         page_size: int = typer.Option(PAGE_SIZE, "--page-size", help="Todos shown per page", min=1)):
     """Sort todos by priority or ID."""
-    manager = TodoManager()
+    manager = get_manager()
     try:
-        results = manager.sort_todos(sort_type.lower())
-
-        if not results:
-            console.print("[yellow]No todos to sort.[/yellow]")
+        sort_type = sort_type.lower()
+        if machine_output():
+            emit(manager.iter_sorted(sort_type, limit=limit))
             return
-
-        console.print(f"\n[bold blue]Sorted Results by {sort_type.title()}[/bold blue]")
-        pending_results = [todo for todo in results if todo['status'] == 'pending']
-        completed_results = [todo for todo in results if todo['status'] == 'completed']
-
-        # Create a table for pending sorted results
-        if pending_results:
-            console.print("\n[bold blue]Pending Todos:[/bold blue]")
-            pending_table = Table(show_header=True, header_style="bold magenta")
-            pending_table.add_column("ID", style="dim", width=5)
-            pending_table.add_column("Task", min_width=20)
-            pending_table.add_column("Description", min_width=20)
-            pending_table.add_column("Priority", width=10)
-            pending_table.add_column("Tags", min_width=15)
-            pending_table.add_column("Status", width=10)
-
-            for todo in pending_results:
-                pending_table.add_row(
-                    str(todo['id']),
-                    todo['task'],
-                    todo['description'],
-                    todo['priority'].title(),
-                    ', '.join(todo['tags']) if todo['tags'] else 'None',
-                    "[yellow]Pending[/yellow]"
-                )
-            console.print(pending_table)
-
-        # Create a table for completed sorted results
-        if completed_results:
-            console.print("\n[bold green]Completed Todos:[/bold green]")
-            completed_table = Table(show_header=True, header_style="bold magenta")
-            completed_table.add_column("ID", style="dim", width=5)
-            completed_table.add_column("Task", min_width=20)
-            completed_table.add_column("Description", min_width=20)
-            completed_table.add_column("Priority", width=10)
-            completed_table.add_column("Tags", min_width=15)
-            completed_table.add_column("Status", width=10)
-
-            for todo in completed_results:
-                completed_table.add_row(
-                    str(todo['id']),
-                    todo['task'],
-                    todo['description'],
-                    todo['priority'].title(),
-                    ', '.join(todo['tags']) if todo['tags'] else 'None',
-                    "[green]Completed[/green]"
-                )
-            console.print(completed_table)
+        found = show_pages(lambda offset, count: manager.iter_sorted(sort_type, offset, count),
+                           status_table_pages(f"\n[bold blue]Sorted Results by {sort_type.title()}[/bold blue]"),
+                           page_size, limit)
+        if not found:
+            console.print("[yellow]No todos to sort.[/yellow]")
 
     except ValueError as e:
         console.print(f"[red]Error:[/red] {e}")
         sys.exit(1)
 
 
-def main():
-    """Main application entry point."""
-    # Check if arguments were provided
-    if len(sys.argv) == 1:
-        # No arguments provided, run interactive menu
-        interactive_menu()
-    else:
-        # Arguments provided, run Typer CLI
-        app()
+@app.command(hidden=True)
+def stats(reset: bool = typer.Option(False, "--reset", help="Clear the recorded stats")):
+    """Show per-method call counts and latency recorded with TODO_STATS."""
+    if stats_path is None:
+        console.print("[yellow]Stats are disabled. Set TODO_STATS to a file path to record them.[/yellow]")
+        return
+    if reset:
+        if os.path.exists(stats_path):
+            os.remove(stats_path)
+        console.print("[green]Stats cleared.[/green]")
+        return
+
+    operations = load_stats(stats_path)
+    if not operations:
+        console.print("[yellow]No stats recorded yet.[/yellow]")
+        return
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Method", min_width=15)
+    for column in ("Calls", "Total (ms)", "Mean (us)", "p50 (us)", "p99 (us)", "Items", "Scanned"):
+        table.add_column(column, justify="right")
+    summaries = sorted(((name, op.summary()) for name, op in operations.items()), key=lambda item: -item[1]["total_ms"])
+    for name, summary in summaries:
+        table.add_row(name, str(summary["calls"]), f"{summary['total_ms']:.2f}", f"{summary['mean_us']:.1f}",
+                      f"{summary['p50_us']:.1f}", f"{summary['p99_us']:.1f}", str(summary["items"]),
+                      str(summary["scanned"]))
+    console.print(table)
+
+
+@app.command()
+def daemon(socket: Optional[Path] = typer.Option(None, "--socket", dir_okay=False,
+                                                 help="Socket to listen on (default: TODO_SOCKET, or todo.sock in the store)")):
+    """Keep todos in memory in a background server that answers the CLI's commands."""
+    from daemon import TodoDaemon, socket_path
+    global storage_path
+    path = str(socket) if socket is not None else socket_path(storage_path)
+    if path is None:
+        console.print("[red]Error:[/red] Give the daemon a --socket, or a --store to put its socket in.")
+        sys.exit(1)
+    # Commands run in their client's directory, so the daemon's own paths must not be relative
+    path = os.path.abspath(path)
+    if storage_path is not None:
+        storage_path = os.path.abspath(storage_path)
+
+    # Stop cleanly on SIGTERM as well as Ctrl-C, so the log is closed and the socket removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    console.print(f"[green]Todo daemon listening on {path}[/green] (Ctrl-C to stop)")
+    try:
+        TodoDaemon(get_manager(), path).serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        sys.exit(1)
+
+
+def main(forward: bool = True):
+    """Main application entry point.
+
+    forward=False skips handing the command to a running daemon, for callers
+    that have already tried.
+    """
+    try:
+        # Check if arguments were provided
+        if len(sys.argv) == 1:
+            # No arguments provided, run interactive menu (always with Rich)
+            set_output(plain=False)
+            from daemon import is_listening, socket_path
+            path = socket_path(storage_path)
+            if path and is_listening(path):
+                console.print(f"[red]Error:[/red] The todo daemon on {path} is serving this store; "
+                              "stop it to use the interactive menu, or run commands, which it answers.")
+                sys.exit(1)
+            interactive_menu()
+        else:
+            # Arguments provided: hand them to a running daemon, or run the Typer CLI here
+            code = forward_to_daemon(sys.argv[1:]) if forward else None
+            if code is not None:
+                sys.exit(code)
+            app()
+    except StoreLockedError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,42 @@
+import csv
+import json
+from typing import Iterable, List, Mapping, TextIO
+
+# Values for the CLI's --format option; everything but "table" is machine-readable
+FORMATS = ["table", "json", "ndjson", "csv"]
+TODO_FIELDS = ["id", "task", "description", "status", "priority", "tags", "created_at"]
+
+
+def write_records(records: Iterable[Mapping], output_format: str, stream: TextIO,
+                  fields: List[str] = TODO_FIELDS) -> int:
+    """Streams records to stream as json, ndjson or csv and returns how many were written.
+
+    Records are written as they are read, so memory use does not depend on
+    their number. Lists (tags) become JSON arrays, or comma-separated
+    values in CSV.
+    """
+    count = 0
+    if output_format == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(fields)
+        for record in records:
+            writer.writerow([",".join(record[field]) if field == "tags" else record[field] for field in fields])
+            count += 1
+        return count
+
+    if output_format not in ("json", "ndjson"):
+        raise ValueError(f"Format must be one of: {', '.join(FORMATS[1:])}")
+    separator = "\n" if output_format == "ndjson" else ",\n"
+    if output_format == "json":
+        stream.write("[")
+    for record in records:
+        if count:
+            stream.write(separator)
+        row = {field: list(record[field]) if field == "tags" else record[field] for field in fields}
+        stream.write(json.dumps(row, ensure_ascii=False))
+        count += 1
+    if output_format == "json":
+        stream.write("]")
+    if count or output_format == "json":
+        stream.write("\n")
+    return count
@@ -0,0 +1,163 @@
+import json
+import os
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+
+class StoreLockedError(RuntimeError):
+    """Raised when another TodoManager, in this or another process, already uses a store."""
+
+
+def lock_file(path: str) -> TextIO:
+    """Opens path and takes an exclusive lock on it, held until the returned file is closed.
+
+    Raises StoreLockedError, naming the holder's process id, if it is already locked.
+    """
+    f = open(path, 'a+', encoding='utf-8')
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.seek(0)
+        holder = f.read().strip() or "unknown"
+        f.close()
+        raise StoreLockedError(f"The todo store {os.path.dirname(path)} is in use by another process (pid {holder})")
+    f.seek(0)
+    f.truncate()
+    f.write(str(os.getpid()))
+    f.flush()
+    return f
+
+
+class TodoJournal:
+    """Durable storage for TodoManager: an append-only operation log plus snapshots.
+
+    Every mutation appends one JSON line to the log, so a write costs O(1)
+    regardless of how many todos exist. Every snapshot_every operations the
+    caller writes a compacted snapshot and the log starts over, so recovery
+    loads the latest snapshot and replays only the operations logged after
+    it. Each operation carries a sequence number; replay skips anything the
+    snapshot already covers, which keeps a crash between writing the
+    snapshot and truncating the log harmless.
+
+    Only one journal may use a directory at a time: it holds an exclusive
+    lock on todo.lock until close(), and raises StoreLockedError otherwise.
+    """
+
+    LOG_NAME = "todo.log"
+    SNAPSHOT_NAME = "todo.snapshot.json"
+    LOCK_NAME = "todo.lock"
+
+    def __init__(self, directory: str, snapshot_every: int = 1000, fsync: bool = False):
+        if snapshot_every < 1:
+            raise ValueError("snapshot_every must be at least 1")
+        os.makedirs(directory, exist_ok=True)
+        self._lock = lock_file(os.path.join(directory, self.LOCK_NAME))
+        self.log_path = os.path.join(directory, self.LOG_NAME)
+        self.snapshot_path = os.path.join(directory, self.SNAPSHOT_NAME)
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.sequence = 0
+        self.pending = 0  # Operations logged since the last snapshot
+        self._log = None
+
+    def load(self) -> Tuple[Optional[Dict], List[Dict]]:
+        """Returns the latest snapshot (or None) and the logged operations that follow it."""
+        snapshot = None
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self.sequence = snapshot['seq']
+
+        logged = list(self._read_log())
+        self._check_sequence(logged)
+        operations = [op for op in logged if op['seq'] > self.sequence]
+        if operations:
+            self.sequence = operations[-1]['seq']
+        self.pending = len(operations)
+        return snapshot, operations
+
+    def _check_sequence(self, logged: List[Dict]) -> None:
+        """Raises ValueError unless the log continues the snapshot without gaps or reordering.
+
+        A log left over from before the latest snapshot (a crash before it
+        was truncated) runs up to exactly the snapshot's sequence number.
+        """
+        for previous, operation in zip(logged, logged[1:]):
+            if operation['seq'] != previous['seq'] + 1:
+                raise ValueError(f"Operation log is out of order: seq {operation['seq']} "
+                                 f"follows seq {previous['seq']}")
+        if logged and not logged[0]['seq'] <= self.sequence + 1 <= logged[-1]['seq'] + 1:
+            raise ValueError(f"Operation log (seq {logged[0]['seq']}-{logged[-1]['seq']}) "
+                             f"does not continue the snapshot at seq {self.sequence}")
+
+    def _read_log(self) -> Iterator[Dict]:
+        if not os.path.exists(self.log_path):
+            return
+        valid_bytes = 0
+        with open(self.log_path, 'rb') as f:
+            for line in f:
+                try:
+                    operation = json.loads(line)
+                except ValueError:
+                    # A torn final write from a crash; everything before it is intact
+                    break
+                valid_bytes += len(line)
+                yield operation
+        if valid_bytes != os.path.getsize(self.log_path):
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(valid_bytes)
+
+    def append(self, operation: Dict) -> None:
+        """Appends one operation to the log."""
+        if self._log is None:
+            self._log = open(self.log_path, 'a', encoding='utf-8')
+        self.sequence += 1
+        operation['seq'] = self.sequence
+        self._log.write(json.dumps(operation, separators=(',', ':')) + "\n")
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        self.pending += 1
+
+    @property
+    def needs_snapshot(self) -> bool:
+        """True once enough operations have been logged since the last snapshot."""
+        return self.pending >= self.snapshot_every
+
+    def write_snapshot(self, state: Dict) -> None:
+        """Atomically replaces the snapshot with state and starts a fresh log."""
+        state = dict(state, seq=self.sequence)
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+
+        self._close_log()
+        with open(self.log_path, 'w', encoding='utf-8'):
+            pass
+        self.pending = 0
+
+    def _close_log(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def close(self) -> None:
+        """Closes the log file and releases the store for other processes."""
+        self._close_log()
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
@@ -0,0 +1,54 @@
+import os
+import re
+import sys
+from typing import Any, List, Optional, TextIO
+
+# Rich markup tags such as [bold blue] and [/green]; bracketed numbers like [1] are left alone
+MARKUP = re.compile(r"\[/?[a-z]+(?: [a-z]+)*\]")
+
+
+def wants_plain_output() -> bool:
+    """Returns True when output should skip Rich: piped or redirected stdout, unless TODO_PLAIN says otherwise."""
+    setting = os.environ.get("TODO_PLAIN")
+    if setting is not None:
+        return setting == "1"
+    return not sys.stdout.isatty()
+
+
+def strip_markup(text: str) -> str:
+    """Removes Rich markup tags from a string."""
+    return MARKUP.sub("", text)
+
+
+class PlainTable:
+    """Drop-in for the parts of rich.table.Table the CLI uses, rendered as tab-separated lines."""
+
+    def __init__(self, *args: Any, show_header: bool = True, **kwargs: Any):
+        self.show_header = show_header
+        self.headers: List[str] = []
+        self.rows: List[List[str]] = []
+
+    def add_column(self, header: str = "", *args: Any, **kwargs: Any) -> None:
+        self.headers.append(header)
+
+    def add_row(self, *cells: str) -> None:
+        self.rows.append([strip_markup(str(cell)).replace("\t", " ") for cell in cells])
+
+    def __str__(self) -> str:
+        lines = ["\t".join(self.headers)] if self.show_header else []
+        lines.extend("\t".join(row) for row in self.rows)
+        return "\n".join(lines)
+
+
+class PlainConsole:
+    """Drop-in for the parts of rich.console.Console the CLI uses, writing plain text to stdout."""
+
+    def __init__(self, file: Optional[TextIO] = None):
+        # None means whatever sys.stdout is at print time
+        self.file = file
+
+    def print(self, *objects: Any, **kwargs: Any) -> None:
+        print(*(strip_markup(item) if isinstance(item, str) else str(item) for item in objects), file=self.file)
+
+    def input(self, prompt: str = "") -> str:
+        return input(strip_markup(prompt))
@@ -0,0 +1,216 @@
+import heapq
+import math
+import re
+import sys
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Set, Tuple
+from fuzzy_index import TrigramIndex
+from instrumentation import scan_counter
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def rank(scores: Dict[int, float], limit: Optional[int] = None) -> List[Tuple[int, float]]:
+    """Orders (todo ID, score) pairs best first, keeping only the top limit if given."""
+    def key(item):
+        return -item[1], item[0]
+    if limit is not None and limit < len(scores):
+        return heapq.nsmallest(limit, scores.items(), key=key)
+    return sorted(scores.items(), key=key)
+
+
+class TextIndex:
+    """Inverted full-text index with prefix matching and BM25 ranking."""
+
+    # Standard BM25 tuning constants
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}  # term -> {todo ID: term frequency}
+        # todo ID -> its distinct terms, to find its postings on removal; the
+        # frequencies live in the postings only
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._doc_lengths: Dict[int, int] = {}
+        self._total_length = 0
+        # Sorted vocabulary so a prefix maps to a contiguous range of terms
+        self._vocabulary: List[str] = []
+        # Built on demand by enable_fuzzy()
+        self._trigrams: Optional[TrigramIndex] = None
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    @property
+    def fuzzy_enabled(self) -> bool:
+        """Whether the trigram index for fuzzy search is being maintained."""
+        return self._trigrams is not None
+
+    def enable_fuzzy(self) -> None:
+        """Starts maintaining a trigram index over the vocabulary for fuzzy search."""
+        if self._trigrams is not None:
+            return
+        trigrams = TrigramIndex()
+        for term in self._vocabulary:
+            trigrams.add(term)
+        # Publish only the finished index so concurrent readers never see a partial one
+        self._trigrams = trigrams
+
+    def ids(self) -> Set[int]:
+        """Returns the IDs of all indexed todos."""
+        return set(self._doc_lengths)
+
+    def add(self, todo_id: int, text: str) -> None:
+        """Indexes the text of a todo, replacing anything indexed for it before."""
+        if todo_id in self._doc_terms:
+            self.remove(todo_id)
+
+        tokens = tokenize(text)
+        frequencies: Dict[str, int] = {}
+        for token in tokens:
+            # Interned so that every todo using a term shares one string
+            token = sys.intern(token)
+            frequencies[token] = frequencies.get(token, 0) + 1
+
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._vocabulary, term)
+                if self._trigrams is not None:
+                    self._trigrams.add(term)
+            postings[todo_id] = frequency
+
+        self._doc_terms[todo_id] = tuple(frequencies)
+        self._doc_lengths[todo_id] = len(tokens)
+        self._total_length += len(tokens)
+
+    def remove(self, todo_id: int) -> None:
+        """Drops a todo from the index."""
+        terms = self._doc_terms.pop(todo_id, None)
+        if terms is None:
+            return
+
+        for term in terms:
+            postings = self._postings[term]
+            del postings[todo_id]
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect_left(self._vocabulary, term)]
+                if self._trigrams is not None:
+                    self._trigrams.remove(term)
+
+        self._total_length -= self._doc_lengths.pop(todo_id)
+
+    def expand(self, term: str, prefix: bool = True) -> List[str]:
+        """Returns the indexed terms matching a query term, optionally by prefix."""
+        if not prefix:
+            return [term] if term in self._postings else []
+
+        start = bisect_left(self._vocabulary, term)
+        matches = []
+        for position in range(start, len(self._vocabulary)):
+            candidate = self._vocabulary[position]
+            if not candidate.startswith(term):
+                break
+            matches.append(candidate)
+        return matches
+
+    def search(self, query: str, mode: str = "and", prefix: bool = True,
+               limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Returns (todo ID, score) pairs for a query, best match first.
+
+        With a limit only the best limit matches are ordered and returned.
+        """
+        if mode not in ("and", "or"):
+            raise ValueError("Search mode must be 'and' or 'or'")
+
+        # Each query term contributes the union of the postings of its expansions
+        term_groups: List[List[str]] = []
+        for term in dict.fromkeys(tokenize(query)):
+            expansions = self.expand(term, prefix)
+            if not expansions and mode == "and":
+                return []
+            if expansions:
+                term_groups.append(expansions)
+        if not term_groups:
+            return []
+
+        candidate_sets: List[Set[int]] = []
+        for expansions in term_groups:
+            candidates: Set[int] = set()
+            for term in expansions:
+                candidates.update(self._postings[term])
+                scan_counter.add(len(self._postings[term]))
+            candidate_sets.append(candidates)
+
+        if mode == "and":
+            # Intersect starting from the smallest set to keep the work proportional to the result
+            candidate_sets.sort(key=len)
+            matches = set(candidate_sets[0])
+            for candidates in candidate_sets[1:]:
+                matches.intersection_update(candidates)
+                if not matches:
+                    return []
+        else:
+            matches = set().union(*candidate_sets)
+
+        scores = {todo_id: 0.0 for todo_id in matches}
+        document_count = len(self._doc_lengths)
+        average_length = self._total_length / document_count if document_count else 0.0
+        for expansions in term_groups:
+            for term in expansions:
+                postings = self._postings[term]
+                idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                # Walk whichever side is smaller: the postings or the matched documents
+                if len(postings) <= len(scores):
+                    pairs = ((todo_id, frequency) for todo_id, frequency in postings.items() if todo_id in scores)
+                else:
+                    pairs = ((todo_id, postings[todo_id]) for todo_id in scores if todo_id in postings)
+                for todo_id, frequency in pairs:
+                    length_norm = 1 - self.B + self.B * self._doc_lengths[todo_id] / (average_length or 1)
+                    scores[todo_id] += idf * frequency * (self.K1 + 1) / (frequency + self.K1 * length_norm)
+
+        return rank(scores, limit)
+
+    def fuzzy_search(self, query: str, mode: str = "and", threshold: float = 0.3,
+                     limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Returns (todo ID, score) pairs for a typo-tolerant query, best match first.
+
+        Each query word is matched against similar vocabulary terms through the
+        trigram index, so the cost depends on the vocabulary hits rather than
+        on the number of todos.
+        """
+        if mode not in ("and", "or"):
+            raise ValueError("Search mode must be 'and' or 'or'")
+        self.enable_fuzzy()
+
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            return []
+
+        scores: Dict[int, float] = {}
+        hits: Dict[int, int] = {}
+        for word in words:
+            # Best similarity this word reaches in each todo
+            best: Dict[int, float] = {}
+            for term, similarity in self._trigrams.similar(word, threshold):
+                scan_counter.add(len(self._postings[term]))
+                for todo_id in self._postings[term]:
+                    if similarity > best.get(todo_id, 0.0):
+                        best[todo_id] = similarity
+            if not best and mode == "and":
+                return []
+            for todo_id, similarity in best.items():
+                scores[todo_id] = scores.get(todo_id, 0.0) + similarity
+                hits[todo_id] = hits.get(todo_id, 0) + 1
+
+        if mode == "and":
+            scores = {todo_id: score for todo_id, score in scores.items() if hits[todo_id] == len(words)}
+        return rank(scores, limit)
@@ -0,0 +1,157 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, Hashable, Iterable, Iterator, KeysView, List, Optional
+
+
+class SecondaryIndex:
+    """Maps a field value to the set of todo IDs holding that value, in ID order."""
+
+    def __init__(self, keys: Iterable[Hashable] = ()):
+        # Dicts with None values act as insertion-ordered sets of IDs
+        self._buckets: Dict[Hashable, Dict[int, None]] = {key: {} for key in keys}
+        self._fixed_keys = frozenset(self._buckets)
+        # Highest ID added to each bucket, used to notice out-of-order inserts
+        self._tails: Dict[Hashable, int] = {}
+        self._unordered: set = set()
+
+    def add(self, key: Hashable, todo_id: int) -> None:
+        """Adds an ID to the bucket for key."""
+        bucket = self._buckets.setdefault(key, {})
+        if todo_id in bucket:
+            return
+        bucket[todo_id] = None
+        if todo_id < self._tails.get(key, 0):
+            self._unordered.add(key)
+        else:
+            self._tails[key] = todo_id
+
+    def discard(self, key: Hashable, todo_id: int) -> None:
+        """Removes an ID from the bucket for key if it is present."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return
+        bucket.pop(todo_id, None)
+        if not bucket and key not in self._fixed_keys:
+            # Drop empty buckets for open-ended keys such as tags
+            del self._buckets[key]
+            self._tails.pop(key, None)
+            self._unordered.discard(key)
+
+    def ids(self, key: Hashable) -> KeysView:
+        """Returns the IDs stored under key in ascending order."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return {}.keys()
+        if key in self._unordered:
+            # Re-sort lazily so a burst of updates costs one sort per bucket
+            bucket = dict.fromkeys(sorted(bucket))
+            self._buckets[key] = bucket
+            self._unordered.discard(key)
+        return bucket.keys()
+
+    def count(self, key: Hashable) -> int:
+        """Returns the number of IDs stored under key."""
+        return len(self._buckets.get(key, ()))
+
+    def keys(self) -> KeysView:
+        """Returns the keys that currently have a bucket."""
+        return self._buckets.keys()
+
+    def as_sets(self) -> Dict[Hashable, set]:
+        """Returns the non-empty buckets as plain sets, for consistency checks."""
+        return {key: set(bucket) for key, bucket in self._buckets.items() if bucket}
+
+
+class TimeIndex:
+    """Todo IDs ordered by creation time, for range and recency queries.
+
+    Timestamps and IDs are kept in two parallel sorted lists, so a time range
+    is located with two binary searches. New todos nearly always carry the
+    latest timestamp and are simply appended. Removed IDs are dropped from
+    the live map right away and skipped by readers; the lists themselves are
+    compacted once dead entries outnumber live ones.
+    """
+
+    def __init__(self):
+        self._times: List[int] = []
+        self._ids: List[int] = []
+        # Live ID -> timestamp; list entries that disagree with it are dead
+        self._stamps: Dict[int, int] = {}
+
+    def add(self, timestamp: int, todo_id: int) -> None:
+        """Adds an ID created at timestamp."""
+        self._stamps[todo_id] = timestamp
+        if not self._times or timestamp >= self._times[-1]:
+            self._times.append(timestamp)
+            self._ids.append(todo_id)
+        else:
+            position = bisect_right(self._times, timestamp)
+            self._times.insert(position, timestamp)
+            self._ids.insert(position, todo_id)
+
+    def discard(self, todo_id: int) -> None:
+        """Removes an ID if it is present."""
+        if self._stamps.pop(todo_id, None) is not None and len(self._stamps) * 2 < len(self._ids):
+            self._compact()
+
+    def _compact(self) -> None:
+        # Build new lists rather than editing in place, so open ranges keep a consistent view
+        stamps = self._stamps
+        live = [(timestamp, todo_id) for timestamp, todo_id in zip(self._times, self._ids)
+                if stamps.get(todo_id) == timestamp]
+        self._times = [timestamp for timestamp, _ in live]
+        self._ids = [todo_id for _, todo_id in live]
+
+    def between(self, start: Optional[int] = None, end: Optional[int] = None) -> "TimeRange":
+        """Returns the IDs created in [start, end), oldest first; a missing bound is open."""
+        lo = 0 if start is None else bisect_left(self._times, start)
+        hi = len(self._times) if end is None else bisect_left(self._times, end)
+        return TimeRange(self, lo, hi, start, end)
+
+    def newest(self) -> Iterator[int]:
+        """Lazily yields IDs from the most recently created backwards."""
+        return reversed(self.between())
+
+    def __len__(self) -> int:
+        return len(self._stamps)
+
+
+class TimeRange:
+    """The IDs of a TimeIndex created within one time range.
+
+    Iterating costs O(k) for k entries in the range and membership checks
+    are O(1), so the range can drive a query or be probed by one. len() is
+    O(1) too, and exact until todos are removed; after that it is an upper
+    bound, off by at most the dead entries, which compaction keeps below
+    the live ones. That is all QueryPlan needs to pick its driver.
+    """
+
+    def __init__(self, index: TimeIndex, lo: int, hi: int, start: Optional[int], end: Optional[int]):
+        self._times = index._times
+        self._ids = index._ids
+        self._stamps = index._stamps
+        self._lo = lo
+        self._hi = hi
+        self._start = start
+        self._end = end
+
+    def _live(self, positions: Iterable[int]) -> Iterator[int]:
+        times, ids, stamps = self._times, self._ids, self._stamps
+        for position in positions:
+            todo_id = ids[position]
+            if stamps.get(todo_id) == times[position]:
+                yield todo_id
+
+    def __iter__(self) -> Iterator[int]:
+        return self._live(range(self._lo, self._hi))
+
+    def __reversed__(self) -> Iterator[int]:
+        return self._live(range(self._hi - 1, self._lo - 1, -1))
+
+    def __contains__(self, todo_id: object) -> bool:
+        timestamp = self._stamps.get(todo_id)
+        return (timestamp is not None and (self._start is None or timestamp >= self._start)
+                and (self._end is None or timestamp < self._end))
+
+    def __len__(self) -> int:
+        # Exact when there are no dead entries, since every position in the range is then live
+        return min(self._hi - self._lo, len(self._stamps))
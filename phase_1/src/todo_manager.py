@@ -1,167 +1,609 @@
-from datetime import datetime
-from typing import List, Dict, Optional
+import sys
+from itertools import chain, islice
+from typing import Any, Callable, Iterable, Iterator, List, Dict, Optional, Tuple
+from todo_index import SecondaryIndex, TimeIndex
+from text_index import TextIndex
+from todo_record import TodoRecord, intern_tags, now_timestamp
+from todo_views import TodoSequence
+from todo_query import SORT_KEYS, IdSource, QueryPlan
+from persistence import TodoJournal
+from instrumentation import Instrumentation, counted
 
 
-class TodoManager:
-    """Manages todo items with in-memory storage (volatile)."""
+STATUSES = ["pending", "completed"]
+PRIORITIES = ["high", "medium", "low"]
+
+
+class BatchResult:
+    """Outcome of a bulk operation, with per-item failures instead of an exception."""
 
     def __init__(self):
-        # Initialize empty in-memory storage
-        self.todos: List[Dict] = []
+        # IDs for ID-based operations, new records for add_many
+        self.succeeded: List[Any] = []
+        # (ID or batch position, error message) for every item that was rejected
+        self.failed: List[Tuple[Any, str]] = []
+
+    @property
+    def ok(self) -> bool:
+        """True when every item in the batch succeeded."""
+        return not self.failed
+
+    def __repr__(self) -> str:
+        return f"BatchResult(succeeded={len(self.succeeded)}, failed={self.failed!r})"
+
+
+class TodoManager:
+    """Manages todo items in memory, optionally made durable with an operation log.
+
+    Without a storage_path the todos are volatile. With one, every mutation
+    is appended to a log in that directory and the state is restored from
+    the latest snapshot plus the log on the next start.
+    """
+
+    def __init__(self, verify_indexes: bool = False, fuzzy: bool = False,
+                 storage_path: Optional[str] = None, snapshot_every: int = 1000,
+                 instrument: bool = False):
+        # Initialize empty in-memory storage keyed by ID (dicts keep insertion order)
+        self.todos: Dict[int, TodoRecord] = {}
         self.next_id: int = 1
 
+        # Secondary indexes kept up to date by every mutation
+        self._status_index = SecondaryIndex(STATUSES)
+        self._priority_index = SecondaryIndex(PRIORITIES)
+        self._tag_index = SecondaryIndex()
+        self._text_index = TextIndex()
+        self._time_index = TimeIndex()
+        if fuzzy:
+            # Optional trigram index for typo-tolerant search
+            self._text_index.enable_fuzzy()
+
+        # When enabled, every mutation re-checks the indexes (meant for tests)
+        self.verify_indexes = verify_indexes
+
+        self._journal: Optional[TodoJournal] = None
+        if storage_path is not None:
+            self._restore(TodoJournal(storage_path, snapshot_every))
+
+        # Opt-in per-method timing; when disabled the methods are not wrapped at all
+        self._instrumentation: Optional[Instrumentation] = None
+        if instrument:
+            self.enable_instrumentation()
+
+    def _restore(self, journal: TodoJournal) -> None:
+        """Loads the latest snapshot, replays the log tail and starts logging to journal."""
+        try:
+            snapshot, operations = journal.load()
+        except Exception:
+            # Release the store's lock: this manager will never use it
+            journal.close()
+            raise
+        if snapshot is not None:
+            for row in snapshot['todos']:
+                self._store_todo(TodoRecord.from_row(row))
+            self.next_id = max(self.next_id, snapshot['next_id'])
+
+        # Replayed operations go through the same internals, with logging still off
+        for operation in operations:
+            kind = operation['op']
+            if kind == "add":
+                self._store_todo(TodoRecord.from_row(operation['todo']))
+            elif kind == "complete":
+                self._complete_todo(operation['id'])
+            elif kind == "delete":
+                self._delete_todo(operation['id'])
+            elif kind == "update":
+                self._update_todo(operation['id'], operation['changes'])
+            elif kind == "priority":
+                self._set_priority(operation['id'], operation['priority'])
+            elif kind == "tags":
+                self._add_tags(operation['id'], intern_tags(operation['tags']))
+            elif kind == "rename_tag":
+                self._rename_tag(operation['old'], sys.intern(operation['new']))
+            elif kind == "delete_tag":
+                self._delete_tag(operation['tag'])
+            else:
+                raise ValueError(f"Unknown operation in log: {kind}")
+        self._journal = journal
+        self._after_mutation()
+
+    def _log(self, operation: Dict) -> None:
+        """Appends a mutation to the operation log, compacting it when it has grown enough."""
+        if self._journal is None:
+            return
+        self._journal.append(operation)
+        if self._journal.needs_snapshot:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Writes a snapshot of all todos and starts a new, empty operation log."""
+        if self._journal is None:
+            raise ValueError("Checkpoints need a TodoManager created with a storage_path")
+        self._journal.write_snapshot({
+            "next_id": self.next_id,
+            "todos": [todo.to_row() for todo in self.todos.values()]
+        })
+
+    def close(self) -> None:
+        """Closes the operation log, if there is one, and releases the store for other managers."""
+        if self._journal is not None:
+            self._journal.close()
+
+    def enable_instrumentation(self) -> Instrumentation:
+        """Starts recording call counts, latency, items returned and todos scanned for the public methods."""
+        if self._instrumentation is None:
+            self._instrumentation = Instrumentation()
+            self._instrumentation.install(self)
+        return self._instrumentation
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Returns per-method stats, slowest cumulative time first (empty unless instrumented)."""
+        if self._instrumentation is None:
+            return {}
+        return self._instrumentation.stats()
+
     def get_next_id(self) -> int:
         """Gets the next available ID."""
-        current_max_id = max([todo.get('id', 0) for todo in self.todos], default=0)
-        return current_max_id + 1
+        return self.next_id
 
-    def add_todo(self, task: str, description: str = "", priority: str = "medium", tags: Optional[List[str]] = None) -> Dict:
+    def _allocate_id(self) -> int:
+        """Hands out the next ID; IDs are never reused, even after deletes."""
+        new_id = self.next_id
+        self.next_id += 1
+        return new_id
+
+    def _get_todo(self, todo_id: int) -> TodoRecord:
+        """Looks up the stored todo for an ID or raises if it does not exist."""
+        todo = self.todos.get(todo_id)
+        if todo is None:
+            raise ValueError(f"Todo with ID {todo_id} not found")
+        return todo
+
+    def _index_todo(self, todo: TodoRecord) -> None:
+        """Adds a todo to all secondary indexes."""
+        todo_id = todo.id
+        self._status_index.add(todo.status, todo_id)
+        self._priority_index.add(todo.priority, todo_id)
+        for tag in todo.tags:
+            self._tag_index.add(tag, todo_id)
+        self._text_index.add(todo_id, self._searchable_text(todo))
+        self._time_index.add(todo.created_at, todo_id)
+
+    def _unindex_todo(self, todo: TodoRecord) -> None:
+        """Removes a todo from all secondary indexes."""
+        todo_id = todo.id
+        self._status_index.discard(todo.status, todo_id)
+        self._priority_index.discard(todo.priority, todo_id)
+        for tag in todo.tags:
+            self._tag_index.discard(tag, todo_id)
+        self._text_index.remove(todo_id)
+        self._time_index.discard(todo_id)
+
+    @staticmethod
+    def _searchable_text(todo: TodoRecord) -> str:
+        """Returns the text the full-text index covers for a todo."""
+        return f"{todo.task} {todo.description}"
+
+    def _after_mutation(self) -> None:
+        """Runs the optional index consistency check after a mutation."""
+        if self.verify_indexes:
+            self.check_indexes()
+
+    def check_indexes(self) -> None:
+        """Rebuilds the secondary indexes from scratch and compares them with the live ones."""
+        expected = {"status": {}, "priority": {}, "tag": {}}
+        for todo_id, todo in self.todos.items():
+            expected["status"].setdefault(todo.status, set()).add(todo_id)
+            expected["priority"].setdefault(todo.priority, set()).add(todo_id)
+            for tag in todo.tags:
+                expected["tag"].setdefault(tag, set()).add(todo_id)
+
+        actual = {
+            "status": self._status_index.as_sets(),
+            "priority": self._priority_index.as_sets(),
+            "tag": self._tag_index.as_sets(),
+        }
+        for name in expected:
+            if expected[name] != actual[name]:
+                raise AssertionError(f"{name} index is out of sync: expected {expected[name]}, found {actual[name]}")
+
+        if self._text_index.ids() != set(self.todos):
+            raise AssertionError("text index is out of sync with the stored todos")
+        created_ids = list(self._time_index.between())
+        if len(created_ids) != len(self.todos) or set(created_ids) != set(self.todos):
+            raise AssertionError("time index is out of sync with the stored todos")
+        created = [self.todos[todo_id].created_at for todo_id in created_ids]
+        if created != sorted(created):
+            raise AssertionError("time index is not in creation order")
+
+    def add_todo(self, task: str, description: str = "", priority: str = "medium", tags: Optional[List[str]] = None) -> TodoRecord:
         """Adds a new todo item."""
         if not task.strip():
             raise ValueError("Task title cannot be empty")
         
-        if priority not in ["high", "medium", "low"]:
+        if priority not in PRIORITIES:
             raise ValueError("Priority must be 'high', 'medium', or 'low'")
         
         if tags is None:
             tags = []
 
-        new_id = self.get_next_id()
+        new_todo = self._insert_todo(task.strip(), description.strip(), priority, intern_tags(tags))
+        self._after_mutation()
 
-        new_todo = {
-            "id": new_id,
-            "task": task.strip(),
-            "description": description.strip(),
-            "status": "pending",
-            "priority": priority,
-            "tags": tags,
-            "created_at": datetime.now().isoformat()
-        }
-
-        self.todos.append(new_todo)
+        return new_todo
 
+    def _insert_todo(self, task: str, description: str, priority: str, tags: Tuple[str, ...]) -> TodoRecord:
+        """Creates, stores and logs an already validated todo."""
+        new_todo = TodoRecord(self._allocate_id(), task, description, "pending", priority, tags, now_timestamp())
+        self._store_todo(new_todo)
+        self._log({"op": "add", "todo": new_todo.to_row()})
         return new_todo
 
-    def list_todos(self) -> List[Dict]:
-        """Returns all todos."""
-        return self.todos.copy()  # Return a copy to prevent external modification
+    def _store_todo(self, todo: TodoRecord) -> None:
+        """Stores and indexes a todo record, keeping the ID allocator ahead of it."""
+        self.todos[todo.id] = todo
+        self._index_todo(todo)
+        if todo.id >= self.next_id:
+            self.next_id = todo.id + 1
+
+    def list_todos(self) -> TodoSequence:
+        """Returns a live, read-only view of all todos in insertion order."""
+        return TodoSequence(self.todos)
+
+    def snapshot(self) -> List[Dict]:
+        """Returns independent dict copies of all todos, for callers that need to modify them."""
+        return [todo.to_dict() for todo in self.todos.values()]
 
     def complete_todo(self, todo_id: int) -> bool:
         """Marks a todo as completed."""
-        for todo in self.todos:
-            if todo['id'] == todo_id:
-                if todo['status'] == 'completed':
-                    raise ValueError(f"Todo with ID {todo_id} is already completed")
+        self._complete_todo(todo_id)
+        self._after_mutation()
+        return True
 
-                todo['status'] = 'completed'
-                return True
+    def _complete_todo(self, todo_id: int) -> None:
+        """Completes a todo without running the post-mutation checks."""
+        todo = self._get_todo(todo_id)
+        if todo.status == 'completed':
+            raise ValueError(f"Todo with ID {todo_id} is already completed")
 
-        raise ValueError(f"Todo with ID {todo_id} not found")
+        self._status_index.discard(todo.status, todo_id)
+        self.todos[todo_id] = todo.replace(status='completed')
+        self._status_index.add('completed', todo_id)
+        self._log({"op": "complete", "id": todo_id})
 
     def delete_todo(self, todo_id: int) -> bool:
         """Deletes a specified todo."""
-        for i, todo in enumerate(self.todos):
-            if todo['id'] == todo_id:
-                del self.todos[i]
-                return True
+        self._delete_todo(todo_id)
+        self._after_mutation()
+        return True
 
-        raise ValueError(f"Todo with ID {todo_id} not found")
+    def _delete_todo(self, todo_id: int) -> None:
+        """Deletes a todo without running the post-mutation checks."""
+        todo = self._get_todo(todo_id)
+        self._unindex_todo(todo)
+        del self.todos[todo_id]
+        self._log({"op": "delete", "id": todo_id})
 
     def update_todo(self, todo_id: int, new_task: Optional[str] = None, new_description: Optional[str] = None) -> bool:
         """Updates an existing todo's task title and/or description."""
-        for todo in self.todos:
-            if todo['id'] == todo_id:
-                if new_task is not None:
-                    if not new_task.strip():
-                        raise ValueError("Task title cannot be empty")
-                    todo['task'] = new_task.strip()
+        todo = self._get_todo(todo_id)
+        changes = {}
+        if new_task is not None:
+            if not new_task.strip():
+                raise ValueError("Task title cannot be empty")
+            changes['task'] = new_task.strip()
 
-                if new_description is not None:
-                    todo['description'] = new_description.strip()
+        if new_description is not None:
+            changes['description'] = new_description.strip()
 
-                return True
+        if changes:
+            self._update_todo(todo_id, changes)
+        self._after_mutation()
+        return True
 
-        raise ValueError(f"Todo with ID {todo_id} not found")
+    def _update_todo(self, todo_id: int, changes: Dict[str, str]) -> None:
+        """Applies validated task/description changes and reindexes the text."""
+        todo = self.todos[todo_id] = self._get_todo(todo_id).replace(**changes)
+        self._text_index.add(todo_id, self._searchable_text(todo))
+        self._log({"op": "update", "id": todo_id, "changes": changes})
 
     def set_priority(self, todo_id: int, priority: str) -> bool:
         """Sets priority for a specific todo."""
-        if priority not in ["high", "medium", "low"]:
+        if priority not in PRIORITIES:
             raise ValueError("Priority must be 'high', 'medium', or 'low'")
-            
-        for todo in self.todos:
-            if todo['id'] == todo_id:
-                todo['priority'] = priority
-                return True
 
-        raise ValueError(f"Todo with ID {todo_id} not found")
+        self._set_priority(todo_id, priority)
+        self._after_mutation()
+        return True
+
+    def _set_priority(self, todo_id: int, priority: str) -> None:
+        """Sets a validated priority without running the post-mutation checks."""
+        todo = self._get_todo(todo_id)
+        self._priority_index.discard(todo.priority, todo_id)
+        self.todos[todo_id] = todo.replace(priority=priority)
+        self._priority_index.add(priority, todo_id)
+        self._log({"op": "priority", "id": todo_id, "priority": priority})
 
     def add_tags(self, todo_id: int, tags: List[str]) -> bool:
         """Adds tags to a specific todo."""
-        for todo in self.todos:
-            if todo['id'] == todo_id:
-                # Add new tags without duplicates
-                for tag in tags:
-                    if tag not in todo['tags']:
-                        todo['tags'].append(tag)
-                return True
-
-        raise ValueError(f"Todo with ID {todo_id} not found")
-
-    def get_todo_by_id(self, todo_id: int) -> Dict:
-        """Retrieves a specific todo by ID."""
-        for todo in self.todos:
-            if todo['id'] == todo_id:
-                return todo.copy()  # Return a copy to prevent external modification
-
-        raise ValueError(f"Todo with ID {todo_id} not found")
-
-    def search_todos(self, keyword: str) -> List[Dict]:
-        """Searches todos by keyword in task or description."""
-        keyword_lower = keyword.lower()
-        results = []
-        
-        for todo in self.todos:
-            if (keyword_lower in todo['task'].lower() or 
-                keyword_lower in todo['description'].lower()):
-                results.append(todo.copy())
-                
-        return results
-
-    def filter_todos(self, filter_type: str, filter_value: str) -> List[Dict]:
-        """Filters todos by status, priority, or tag."""
-        results = []
-        
+        self._add_tags(todo_id, intern_tags(tags))
+        self._after_mutation()
+        return True
+
+    def _add_tags(self, todo_id: int, tags: Tuple[str, ...]) -> None:
+        """Adds interned tags to a todo without running the post-mutation checks."""
+        todo = self._get_todo(todo_id)
+        # Add new tags without duplicates, checking membership against a set
+        existing = set(todo.tags)
+        new_tags = tuple(tag for tag in tags if tag not in existing)
+        if new_tags:
+            self.todos[todo_id] = todo.replace(tags=todo.tags + new_tags)
+            for tag in new_tags:
+                self._tag_index.add(tag, todo_id)
+            self._log({"op": "tags", "id": todo_id, "tags": list(new_tags)})
+
+    def list_tags(self) -> Dict[str, int]:
+        """Returns every tag in use with the number of todos carrying it, most used first."""
+        counts = {tag: self._tag_index.count(tag) for tag in self._tag_index.keys()}
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+    def rename_tag(self, old_tag: str, new_tag: str) -> int:
+        """Renames a tag on every todo carrying it and returns how many todos changed."""
+        if not self._tag_index.count(old_tag):
+            raise ValueError(f"Tag '{old_tag}' not found")
+        new_tag = new_tag.strip()
+        if not new_tag:
+            raise ValueError("New tag name cannot be empty")
+        changed = self._rename_tag(old_tag, sys.intern(new_tag))
+        self._log({"op": "rename_tag", "old": old_tag, "new": new_tag})
+        self._after_mutation()
+        return changed
+
+    def _rename_tag(self, old_tag: str, new_tag: str) -> int:
+        """Renames a tag through the tag index, touching only the todos that carry it."""
+        if old_tag == new_tag:
+            return 0
+        todo_ids = list(self._tag_index.ids(old_tag))
+        for todo_id in todo_ids:
+            todo = self.todos[todo_id]
+            # A todo that already has new_tag keeps a single copy of it
+            self.todos[todo_id] = todo.replace(tags=intern_tags(new_tag if tag == old_tag else tag for tag in todo.tags))
+            self._tag_index.discard(old_tag, todo_id)
+            self._tag_index.add(new_tag, todo_id)
+        return len(todo_ids)
+
+    def delete_tag(self, tag: str) -> int:
+        """Removes a tag from every todo carrying it and returns how many todos changed."""
+        if not self._tag_index.count(tag):
+            raise ValueError(f"Tag '{tag}' not found")
+        changed = self._delete_tag(tag)
+        self._log({"op": "delete_tag", "tag": tag})
+        self._after_mutation()
+        return changed
+
+    def _delete_tag(self, tag: str) -> int:
+        """Removes a tag through the tag index, touching only the todos that carry it."""
+        todo_ids = list(self._tag_index.ids(tag))
+        for todo_id in todo_ids:
+            todo = self.todos[todo_id]
+            self.todos[todo_id] = todo.replace(tags=tuple(t for t in todo.tags if t != tag))
+            self._tag_index.discard(tag, todo_id)
+        return len(todo_ids)
+
+    def add_many(self, items: Iterable[Dict]) -> "BatchResult":
+        """Adds many todos in one pass.
+
+        Each item is a dict with a "task" and optional "description",
+        "priority" and "tags" (a list of strings, or one string for a single
+        tag). Invalid items, including fields of the wrong type, are reported
+        by their position in the batch and do not stop the rest from being added.
+        """
+        result = BatchResult()
+        for position, item in enumerate(items):
+            try:
+                task, description, priority, tags = self._parse_item(item)
+            except ValueError as e:
+                result.failed.append((position, str(e)))
+            else:
+                result.succeeded.append(self._insert_todo(task, description, priority, tags))
+        self._after_mutation()
+        return result
+
+    @staticmethod
+    def _parse_item(item: Any) -> Tuple[str, str, str, Tuple[str, ...]]:
+        """Validates an add_many() item, returning its task, description, priority and tags."""
+        if not isinstance(item, dict):
+            raise ValueError("Each todo must be an object with a task")
+        task = item.get('task') or ""
+        description = item.get('description') or ""
+        priority = item.get('priority', "medium")
+        tags = item.get('tags') or []
+        if not isinstance(task, str) or not isinstance(description, str):
+            raise ValueError("Task title and description must be text")
+        if not task.strip():
+            raise ValueError("Task title cannot be empty")
+        if not isinstance(priority, str) or priority not in PRIORITIES:
+            raise ValueError("Priority must be 'high', 'medium', or 'low'")
+        if isinstance(tags, str):
+            tags = [tags]
+        elif not isinstance(tags, (list, tuple)) or not all(isinstance(tag, str) for tag in tags):
+            raise ValueError("Tags must be a list of strings")
+        return task.strip(), description.strip(), priority, intern_tags(tags)
+
+    def complete_many(self, todo_ids: Iterable[int]) -> "BatchResult":
+        """Marks many todos as completed, reporting the IDs that could not be completed."""
+        return self._apply_many(self._complete_todo, todo_ids)
+
+    def delete_many(self, todo_ids: Iterable[int]) -> "BatchResult":
+        """Deletes many todos, reporting the IDs that could not be deleted."""
+        return self._apply_many(self._delete_todo, todo_ids)
+
+    def tag_many(self, todo_ids: Iterable[int], tags: List[str]) -> "BatchResult":
+        """Adds the same tags to many todos, reporting the IDs that could not be tagged."""
+        interned = intern_tags(tags)
+        return self._apply_many(lambda todo_id: self._add_tags(todo_id, interned), todo_ids)
+
+    def _apply_many(self, operation: Callable[[int], None], todo_ids: Iterable[int]) -> "BatchResult":
+        """Applies a single-ID operation to each ID, collecting failures instead of raising."""
+        result = BatchResult()
+        for todo_id in todo_ids:
+            try:
+                operation(todo_id)
+            except ValueError as e:
+                result.failed.append((todo_id, str(e)))
+            else:
+                result.succeeded.append(todo_id)
+        self._after_mutation()
+        return result
+
+    def get_todo_by_id(self, todo_id: int) -> TodoRecord:
+        """Retrieves a specific todo by ID as a read-only record."""
+        return self._get_todo(todo_id)
+
+    def _page(self, todo_ids: Iterable[int], offset: int, limit: Optional[int]) -> Iterator[TodoRecord]:
+        """Lazily maps a slice of an ID stream to records; nothing past the slice is read."""
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("Offset and limit must not be negative")
+        stop = None if limit is None else offset + limit
+        return map(self.todos.__getitem__, islice(counted(todo_ids), offset, stop))
+
+    def iter_todos(self, offset: int = 0, limit: Optional[int] = None) -> Iterator[TodoRecord]:
+        """Lazily yields todos in insertion order."""
+        return self._page(self.todos.keys(), offset, limit)
+
+    def iter_search(self, keyword: str, mode: str = "and", fuzzy: bool = False,
+                    offset: int = 0, limit: Optional[int] = None) -> Iterator[TodoRecord]:
+        """Lazily yields search results, best match first; see search_todos."""
+        if not keyword.strip():
+            # An empty keyword matches everything, as the plain substring search did
+            return self.iter_todos(offset, limit)
+
+        # Ranking needs every match scored, but only the requested page is fully ordered
+        top = None if limit is None else offset + limit
+        if fuzzy:
+            ranked = self._text_index.fuzzy_search(keyword, mode, limit=top)
+        else:
+            ranked = self._text_index.search(keyword, mode, limit=top)
+        return self._page((todo_id for todo_id, _ in ranked), offset, limit)
+
+    def iter_filter(self, filter_type: str, filter_value: str,
+                    offset: int = 0, limit: Optional[int] = None) -> Iterator[TodoRecord]:
+        """Lazily yields todos matching a status, priority, or tag filter."""
         if filter_type == "status":
-            if filter_value not in ["pending", "completed"]:
+            if filter_value not in STATUSES:
                 raise ValueError("Status must be 'pending' or 'completed'")
-            results = [todo for todo in self.todos if todo['status'] == filter_value]
+            ids = self._status_index.ids(filter_value)
         elif filter_type == "priority":
-            if filter_value not in ["high", "medium", "low"]:
+            if filter_value not in PRIORITIES:
                 raise ValueError("Priority must be 'high', 'medium', or 'low'")
-            results = [todo for todo in self.todos if todo['priority'] == filter_value]
+            ids = self._priority_index.ids(filter_value)
         elif filter_type == "tag":
-            results = [todo for todo in self.todos if filter_value in todo['tags']]
+            ids = self._tag_index.ids(filter_value)
         else:
             raise ValueError("Filter type must be 'status', 'priority', or 'tag'")
-            
-        return results
 
-    def sort_todos(self, sort_type: str) -> List[Dict]:
-        """Sorts todos by priority or ID."""
+        # Only the matching todos are touched, so the cost is O(result size)
+        return self._page(ids, offset, limit)
+
+    def iter_created(self, start: Optional[int] = None, end: Optional[int] = None,
+                     offset: int = 0, limit: Optional[int] = None) -> Iterator[TodoRecord]:
+        """Lazily yields todos created in [start, end), oldest first.
+
+        Bounds are microsecond timestamps (see todo_record.to_timestamp) and
+        either may be None for an open range. The range is located by binary
+        search, so the cost is O(log n) plus the todos produced.
+        """
+        return self._page(self._time_index.between(start, end), offset, limit)
+
+    def iter_sorted(self, sort_type: str, offset: int = 0, limit: Optional[int] = None) -> Iterator[TodoRecord]:
+        """Lazily yields todos by priority or ID without sorting the collection."""
+        return self._page(self._sorted_ids(sort_type), offset, limit)
+
+    def search_todos(self, keyword: str, mode: str = "and", fuzzy: bool = False) -> List[TodoRecord]:
+        """Searches todos by keyword in task or description, best matches first.
+
+        Every word in the keyword matches indexed words by prefix, or by
+        trigram similarity when fuzzy is set. With mode "and" a todo must
+        match all words, with mode "or" any of them.
+        """
+        return list(self.iter_search(keyword, mode, fuzzy))
+
+    def filter_todos(self, filter_type: str, filter_value: str) -> List[TodoRecord]:
+        """Filters todos by status, priority, or tag."""
+        return list(self.iter_filter(filter_type, filter_value))
+
+    def created_between(self, start: Optional[int] = None, end: Optional[int] = None) -> List[TodoRecord]:
+        """Returns the todos created in [start, end), oldest first."""
+        return list(self.iter_created(start, end))
+
+    def newest(self, n: int) -> List[TodoRecord]:
+        """Returns the n most recently created todos, newest first."""
+        return list(self._page(self._time_index.newest(), 0, n))
+
+    def _sorted_ids(self, sort_type: str) -> Iterable[int]:
+        """Returns a lazy ordered view of todo IDs without sorting the collection."""
         if sort_type == "priority":
-            # Define priority order: high > medium > low
-            priority_order = {"high": 3, "medium": 2, "low": 1}
-            sorted_todos = sorted(self.todos, 
-                                  key=lambda x: priority_order[x['priority']], 
-                                  reverse=True)  # High to low priority
+            # Priority buckets from high to low, each kept in ID order
+            return chain.from_iterable(self._priority_index.ids(priority) for priority in PRIORITIES)
         elif sort_type == "id":
-            sorted_todos = sorted(self.todos, 
-                                  key=lambda x: x['id'])  # Ascending by ID
+            # IDs are allocated monotonically, so insertion order is ascending ID order
+            return self.todos.keys()
         else:
             raise ValueError("Sort type must be 'priority' or 'id'")
-            
-        return sorted_todos
+
+    def sort_todos(self, sort_type: str) -> List[TodoRecord]:
+        """Sorts todos by priority or ID."""
+        return list(self.iter_sorted(sort_type))
+
+    def top_n(self, sort_type: str, n: int) -> List[TodoRecord]:
+        """Returns the first n todos of sort_todos(sort_type) in O(n)."""
+        if n < 0:
+            raise ValueError("The number of todos must not be negative")
+        return list(self.iter_sorted(sort_type, limit=n))
+
+    def plan_query(self, status: Optional[str] = None, priority: Optional[str] = None, tag: Optional[str] = None,
+                   text: Optional[str] = None, mode: str = "and", sort: str = "id",
+                   offset: int = 0, limit: Optional[int] = None,
+                   since: Optional[int] = None, until: Optional[int] = None) -> QueryPlan:
+        """Builds the execution plan for query() without running it."""
+        if sort not in SORT_KEYS:
+            raise ValueError("Sort type must be 'id', 'priority' or 'relevance'")
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("Offset and limit must not be negative")
+
+        sources = []
+        if status is not None:
+            if status not in STATUSES:
+                raise ValueError("Status must be 'pending' or 'completed'")
+            sources.append(IdSource(f"status={status}", self._status_index.ids(status), ordered=True))
+        if priority is not None:
+            if priority not in PRIORITIES:
+                raise ValueError("Priority must be 'high', 'medium', or 'low'")
+            sources.append(IdSource(f"priority={priority}", self._priority_index.ids(priority), ordered=True))
+        if tag is not None:
+            sources.append(IdSource(f"tag={tag}", self._tag_index.ids(tag), ordered=True))
+        if text is not None and text.strip():
+            ranks = {todo_id: rank for rank, (todo_id, _) in enumerate(self._text_index.search(text, mode))}
+            sources.append(IdSource(f"text={text!r}", ranks, ordered=False, ranked=True))
+        elif sort == "relevance":
+            raise ValueError("Sorting by relevance requires a search text")
+        if since is not None or until is not None:
+            sources.append(IdSource("created", self._time_index.between(since, until), ordered=False))
+
+        buckets = [self._priority_index.ids(level) for level in PRIORITIES] if sort == "priority" else []
+        return QueryPlan(self.todos, sources, sort, buckets, offset, limit)
+
+    def query(self, status: Optional[str] = None, priority: Optional[str] = None, tag: Optional[str] = None,
+              text: Optional[str] = None, mode: str = "and", sort: str = "id",
+              offset: int = 0, limit: Optional[int] = None,
+              since: Optional[int] = None, until: Optional[int] = None) -> Iterator[TodoRecord]:
+        """Lazily yields the todos matching all given criteria.
+
+        Predicates are answered from the indexes, starting with the most
+        selective one, and only the requested page is produced. Do not
+        modify the manager while consuming the iterator.
+        """
+        return self.plan_query(status, priority, tag, text, mode, sort, offset, limit, since, until).execute()
 
 
 # The example usage in main() has been removed since this is now a module
-# To test functionality, run the CLI from main.py
\ No newline at end of file
+# To test functionality, run the CLI from main.py
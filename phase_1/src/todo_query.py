@@ -0,0 +1,95 @@
+from itertools import islice
+from typing import Collection, Dict, Iterable, Iterator, List, Optional
+from todo_record import TodoRecord
+from instrumentation import counted
+
+
+SORT_KEYS = ["id", "priority", "relevance"]
+
+
+class IdSource:
+    """IDs matching one query predicate, as served by an index."""
+
+    def __init__(self, name: str, ids: Collection[int], ordered: bool, ranked: bool = False):
+        self.name = name
+        self.ids = ids
+        # Whether iterating ids yields them in ascending ID order
+        self.ordered = ordered
+        # Whether ids is a dict of ID -> rank in relevance order (the text source)
+        self.ranked = ranked
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class QueryPlan:
+    """Execution plan for TodoManager.query.
+
+    The most selective predicate drives the scan and the others are only
+    used for O(1) membership checks, so the work is proportional to the
+    smallest matching ID set rather than to the whole collection.
+    """
+
+    def __init__(self, store: Dict[int, TodoRecord], sources: List[IdSource], sort: str,
+                 priority_buckets: List[Collection[int]], offset: int = 0, limit: Optional[int] = None):
+        self._store = store
+        self._sources = sorted(sources, key=len)
+        self._sort = sort
+        self._priority_buckets = priority_buckets
+        self._offset = offset
+        self._limit = limit
+
+    @property
+    def driver(self) -> Optional[IdSource]:
+        """The predicate whose IDs are scanned, or None when nothing is filtered."""
+        return self._sources[0] if self._sources else None
+
+    def describe(self) -> str:
+        """Returns a one-line, human-readable summary of the plan."""
+        if self.driver is None:
+            steps = ["scan all todos"]
+        else:
+            steps = [f"scan {self.driver.name} ({len(self.driver)} ids)"]
+            steps += [f"probe {source.name} ({len(source)} ids)" for source in self._sources[1:]]
+        steps.append(f"order by {self._sort}")
+        if self._offset or self._limit is not None:
+            steps.append(f"skip {self._offset} take {'all' if self._limit is None else self._limit}")
+        return ", ".join(steps)
+
+    def _matches(self, todo_id: int, sources: Iterable[IdSource]) -> bool:
+        return all(todo_id in source.ids for source in sources)
+
+    def _ordered_ids(self) -> Iterator[int]:
+        """Yields matching IDs in the requested order, as lazily as the order allows."""
+        driver = self.driver
+        probes = self._sources[1:]
+
+        if self._sort == "priority":
+            for bucket in self._priority_buckets:
+                if driver is None or len(bucket) <= len(driver):
+                    # Walking the bucket is cheaper and already in ID order
+                    yield from (todo_id for todo_id in counted(bucket) if self._matches(todo_id, self._sources))
+                else:
+                    yield from sorted(todo_id for todo_id in counted(driver.ids)
+                                      if todo_id in bucket and self._matches(todo_id, probes))
+        elif driver is None:
+            # IDs are allocated monotonically, so the store is already in ID order
+            yield from counted(self._store)
+        elif self._sort == "relevance":
+            # The text source maps each ID to its rank
+            ranked = next(source for source in self._sources if source.ranked)
+            if ranked is driver:
+                yield from (todo_id for todo_id in counted(ranked.ids) if self._matches(todo_id, probes))
+            else:
+                yield from sorted((todo_id for todo_id in counted(driver.ids) if self._matches(todo_id, probes)),
+                                  key=ranked.ids.__getitem__)
+        elif driver.ordered:
+            yield from (todo_id for todo_id in counted(driver.ids) if self._matches(todo_id, probes))
+        else:
+            yield from sorted(todo_id for todo_id in counted(driver.ids) if self._matches(todo_id, probes))
+
+    def execute(self) -> Iterator[TodoRecord]:
+        """Yields the matching todos for the requested page."""
+        stop = None if self._limit is None else self._offset + self._limit
+        for todo_id in islice(self._ordered_ids(), self._offset, stop):
+            yield self._store[todo_id]
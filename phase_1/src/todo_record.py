@@ -0,0 +1,132 @@
+import sys
+import time
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+
+def now_timestamp() -> int:
+    """Returns the current time as integer microseconds since the epoch."""
+    return time.time_ns() // 1000
+
+
+def format_timestamp(timestamp: int) -> str:
+    """Formats a microsecond timestamp as a local ISO string, like datetime.now().isoformat()."""
+    seconds, microseconds = divmod(timestamp, 1_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=microseconds).isoformat()
+
+
+def to_timestamp(moment: datetime) -> int:
+    """Converts a datetime (naive means local time) into integer microseconds since the epoch."""
+    return int(moment.replace(microsecond=0).timestamp()) * 1_000_000 + moment.microsecond
+
+
+def parse_timestamp(value: str) -> int:
+    """Parses a local ISO string back into integer microseconds since the epoch."""
+    return to_timestamp(datetime.fromisoformat(value))
+
+
+def intern_tags(tags: Iterable[str]) -> Tuple[str, ...]:
+    """Returns tags as a tuple of interned strings, dropping duplicates but keeping order."""
+    return tuple(sys.intern(tag) for tag in dict.fromkeys(tags))
+
+
+_set_field = object.__setattr__
+
+
+class TodoRecord(Mapping):
+    """Compact, read-only in-memory representation of a single todo.
+
+    Slots avoid a per-item __dict__, status, priority and tags are interned
+    so equal values share one string object, tags are a tuple and the
+    creation time is an integer. Records are frozen: the manager swaps in a
+    new record on every change, so handing one out needs no defensive copy.
+    They read like the legacy dict (todo['task']); use to_dict() or copy()
+    for a mutable dict.
+    """
+
+    __slots__ = ("id", "task", "description", "status", "priority", "tags", "created_at")
+
+    def __init__(self, todo_id: int, task: str, description: str, status: str, priority: str,
+                 tags: Tuple[str, ...], created_at: int):
+        _set_field(self, "id", todo_id)
+        _set_field(self, "task", task)
+        _set_field(self, "description", description)
+        _set_field(self, "status", sys.intern(status))
+        _set_field(self, "priority", sys.intern(priority))
+        _set_field(self, "tags", tags)
+        _set_field(self, "created_at", created_at)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("TodoRecord is read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("TodoRecord is read-only")
+
+    def __reduce__(self) -> Tuple[type, Tuple]:
+        # The default reconstruction sets the slots through __setattr__; go through __init__ instead
+        return TodoRecord, tuple(getattr(self, name) for name in self.__slots__)
+
+    def __copy__(self) -> "TodoRecord":
+        # Frozen, with immutable fields, so a record is its own copy
+        return self
+
+    def __deepcopy__(self, memo: Dict) -> "TodoRecord":
+        return self
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "created_at":
+            # Keep the legacy ISO string for dict-style access
+            return format_timestamp(self.created_at)
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def replace(self, **changes: Any) -> "TodoRecord":
+        """Returns a new record with the given fields changed."""
+        values = [changes.pop(name, getattr(self, name)) for name in self.__slots__]
+        if changes:
+            raise TypeError(f"Unknown todo fields: {', '.join(changes)}")
+        return TodoRecord(*values)
+
+    def to_dict(self) -> Dict:
+        """Returns the todo in the legacy dict format."""
+        return {
+            "id": self.id,
+            "task": self.task,
+            "description": self.description,
+            "status": self.status,
+            "priority": self.priority,
+            "tags": list(self.tags),
+            "created_at": format_timestamp(self.created_at)
+        }
+
+    def copy(self) -> Dict:
+        """Returns an independent, mutable dict copy of the todo."""
+        return self.to_dict()
+
+    def to_row(self) -> list:
+        """Returns the fields as a compact JSON-friendly list, in slot order."""
+        return [self.id, self.task, self.description, self.status, self.priority, list(self.tags), self.created_at]
+
+    @classmethod
+    def from_row(cls, row: list) -> "TodoRecord":
+        """Builds a record from a list produced by to_row()."""
+        todo_id, task, description, status, priority, tags, created_at = row
+        return cls(todo_id, task, description, status, priority, intern_tags(tags), created_at)
+
+    @classmethod
+    def from_dict(cls, todo: Dict) -> "TodoRecord":
+        """Builds a record from a legacy todo dict."""
+        return cls(todo['id'], todo['task'], todo.get('description', ""), todo.get('status', "pending"),
+                   todo.get('priority', "medium"), intern_tags(todo.get('tags', ())),
+                   parse_timestamp(todo['created_at']))
+
+    def __repr__(self) -> str:
+        return f"TodoRecord({self.to_dict()!r})"
@@ -0,0 +1,41 @@
+from collections.abc import Sequence
+from itertools import islice
+from typing import Dict, Iterator, List, Union
+from todo_record import TodoRecord
+
+
+class TodoSequence(Sequence):
+    """Live, read-only sequence view over the todo store.
+
+    Handing one out costs O(1): nothing is copied, and iteration walks the
+    store directly. Like dict views, the store must not be modified while
+    iterating; use TodoManager.snapshot() for an independent copy.
+    """
+
+    __slots__ = ("_store",)
+
+    def __init__(self, store: Dict[int, TodoRecord]):
+        self._store = store
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __iter__(self) -> Iterator[TodoRecord]:
+        return iter(self._store.values())
+
+    def __reversed__(self) -> Iterator[TodoRecord]:
+        return iter(list(self._store.values())[::-1])
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[TodoRecord, List[TodoRecord]]:
+        if isinstance(index, slice):
+            return list(self)[index]
+        size = len(self._store)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("todo index out of range")
+        # Positional access has to walk the store; iterate instead where possible
+        return next(islice(self._store.values(), index, None))
+
+    def __repr__(self) -> str:
+        return f"TodoSequence({list(self)!r})"
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Tests for the command-line front ends: the fast path and the full CLI
+"""
+import sys
+import os
+import io
+import subprocess
+import tempfile
+import time
+from contextlib import redirect_stdout
+from unittest import mock
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+import main
+import fast_cli
+from todo_manager import TodoManager
+from fast_cli import is_fast, run
+from daemon import SOCKET_NAME, is_listening
+
+CLI = os.path.join(os.path.dirname(__file__), 'src', 'fast_cli.py')
+
+
+def test_fast_path_accepts_only_plain_positional_commands():
+    """Commands with options, bad IDs or the wrong argument count go to the full CLI"""
+    assert is_fast(["add", "Buy milk"], plain=True)
+    assert is_fast(["add", "Buy milk", "From the shop"], plain=True)
+    assert is_fast(["complete", "1", "2", "3"], plain=True)
+    assert is_fast(["priority", "4", "high"], plain=True)
+    assert is_fast(["tag", "4", "home", "weekend"], plain=True)
+
+    assert not is_fast(["add", "Buy milk"], plain=False)  # Rich output needs the full CLI
+    assert not is_fast([], plain=True)
+    assert not is_fast(["list"], plain=True)
+    assert not is_fast(["add"], plain=True)
+    assert not is_fast(["add", "Buy milk", "From the shop", "extra"], plain=True)
+    assert not is_fast(["add", "Buy milk", "--priority", "high"], plain=True)
+    assert not is_fast(["delete", "one"], plain=True)
+    assert not is_fast(["delete", "1", "2"], plain=True)
+    assert not is_fast(["priority", "x", "high"], plain=True)
+    assert not is_fast(["complete", "--help"], plain=True)
+
+    previous = os.environ.get("TODO_FORMAT")
+    os.environ["TODO_FORMAT"] = "json"
+    try:
+        assert not is_fast(["add", "Buy milk"], plain=True)
+    finally:
+        if previous is None:
+            del os.environ["TODO_FORMAT"]
+        else:
+            os.environ["TODO_FORMAT"] = previous
+
+
+def test_fast_path_runs_commands_with_plain_output():
+    """run() prints what the full CLI prints and returns the exit code, or None to fall back"""
+    manager = TodoManager()
+    out = io.StringIO()
+    with redirect_stdout(out):
+        assert run(["add", "Buy milk", "From the shop"], manager, plain=True) == 0
+        assert run(["tag", "1", "home", "errands"], manager, plain=True) == 0
+        assert run(["priority", "1", "HIGH"], manager, plain=True) == 0
+        assert run(["complete", "1", "9"], manager, plain=True) == 1
+        assert run(["priority", "1", "urgent"], manager, plain=True) == 1
+        assert run(["delete", "1"], manager, plain=True) == 0
+    assert out.getvalue().splitlines() == [
+        "Added todo: Buy milk (ID: 1)",
+        "Priority: medium",
+        "Description: From the shop",
+        "Added tags home, errands to todo 1",
+        "Set priority to high for todo 1",
+        "Marked todo 1 as completed",
+        "Error: Todo with ID 9 not found",
+        "Error: Priority must be 'high', 'medium', or 'low'",
+        "Deleted todo 1",
+    ]
+    assert len(manager.list_todos()) == 0
+
+    # Nothing runs, and nothing is printed, for commands the full CLI has to handle
+    out = io.StringIO()
+    with redirect_stdout(out):
+        assert run(["list"], manager, plain=True) is None
+        assert run(["add", "Buy milk"], manager, plain=False) is None
+        assert run(["delete", "1", "--help"], manager, plain=True) is None
+    assert out.getvalue() == "" and len(manager.list_todos()) == 0
+
+
+def test_entry_point_falls_back_to_full_cli():
+    """The console script answers fast commands itself and hands the rest to Typer"""
+    with tempfile.TemporaryDirectory() as directory:
+        env = {key: value for key, value in os.environ.items() if key not in ("TODO_SOCKET", "TODO_FORMAT")}
+        env["TODO_STORE"] = directory
+
+        def cli(*args):
+            return subprocess.run([sys.executable, CLI, *args], env=env, capture_output=True, text=True)
+
+        added = cli("add", "Water plants")
+        assert added.returncode == 0 and added.stdout.startswith("Added todo: Water plants (ID: 1)")
+        listed = cli("list")
+        assert listed.returncode == 0 and "Water plants" in listed.stdout
+        invalid = cli("delete", "one")
+        # Typer reports the bad ID as a usage error
+        assert invalid.returncode == 2 and "one" in invalid.stderr
+        assert "Water plants" in cli("--format", "ndjson", "list").stdout
+
+
+def test_entry_point_asks_the_daemon_once():
+    """When the fast path falls back to the full CLI, the CLI does not try the daemon again"""
+    with mock.patch.object(sys, "argv", ["todo", "list"]), \
+            mock.patch.object(fast_cli, "forward_to_daemon", return_value=None) as first, \
+            mock.patch.object(main, "forward_to_daemon") as second, \
+            mock.patch.object(main, "app") as app:
+        fast_cli.main()
+    assert first.call_count == 1 and second.call_count == 0 and app.call_count == 1
+
+
+def test_daemon_resolves_paths_in_the_client_directory():
+    """A forwarded command reads relative paths from where the client runs, not the daemon"""
+    with tempfile.TemporaryDirectory() as directory:
+        env = {key: value for key, value in os.environ.items() if key not in ("TODO_SOCKET", "TODO_FORMAT")}
+        env["TODO_STORE"] = os.path.join(directory, "store")
+        work = os.path.join(directory, "work")
+        os.mkdir(work)
+        with open(os.path.join(work, "tasks.txt"), 'w', encoding='utf-8') as f:
+            f.write("Water plants\nFeed cat\n")
+
+        server = subprocess.Popen([sys.executable, CLI, "daemon"], env=env, cwd=os.path.dirname(directory),
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            socket_file = os.path.join(env["TODO_STORE"], SOCKET_NAME)
+            deadline = time.monotonic() + 10
+            while not is_listening(socket_file):
+                assert time.monotonic() < deadline and server.poll() is None, "the daemon did not start"
+                time.sleep(0.05)
+            added = subprocess.run([sys.executable, CLI, "add", "--from-file", "tasks.txt"], env=env, cwd=work,
+                                   capture_output=True, text=True)
+            assert added.returncode == 0, added.stderr
+            assert "Added 2 todos" in added.stdout
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def collect_pages(manager, answers=None, **options):
+    """Runs show_pages over manager's todos, returning its result, the pages' IDs and the fetches made.
+
+    With answers the terminal is treated as interactive and the prompt
+    returns them in turn; otherwise the output is a pipe.
+    """
+    pages, fetches = [], []
+
+    def fetch(offset, limit):
+        fetches.append((offset, limit))
+        return manager.iter_todos(offset, limit)
+
+    def show_page(todos, first):
+        pages.append([todo['id'] for todo in todos])
+
+    main.set_output(plain=True, file=io.StringIO())
+    try:
+        if answers is None:
+            return main.show_pages(fetch, show_page, **options), pages, fetches
+        with mock.patch.object(main, "is_interactive", return_value=True), \
+                mock.patch("rich.prompt.Prompt.ask", side_effect=answers) as ask:
+            shown = main.show_pages(fetch, show_page, **options)
+        # Every answer was used, each offered with only the moves that make sense
+        assert ask.call_count == len(answers)
+        return shown, pages, [call.kwargs["choices"] for call in ask.call_args_list], fetches
+    finally:
+        main.set_output(plain=True)
+
+
+def test_show_pages_streams_every_page_when_not_interactive():
+    """Piped output prints all pages from a single fetch, page_size todos at a time"""
+    manager = TodoManager()
+    manager.add_many({"task": f"Task {i}"} for i in range(7))
+    shown, pages, fetches = collect_pages(manager, page_size=3)
+    assert shown and pages == [[1, 2, 3], [4, 5, 6], [7]] and fetches == [(0, None)]
+
+    shown, pages, fetches = collect_pages(manager, page_size=3, limit=4)
+    assert pages == [[1, 2, 3], [4]] and fetches == [(0, 4)]
+    assert collect_pages(TodoManager(), page_size=3) == (False, [], [(0, None)])
+
+    # Split by status page by page, the sections would alternate, so streamed results are one table
+    manager.complete_many([2, 5])
+    out = io.StringIO()
+    with redirect_stdout(out):
+        main.set_output(plain=True)
+        main.show_pages(manager.iter_todos, main.status_table_pages("Results"), page_size=3)
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "Results" and lines[3].endswith("Completed")
+    assert [line.split("\t")[0] for line in lines[1:]] == ["ID", "1", "2", "3", "4", "5", "6", "7"]
+
+
+def test_show_pages_moves_between_pages_at_a_terminal():
+    """n and p fetch the next and previous page by offset, q stops, one page needs no prompt"""
+    manager = TodoManager()
+    manager.add_many({"task": f"Task {i}"} for i in range(7))
+    shown, pages, choices, fetches = collect_pages(manager, ["n", "n", "p", "q"], page_size=3)
+    assert shown and pages == [[1, 2, 3], [4, 5, 6], [7], [4, 5, 6]]
+    assert choices == [["n", "q"], ["n", "p", "q"], ["p", "q"], ["n", "p", "q"]]
+    # One todo past the page tells whether there is a next one
+    assert fetches == [(0, 4), (3, 4), (6, 4), (3, 4)]
+
+    shown, pages, choices, fetches = collect_pages(manager, ["n", "q"], page_size=3, limit=5)
+    assert pages == [[1, 2, 3], [4, 5]] and choices == [["n", "q"], ["p", "q"]]
+    assert fetches == [(0, 4), (3, 2)]
+
+    shown, pages, choices, _ = collect_pages(manager, [], page_size=10)
+    assert shown and pages == [[1, 2, 3, 4, 5, 6, 7]] and choices == []
+
+
+if __name__ == "__main__":
+    test_fast_path_accepts_only_plain_positional_commands()
+    test_fast_path_runs_commands_with_plain_output()
+    test_entry_point_falls_back_to_full_cli()
+    test_entry_point_asks_the_daemon_once()
+    test_daemon_resolves_paths_in_the_client_directory()
+    test_show_pages_streams_every_page_when_not_interactive()
+    test_show_pages_moves_between_pages_at_a_terminal()
+    print("All tests passed!")
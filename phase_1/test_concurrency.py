@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Stress test for ConcurrentTodoManager: many threads mixing reads and writes
+"""
+import random
+import sys
+import os
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+from concurrent_manager import ConcurrentTodoManager
+
+THREADS = 8
+OPERATIONS_PER_THREAD = 1500
+
+
+def worker(manager, seed, added_ids, errors):
+    """Runs a random mix of operations and records the IDs it added"""
+    rng = random.Random(seed)
+    try:
+        for i in range(OPERATIONS_PER_THREAD):
+            roll = rng.random()
+            if roll < 0.35:
+                todo = manager.add_todo(f"Task {seed}-{i}", priority=rng.choice(["high", "medium", "low"]),
+                                        tags=[rng.choice(["work", "home"])])
+                added_ids.append(todo['id'])
+            elif roll < 0.45 and added_ids:
+                manager.complete_many([rng.choice(added_ids)])
+            elif roll < 0.5 and added_ids:
+                manager.delete_many([added_ids.pop(rng.randrange(len(added_ids)))])
+            elif roll < 0.6:
+                manager.search_todos(f"task {seed}")
+            elif roll < 0.8:
+                for todo in manager.query(tag="work", status="pending", limit=20):
+                    assert todo['status'] == "pending"
+            else:
+                todos = manager.list_todos()
+                assert len({todo['id'] for todo in todos}) == len(todos)
+    except Exception as e:  # Surface failures from worker threads in the main thread
+        errors.append(e)
+
+
+def test_concurrent_mixed_workload():
+    """IDs stay unique and indexes consistent under concurrent mutation"""
+    manager = ConcurrentTodoManager()
+    added = [[] for _ in range(THREADS)]
+    errors = []
+    threads = [threading.Thread(target=worker, args=(manager, seed, added[seed], errors)) for seed in range(THREADS)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors, errors
+    surviving = [todo_id for ids in added for todo_id in ids]
+    assert len(surviving) == len(set(surviving))  # No ID was handed out twice
+    assert sorted(surviving) == [todo['id'] for todo in manager.list_todos()]
+    manager.check_indexes()
+
+
+if __name__ == "__main__":
+    test_concurrent_mixed_workload()
+    print("All tests passed!")
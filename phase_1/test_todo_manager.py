@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Tests for the TodoManager storage and query behaviour
+"""
+import sys
+import os
+import copy
+import io
+import json
+import pickle
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+from todo_manager import TodoManager
+from todo_record import TodoRecord
+from todo_index import TimeIndex
+from output_formats import write_records
+from persistence import StoreLockedError
+from daemon import TodoDaemon, forward, is_listening
+from fast_cli import forward_to_daemon
+
+
+def test_id_allocation_and_lookup():
+    """IDs are allocated monotonically and looked up directly by key"""
+    manager = TodoManager()
+    first = manager.add_todo("First")
+    second = manager.add_todo("Second")
+    assert (first['id'], second['id']) == (1, 2)
+
+    manager.delete_todo(second['id'])
+    third = manager.add_todo("Third")
+    assert third['id'] == 3  # Deleted IDs are never handed out again
+
+    assert [todo['task'] for todo in manager.list_todos()] == ["First", "Third"]
+    assert manager.get_todo_by_id(3)['task'] == "Third"
+
+    for operation in (manager.complete_todo, manager.delete_todo, manager.get_todo_by_id):
+        try:
+            operation(2)
+        except ValueError as e:
+            assert str(e) == "Todo with ID 2 not found"
+        else:
+            raise AssertionError("expected a missing-ID error")
+
+
+def test_filter_indexes_follow_mutations():
+    """Status, priority and tag filters stay correct across every mutation"""
+    manager = TodoManager(verify_indexes=True)
+    manager.add_todo("Write report", priority="high", tags=["work"])
+    manager.add_todo("Buy milk", priority="low", tags=["home"])
+    manager.add_todo("Plan sprint", priority="high", tags=["work"])
+
+    manager.set_priority(1, "low")
+    manager.complete_todo(2)
+    manager.add_tags(2, ["work", "urgent"])
+    manager.delete_todo(3)
+
+    assert [todo['id'] for todo in manager.filter_todos("priority", "low")] == [1, 2]
+    assert [todo['id'] for todo in manager.filter_todos("priority", "high")] == []
+    assert [todo['id'] for todo in manager.filter_todos("status", "pending")] == [1]
+    assert [todo['id'] for todo in manager.filter_todos("tag", "work")] == [1, 2]
+    assert manager.filter_todos("tag", "missing") == []
+    manager.check_indexes()
+
+
+def test_search_index_ranks_and_tracks_updates():
+    """Full-text search matches word prefixes, ranks results and follows edits"""
+    manager = TodoManager(verify_indexes=True)
+    manager.add_todo("Deploy backend", "Deploy the API to staging")
+    manager.add_todo("Write deployment notes")
+    manager.add_todo("Buy groceries", "milk and bread")
+
+    # The todo mentioning "deploy" twice outranks the one with a single prefix match
+    assert [todo['id'] for todo in manager.search_todos("deploy")] == [1, 2]
+    assert [todo['id'] for todo in manager.search_todos("DEPLOY staging")] == [1]
+    assert {todo['id'] for todo in manager.search_todos("staging milk", mode="or")} == {1, 3}
+    assert manager.search_todos("staging milk") == []
+
+    manager.update_todo(3, "Deploy groceries robot")
+    manager.delete_todo(1)
+    assert {todo['id'] for todo in manager.search_todos("deploy")} == {2, 3}
+    assert manager.search_todos("milk")[0]['task'] == "Deploy groceries robot"
+    assert len(manager.search_todos("")) == 2
+
+
+def test_fuzzy_search_tolerates_typos():
+    """Fuzzy search finds todos despite misspelled keywords"""
+    manager = TodoManager(fuzzy=True)
+    manager.add_todo("Deploy backend", "schedule the meeting")
+    manager.add_todo("Buy groceries")
+
+    assert manager.search_todos("deplyo") == []
+    assert [todo['id'] for todo in manager.search_todos("deplyo", fuzzy=True)] == [1]
+    assert [todo['id'] for todo in manager.search_todos("grocreies meetign", mode="or", fuzzy=True)] == [1, 2]
+
+    manager.delete_todo(2)
+    assert manager.search_todos("grocreies", fuzzy=True) == []
+
+
+def test_sorted_views_and_top_n():
+    """Priority order is stable by ID and top_n returns the same prefix as sort_todos"""
+    manager = TodoManager(verify_indexes=True)
+    for task, priority in [("a", "low"), ("b", "high"), ("c", "medium"), ("d", "high"), ("e", "low")]:
+        manager.add_todo(task, priority=priority)
+    manager.set_priority(5, "high")
+    manager.set_priority(2, "low")
+
+    by_priority = [todo['id'] for todo in manager.sort_todos("priority")]
+    assert by_priority == [4, 5, 3, 1, 2]
+    assert [todo['id'] for todo in manager.top_n("priority", 3)] == by_priority[:3]
+    assert [todo['id'] for todo in manager.top_n("id", 2)] == [1, 2]
+    assert manager.top_n("id", 0) == []
+
+
+def test_read_only_views_and_snapshot():
+    """Returned todos are frozen records and list_todos is a live read-only view"""
+    manager = TodoManager()
+    todo = manager.add_todo("Read-only", tags=["a"])
+    todos = manager.list_todos()
+
+    for mutate in (lambda: todo.__setitem__('task', "changed"), lambda: setattr(todo, 'task', "changed")):
+        try:
+            mutate()
+        except (TypeError, AttributeError):
+            pass
+        else:
+            raise AssertionError("records must not be mutable")
+
+    manager.complete_todo(todo['id'])
+    assert todo['status'] == "pending"  # A handed-out record is an immutable snapshot
+    assert manager.get_todo_by_id(todo['id'])['status'] == "completed"
+
+    manager.add_todo("Second")
+    assert len(todos) == 2 and todos[-1]['task'] == "Second"  # The sequence view is live
+
+    copies = manager.snapshot()
+    copies[0]['tags'].append("b")
+    assert manager.get_todo_by_id(1)['tags'] == ("a",)
+
+    # Records survive the standard copy and pickle protocols
+    for clone in (copy.copy(todo), copy.deepcopy(todo), pickle.loads(pickle.dumps(todo))):
+        assert isinstance(clone, TodoRecord) and clone.to_dict() == todo.to_dict()
+
+
+def test_bulk_operations_report_partial_failures():
+    """Batch methods apply valid items and report the rest"""
+    manager = TodoManager(verify_indexes=True)
+    added = manager.add_many([
+        {"task": "One", "tags": ["bulk"]},
+        {"task": "  "},
+        {"task": "Two", "priority": "urgent"},
+        {"task": "Three", "priority": "high"},
+        {"task": 4},
+        {"task": "Five", "tags": "solo"},
+        {"task": "Six", "tags": [6]},
+        "Seven",
+    ])
+    assert [todo['task'] for todo in added.succeeded] == ["One", "Three", "Five"]
+    assert [position for position, _ in added.failed] == [1, 2, 4, 6, 7]
+    assert added.succeeded[2]['tags'] == ("solo",)
+    manager.delete_todo(added.succeeded[2]['id'])
+
+    completed = manager.complete_many([1, 2, 1])
+    assert completed.succeeded == [1, 2]
+    assert completed.failed == [(1, "Todo with ID 1 is already completed")]
+
+    tagged = manager.tag_many([1, 2, 99], ["shared"])
+    assert tagged.succeeded == [1, 2] and not tagged.ok
+    assert [todo['id'] for todo in manager.filter_todos("tag", "shared")] == [1, 2]
+
+    deleted = manager.delete_many([2, 2])
+    assert deleted.succeeded == [2] and len(deleted.failed) == 1
+    assert [todo['id'] for todo in manager.list_todos()] == [1]
+
+
+def test_query_planner_intersects_indexes():
+    """query() combines predicates, search, ordering and paging lazily"""
+    manager = TodoManager()
+    for i in range(1, 31):
+        manager.add_todo(f"Deploy service {i}" if i % 3 == 0 else f"Review change {i}",
+                         priority="high" if i % 2 == 0 else "low",
+                         tags=["work"] if i % 5 == 0 else [])
+    manager.complete_many([6, 12])
+
+    plan = manager.plan_query(status="pending", priority="high", tag="work", text="deploy")
+    assert plan.driver.name == "tag=work"  # Six tagged todos beat every other predicate
+
+    results = manager.query(status="pending", priority="high", text="deploy")
+    assert [todo['id'] for todo in results] == [18, 24, 30]
+    assert [todo['id'] for todo in manager.query(tag="work", sort="priority")] == [10, 20, 30, 5, 15, 25]
+    page = manager.query(priority="low", offset=2, limit=3)
+    assert [todo['id'] for todo in page] == [5, 7, 9]
+    assert [todo['id'] for todo in manager.query(text="deploy 21", sort="relevance")][0] == 21
+    assert len(list(manager.query())) == 30
+
+
+def test_durable_storage_replays_log_after_snapshot():
+    """A restarted manager recovers from the latest snapshot plus the log tail"""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = TodoManager(storage_path=directory, snapshot_every=4)
+        for task in ["One", "Two", "Three"]:
+            manager.add_todo(task, tags=["t"])
+        manager.complete_todo(1)  # Fourth operation triggers a snapshot
+        manager.update_todo(2, "Two, edited")
+        manager.set_priority(3, "high")
+        manager.add_tags(3, ["extra"])
+        manager.delete_todo(1)
+        manager.close()
+
+        with open(os.path.join(directory, "todo.log"), 'a', encoding='utf-8') as f:
+            f.write('{"op": "complete", "id"')  # Simulate a write torn by a crash
+
+        restored = TodoManager(storage_path=directory, verify_indexes=True)
+        assert restored.snapshot() == manager.snapshot()
+        assert restored.get_next_id() == 4
+        assert [todo['id'] for todo in restored.filter_todos("tag", "extra")] == [3]
+
+        restored.add_todo("Four")
+        restored.close()
+        assert [todo['task'] for todo in TodoManager(storage_path=directory).list_todos()] == \
+            ["Two, edited", "Three", "Four"]
+
+
+def test_streaming_iterators_page_lazily():
+    """iter_* methods page through results and can be stopped early"""
+    manager = TodoManager()
+    manager.add_many({"task": f"Task {i}", "priority": "high" if i % 2 else "low"} for i in range(1, 101))
+
+    assert [todo['id'] for todo in manager.iter_todos(offset=10, limit=3)] == [11, 12, 13]
+    assert [todo['id'] for todo in manager.iter_filter("priority", "low", limit=2)] == [2, 4]
+    assert [todo['id'] for todo in manager.iter_sorted("priority", offset=49, limit=2)] == [99, 2]
+    assert [todo['task'] for todo in manager.iter_search("task 7", mode="or", limit=1)] == ["Task 7"]
+
+    stream = manager.iter_todos()
+    assert next(stream)['id'] == 1 and next(stream)['id'] == 2
+    try:
+        manager.iter_filter("colour", "red")
+    except ValueError:
+        pass  # Invalid filters are rejected when the iterator is created, not on first use
+    else:
+        raise AssertionError("expected an invalid filter error")
+
+
+def test_instrumentation_counts_calls_and_items():
+    """stats() reports per-method calls and items only when instrumentation is enabled"""
+    assert TodoManager().stats() == {}
+    assert "add_todo" not in vars(TodoManager())  # Disabled managers run the unwrapped methods
+
+    manager = TodoManager(instrument=True)
+    for i in range(5):
+        manager.add_todo(f"Task {i}", priority="high" if i < 2 else "low")
+    try:
+        manager.complete_todo(99)
+    except ValueError:
+        pass
+    assert len(manager.filter_todos("priority", "high")) == 2
+    assert len(list(manager.iter_sorted("id", limit=3))) == 3
+
+    stats = manager.stats()
+    assert stats["add_todo"]["calls"] == 5 and stats["add_todo"]["items"] == 5
+    assert stats["complete_todo"]["calls"] == 1 and stats["complete_todo"]["items"] == 0
+    assert stats["filter_todos"]["items"] == 2
+    assert "iter_filter" not in stats  # Only filter_todos, which called it, is counted
+    assert stats["iter_sorted"]["calls"] == 1 and stats["iter_sorted"]["items"] == 3
+    # Indexes keep the todos scanned down to the candidates; listing everything scans everything
+    assert stats["filter_todos"]["scanned"] == 2 and stats["iter_sorted"]["scanned"] == 3
+    assert len(list(manager.query(status="pending", priority="high"))) == 2
+    assert len(manager.search_todos("task 3")) == 1
+    assert len(manager.list_todos()) == 5 and len(list(manager.iter_todos())) == 5
+    stats = manager.stats()
+    assert stats["query"]["scanned"] == 2 and stats["iter_todos"]["scanned"] == 5
+    assert stats["search_todos"]["scanned"] == 7  # Postings: five for "task", one for "3"; then the match
+    assert stats["add_todo"]["p99_us"] >= stats["add_todo"]["p50_us"] > 0
+
+
+def test_tag_operations_touch_only_tagged_todos():
+    """Tags can be listed with counts, renamed and deleted everywhere, durably"""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = TodoManager(verify_indexes=True, storage_path=directory)
+        manager.add_todo("One", tags=["work", "urgent"])
+        manager.add_todo("Two", tags=["work"])
+        manager.add_todo("Three", tags=["home", "job"])
+        manager.add_tags(1, ["urgent", "later", "later"])
+        assert manager.get_todo_by_id(1)['tags'] == ("work", "urgent", "later")
+        assert manager.list_tags() == {"work": 2, "home": 1, "job": 1, "later": 1, "urgent": 1}
+
+        for blank in ("", "   "):
+            try:
+                manager.rename_tag("work", blank)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("expected an empty tag error")
+        assert manager.rename_tag("work", " job ") == 2
+        assert manager.rename_tag("home", "job") == 1  # Merges into the existing tag
+        assert manager.get_todo_by_id(3)['tags'] == ("job",)
+        assert manager.delete_tag("urgent") == 1
+        assert manager.list_tags() == {"job": 3, "later": 1}
+        assert [todo['id'] for todo in manager.filter_todos("tag", "job")] == [1, 2, 3]
+        try:
+            manager.delete_tag("work")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected an unknown tag error")
+        manager.close()
+
+        restored = TodoManager(verify_indexes=True, storage_path=directory)
+        assert restored.get_todo_by_id(1)['tags'] == ("job", "later")
+        assert restored.list_tags() == {"job": 3, "later": 1}
+        restored.close()
+
+
+def test_time_index_ranges_and_recency():
+    """Todos can be fetched by creation time range and recency"""
+    index = TimeIndex()
+    for timestamp, todo_id in [(10, 1), (20, 2), (30, 3), (15, 4), (40, 5)]:
+        index.add(timestamp, todo_id)
+    assert list(index.between(15, 40)) == [4, 2, 3]
+    index.discard(2)
+    assert len(index.between(15, 40)) >= 2  # Counts the dead entry until the next compaction
+    index.discard(3)
+    index.discard(5)  # Dead entries now outnumber live ones, forcing a compaction
+    assert list(index.between()) == [1, 4] and len(index.between(None, 20)) == 2
+    assert list(index.newest()) == [4, 1] and 4 in index.between(11, 16) and 1 not in index.between(11, 16)
+
+    manager = TodoManager(verify_indexes=True)
+    manager.add_many({"task": f"Task {i}", "priority": "high" if i % 2 else "low"} for i in range(1, 21))
+    manager.delete_todo(5)
+    todos = manager.list_todos()
+    start, end = todos[3]['id'], todos[12]['id']
+    start, end = manager.get_todo_by_id(start).created_at, manager.get_todo_by_id(end).created_at
+    expected = [todo.id for todo in todos if start <= todo.created_at < end]
+    assert [todo['id'] for todo in manager.created_between(start, end)] == expected
+    assert [todo['id'] for todo in manager.newest(3)] == [20, 19, 18]
+    assert [todo['id'] for todo in manager.query(priority="high", since=start, until=end)] == \
+        [todo_id for todo_id in expected if todo_id % 2]
+
+
+def test_output_formats_stream_records():
+    """Todos can be written as json, ndjson and csv straight from an iterator"""
+    manager = TodoManager()
+    manager.add_todo("Buy, milk", 'Say "hi"', tags=["home", "shop"])
+    manager.add_todo("Call mom")
+
+    out = io.StringIO()
+    assert write_records(manager.iter_todos(), "json", out) == 2
+    rows = json.loads(out.getvalue())
+    assert rows[0]['task'] == "Buy, milk" and rows[0]['tags'] == ["home", "shop"] and rows[1]['id'] == 2
+
+    out = io.StringIO()
+    write_records(manager.iter_todos(), "ndjson", out)
+    assert [json.loads(line)['id'] for line in out.getvalue().splitlines()] == [1, 2]
+
+    out = io.StringIO()
+    write_records(manager.iter_todos(limit=1), "csv", out)
+    assert out.getvalue().splitlines()[1].startswith('1,"Buy, milk","Say ""hi""",pending,medium,"home,shop",')
+
+    out = io.StringIO()
+    write_records(iter(()), "json", out)
+    assert json.loads(out.getvalue()) == []
+
+
+def test_daemon_runs_commands_on_one_manager():
+    """Commands forwarded to a daemon share its in-memory todos and report exit codes"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "todo.sock")
+        assert forward(["list"], path) is None
+
+        manager = TodoManager()
+        daemon = TodoDaemon(manager, path)
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+        try:
+            while not is_listening(path):
+                time.sleep(0.01)
+            out = io.StringIO()
+            with redirect_stdout(out):
+                assert forward(["add", "Water plants"], path) == 0
+                assert forward(["--format", "ndjson", "list"], path) == 0
+                assert forward(["complete", "7"], path) == 1
+                # An explicit --store is answered by the daemon listening in it, not opened a second time
+                assert forward_to_daemon(["--store", directory, "add", "Feed cat"]) == 0
+                # After the command it is the command's own (invalid) option, left for the full CLI
+                assert forward_to_daemon(["add", "Feed dog", "--store", directory]) is None
+            lines = out.getvalue().splitlines()
+            assert lines[0] == "Added todo: Water plants (ID: 1)"
+            assert json.loads(lines[2])['task'] == "Water plants"
+            assert manager.get_todo_by_id(1)['task'] == "Water plants"
+            assert manager.get_todo_by_id(2)['task'] == "Feed cat"
+        finally:
+            daemon.shutdown()
+            thread.join()
+        assert not os.path.exists(path)
+
+
+def test_store_is_locked_and_log_sequence_checked():
+    """Only one manager may use a store, and a log that does not continue the snapshot is refused"""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = TodoManager(storage_path=directory)
+        manager.add_todo("One")
+        manager.add_todo("Two")
+        try:
+            TodoManager(storage_path=directory)
+        except StoreLockedError as e:
+            assert str(os.getpid()) in str(e)
+        else:
+            raise AssertionError("expected the store to be locked")
+        manager.checkpoint()
+        manager.close()
+
+        # An operation numbered below the snapshot, as a second writer would have logged it
+        with open(os.path.join(directory, "todo.log"), 'w', encoding='utf-8') as f:
+            f.write('{"op":"complete","id":1,"seq":1}\n')
+        try:
+            TodoManager(storage_path=directory)
+        except ValueError as e:
+            assert "does not continue the snapshot" in str(e)
+        else:
+            raise AssertionError("expected a sequence error")
+
+        # The failed load released the lock
+        with open(os.path.join(directory, "todo.log"), 'w', encoding='utf-8') as f:
+            f.write('{"op":"complete","id":1,"seq":2}\n{"op":"delete","id":1,"seq":4}\n')
+        try:
+            TodoManager(storage_path=directory)
+        except ValueError as e:
+            assert "out of order" in str(e)
+        else:
+            raise AssertionError("expected a sequence error")
+
+
+if __name__ == "__main__":
+    test_id_allocation_and_lookup()
+    test_filter_indexes_follow_mutations()
+    test_search_index_ranks_and_tracks_updates()
+    test_fuzzy_search_tolerates_typos()
+    test_sorted_views_and_top_n()
+    test_read_only_views_and_snapshot()
+    test_bulk_operations_report_partial_failures()
+    test_query_planner_intersects_indexes()
+    test_durable_storage_replays_log_after_snapshot()
+    test_streaming_iterators_page_lazily()
+    test_instrumentation_counts_calls_and_items()
+    test_tag_operations_touch_only_tagged_todos()
+    test_time_index_ranges_and_recency()
+    test_output_formats_stream_records()
+    test_daemon_runs_commands_on_one_manager()
+    test_store_is_locked_and_log_sequence_checked()
+    print("All tests passed!")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Startup time and peak memory of a full versus a lazy (indexed) load
+
+Usage: python benchmarks/bench_lazy_load.py [--sizes 100000 1000000] [--format json]
+
+Each load runs in a fresh interpreter so peak RSS is its own. Besides the
+load itself (and the peak RSS right after it), the time to the first
+find_task_by_id and to a full filter_tasks pass show what the lazy mode
+defers; "peak MB" is measured after that pass.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from bench_serializers import build_data
+from todo_manager import TodoManager
+
+
+def worker(path, lazy):
+    """Loads path, then prints the timings and peak RSS as JSON."""
+    start = time.perf_counter()
+    manager = TodoManager(path, lazy=lazy)
+    load = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    load_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+    start = time.perf_counter()
+    manager.find_task_by_id(len(manager.get_all_tasks()) // 2)
+    find = time.perf_counter() - start
+    start = time.perf_counter()
+    manager.filter_tasks(status="Completed")
+    scan = time.perf_counter() - start
+    print(json.dumps({"load_ms": load * 1000, "load_peak_mb": load_peak, "find_ms": find * 1000,
+                      "filter_ms": scan * 1000,
+                      "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000], help="tasks per file")
+    parser.add_argument('--format', default="json", choices=["json", "compact"], help="file format to index")
+    parser.add_argument('--build', nargs=2, help=argparse.SUPPRESS)
+    parser.add_argument('--worker', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.build:
+        TodoManager(args.build[0], serializer=args.format, durability="never").save_data(build_data(int(args.build[1])))
+        return
+    if args.worker:
+        worker(args.worker[0], args.worker[1] == "lazy")
+        return
+
+    print(f"{'tasks':>8} {'mode':<5} {'load ms':>10} {'load MB':>10} {'find ms':>10} {'filter ms':>10} {'peak MB':>10}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'todo.json')
+            # Built in its own process: a child inherits the peak RSS of the process it was forked from
+            subprocess.run([sys.executable, __file__, '--format', args.format, '--build', path, str(size)], check=True)
+            for mode in ("full", "lazy"):
+                output = subprocess.run([sys.executable, __file__, '--worker', path, mode],
+                                        check=True, capture_output=True, text=True).stdout
+                result = json.loads(output)
+                print(f"{size:>8} {mode:<5} {result['load_ms']:>10.1f} {result['load_peak_mb']:>10.1f} {result['find_ms']:>10.2f} "
+                      f"{result['filter_ms']:>10.1f} {result['peak_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
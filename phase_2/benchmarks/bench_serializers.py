@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Load and save time and file size for each task file format
+
+Usage: python benchmarks/bench_serializers.py [--sizes 10000 100000] [--repeat 3]
+
+Formats whose optional codec is not installed are skipped; "compact" uses
+orjson or msgspec when present and the standard json module otherwise.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from serializers import available_serializers, orjson, msgspec
+from todo_manager import TodoManager
+
+CATEGORIES = ["Work", "Personal", "Shopping"]
+PRIORITIES = ["High", "Medium", "Low"]
+
+
+def build_data(size):
+    created_at = datetime.now().isoformat()
+    return {"tasks": [{
+        'id': i,
+        'task': f"Task number {i}",
+        'category': CATEGORIES[i % 3],
+        'priority': PRIORITIES[i % 3],
+        'status': 'Completed' if i % 4 == 0 else 'Pending',
+        'created_at': created_at
+    } for i in range(1, size + 1)]}
+
+
+def best_of(repeat, run):
+    """Returns the fastest of repeat timed runs, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help="tasks per file")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per measurement (the best is reported)")
+    args = parser.parse_args()
+
+    codec = "orjson" if orjson is not None else "msgspec" if msgspec is not None else "json"
+    print(f"JSON codec for compact/decoding: {codec}")
+    print(f"{'tasks':>8} {'format':<8} {'save ms':>10} {'load ms':>10} {'bytes':>14}")
+    for size in args.sizes:
+        data = build_data(size)
+        for name in available_serializers():
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'todo.json')
+                manager = TodoManager(path, serializer=name, durability="never")
+                save_ms = best_of(args.repeat, lambda: manager.save_data(data))
+                load_ms = best_of(args.repeat, lambda: TodoManager(path, serializer=name))
+                print(f"{size:>8} {name:<8} {save_ms:>10.1f} {load_ms:>10.1f} {os.path.getsize(path):>14,}")
+
+
+if __name__ == "__main__":
+    main()
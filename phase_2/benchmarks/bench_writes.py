@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Write throughput of the JSON TodoManager under each durability policy
+
+Usage: python benchmarks/bench_writes.py [--tasks 1000] [--writes 200] [--threads 8] [--dir PATH]
+
+Each row adds --writes tasks to a store that already holds --tasks tasks:
+one call at a time, inside a single batch(), and from --threads threads
+sharing a group commit. Rows are repeated for the plain JSON file and the
+journal. fsync costs depend on the disk, so point --dir at the filesystem
+that will hold todo.json (the system temp directory is often in memory).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from todo_manager import DURABILITY_POLICIES, TodoManager
+
+GROUP_COMMIT_MS = 2
+
+
+def prepare(directory, tasks):
+    """Creates a todo.json holding the given number of tasks and returns its path."""
+    path = os.path.join(directory, 'todo.json')
+    manager = TodoManager(path, durability="never")
+    with manager.batch():
+        for i in range(tasks):
+            manager.add_task(f"Existing task {i}")
+    return path
+
+
+def single(manager, writes, threads):
+    for i in range(writes):
+        manager.add_task(f"Task {i}")
+
+
+def batched(manager, writes, threads):
+    with manager.batch():
+        for i in range(writes):
+            manager.add_task(f"Task {i}")
+
+
+def grouped(manager, writes, threads):
+    def work(offset):
+        for i in range(offset, writes, threads):
+            manager.add_task(f"Task {i}")
+
+    workers = [threading.Thread(target=work, args=(offset,)) for offset in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+MODES = [("single", single), ("batch", batched), ("group", grouped)]
+
+
+def measure(args, journal, durability, name, run):
+    """Returns writes per second for one storage mode, policy and write pattern."""
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        path = prepare(directory, args.tasks)
+        group_commit_ms = GROUP_COMMIT_MS if name == "group" else None
+        # Compaction is left to close() so every row measures steady-state writes
+        manager = TodoManager(path, journal=journal, compact_every=sys.maxsize, compact_bytes=sys.maxsize,
+                              group_commit_ms=group_commit_ms, durability=durability)
+        start = time.perf_counter()
+        # Each add_task returns once its write is done, group commits included
+        run(manager, args.writes, args.threads)
+        elapsed = time.perf_counter() - start
+        manager.close()
+    return args.writes / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=1000, help="tasks already in the file")
+    parser.add_argument('--writes', type=int, default=200, help="tasks added per measurement")
+    parser.add_argument('--threads', type=int, default=8, help="writer threads for group commit")
+    parser.add_argument('--dir', help="directory to create the test files in (default: system temp)")
+    args = parser.parse_args()
+
+    print(f"{'storage':<8} {'policy':<8} " + " ".join(f"{name + ' w/s':>12}" for name, _ in MODES))
+    for journal in (False, True):
+        for durability in DURABILITY_POLICIES:
+            rates = [measure(args, journal, durability, name, run) for name, run in MODES]
+            print(f"{'journal' if journal else 'json':<8} {durability:<8} "
+                  + " ".join(f"{rate:>12,.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
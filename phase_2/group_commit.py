@@ -0,0 +1,68 @@
+import threading
+
+
+class _Flush:
+    """Operations that are written together, and the outcome their callers wait for."""
+
+    def __init__(self):
+        self.operations = []
+        self.done = threading.Event()
+        self.error = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+
+
+class GroupCommit:
+    """Collects operations from concurrent callers and writes them together.
+
+    A background thread hands everything submitted during each window
+    (in seconds) to write() in one call, so callers that commit within the
+    same window share a single write and fsync. Each caller waits until
+    its operation has been written, and sees the error if writing failed.
+    """
+
+    def __init__(self, write, window):
+        self._write = write
+        self.window = window
+        self._lock = threading.Lock()
+        self._current = _Flush()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def submit(self, operation):
+        """Queues an operation and returns the flush to wait() on, outside any locks."""
+        with self._lock:
+            if self._stopping.is_set():
+                raise RuntimeError("Group commit has been stopped")
+            self._current.operations.append(operation)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            return self._current
+
+    def _run(self):
+        while not self._stopping.wait(self.window):
+            self._flush()
+        # Anything submitted before stop() still gets written
+        self._flush()
+
+    def _flush(self):
+        with self._lock:
+            flush, self._current = self._current, _Flush()
+        if flush.operations:
+            try:
+                self._write(flush.operations)
+            except Exception as e:
+                flush.error = e
+        flush.done.set()
+
+    def stop(self):
+        """Writes what is pending and stops the background thread."""
+        with self._lock:
+            self._stopping.set()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
@@ -0,0 +1,265 @@
+import mmap
+import operator
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import MutableSequence
+from serializers import json_loads
+
+TASKS_START = re.compile(rb'\s*\{\s*"tasks"\s*:\s*\[')
+TASKS_END = re.compile(rb'\]\s*\}\s*')
+# The start of a task object with its id as the first key: the first task of a chunk, and
+# every later one, which follows the previous task. An object nested in a task follows a
+# colon or opens a list, so the objects these miss show the tasks are not flat. Quotes
+# inside JSON strings are always escaped, so none of the patterns can match within the
+# text of a task.
+FIRST_TASK = re.compile(rb'\s*\{\s*"id"\s*:\s*(-?\d+)')
+NEXT_TASK = re.compile(rb'\}\s*,\s*\{\s*"id"\s*:\s*(-?\d+)')
+OBJECT_START = re.compile(rb'\{\s*["}]')
+# Tasks are indexed, and later decoded, in runs of about this many bytes
+CHUNK_SIZE = 64 * 1024
+
+
+class LazyTaskList(MutableSequence):
+    """The tasks of a memory-mapped JSON file, decoded a chunk at a time when first read.
+
+    Up front only the ids and the byte offsets of chunks of about
+    CHUNK_SIZE bytes are kept. Reading a task decodes its chunk in one call
+    and caches the result, so changes made to decoded tasks stick. Tasks
+    added later are ordinary dicts. When ids are ascending, as this app
+    writes them, a task is found by id with a binary search.
+    """
+
+    def __init__(self, buffer, bounds, firsts, ids, ascending):
+        self._buffer = buffer
+        # Chunk i holds the tasks numbered firsts[i] onwards, in bytes bounds[i] to bounds[i + 1]
+        self._bounds = bounds
+        self._firsts = firsts
+        self._count = len(ids)
+        self._ids = ids
+        self._ascending = ascending
+        # Per position: the decoded task or None, and its number in the file (-1 if added later)
+        self._items = [None] * len(ids)
+        self._numbers = array('q', range(len(ids)))
+        self._chunks = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = range(len(self._items))[index]
+        item = self._items[index]
+        if item is None:
+            item = self._items[index] = self._decode(self._numbers[index])
+        return item
+
+    def __iter__(self):
+        items, numbers = self._items, self._numbers
+        # The chunk last decoded, which usually holds the next task too
+        tasks, first = [], 0
+        index = 0
+        while index < len(items):
+            item = items[index]
+            if item is None:
+                number = numbers[index]
+                if not first <= number < first + len(tasks):
+                    tasks, first = self._chunk(number)
+                item = items[index] = tasks[number - first]
+            yield item
+            index += 1
+
+    def _decode(self, number):
+        tasks, first = self._chunk(number)
+        return tasks[number - first]
+
+    def _chunk(self, number):
+        """Returns the decoded tasks of the chunk holding task number, and the number of its first."""
+        chunk = bisect_right(self._firsts, number) - 1
+        tasks = self._chunks.get(chunk)
+        if tasks is None:
+            if self._buffer is None:
+                raise ValueError("The task file was closed before this task was read")
+            raw = self._buffer[self._bounds[chunk]:self._bounds[chunk + 1]].rstrip()
+            if raw.endswith(b','):
+                raw = raw[:-1]
+            tasks = json_loads(b'[' + raw + b']')
+            end = self._firsts[chunk + 1] if chunk + 1 < len(self._firsts) else self._count
+            if len(tasks) != end - self._firsts[chunk]:
+                raise ValueError("The task file does not match its index")
+            self._chunks[chunk] = tasks
+        return tasks, self._firsts[chunk]
+
+    def __setitem__(self, index, task):
+        if isinstance(index, slice):
+            tasks = list(task)
+            # The list raises for a length mismatch before the other columns change
+            self._items[index] = tasks
+            self._numbers[index] = array('q', [-1] * len(tasks))
+            self._ids[index] = array('q', [task['id'] for task in tasks])
+            self._ascending = all(map(operator.le, self._ids, self._ids[1:]))
+            return
+        index = range(len(self._items))[index]
+        self._items[index] = task
+        self._ids[index] = task['id']
+        self._check_order(index)
+
+    def __delitem__(self, index):
+        if not isinstance(index, slice):
+            index = range(len(self._items))[index]
+        for column in (self._items, self._numbers, self._ids):
+            del column[index]
+
+    def insert(self, index, task):
+        if index < 0:
+            index += len(self._items)
+        index = min(max(index, 0), len(self._items))
+        self._items.insert(index, task)
+        self._numbers.insert(index, -1)
+        self._ids.insert(index, task['id'])
+        self._check_order(index)
+
+    def _check_order(self, index):
+        ids = self._ids
+        if self._ascending and not ((index == 0 or ids[index - 1] <= ids[index])
+                                    and (index == len(ids) - 1 or ids[index] <= ids[index + 1])):
+            self._ascending = False
+
+    def sort(self, key=None, reverse=False):
+        """Sorts the tasks in place like list.sort(), decoding all of them."""
+        self[:] = sorted(self, key=key, reverse=reverse)
+
+    def ids(self):
+        return self._ids
+
+    def max_id(self):
+        return self._ids[-1] if self._ascending else max(self._ids)
+
+    def position(self, task_id):
+        """Returns the index of the task with task_id, or None, without decoding any task."""
+        if self._ascending:
+            index = bisect_left(self._ids, task_id)
+            return index if index < len(self._ids) and self._ids[index] == task_id else None
+        try:
+            return self._ids.index(task_id)
+        except ValueError:
+            return None
+
+    def checkpoint(self):
+        """Captures the list so rollback() can return to it; only decoded tasks are copied."""
+        return ([None if item is None else (item, dict(item)) for item in self._items],
+                array('q', self._numbers), array('q', self._ids), self._ascending)
+
+    def close(self):
+        """Releases the memory map; tasks not read by then can no longer be decoded."""
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+
+    def rollback(self, state):
+        saved, self._numbers, self._ids, self._ascending = state
+        for entry in saved:
+            if entry is not None:
+                task, fields = entry
+                task.clear()
+                task.update(fields)
+        self._items = [None if entry is None else entry[0] for entry in saved]
+        # Tasks first decoded after the checkpoint may have changed; decode them again from the file
+        self._chunks = {}
+
+
+def load_lazy(f):
+    """Indexes the tasks in an open JSON task file without decoding them.
+
+    Returns {"tasks": LazyTaskList}, or None when the file is not laid out
+    as {"tasks": [...]} with flat task objects that start with their id,
+    and has to be loaded in full. The file is memory-mapped until the list
+    is closed. Windows cannot replace a mapped file, so whoever rewrites it
+    decodes the remaining tasks and closes the list first.
+    """
+    try:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # An empty file cannot be mapped
+        return None
+    tasks = _index_tasks(buffer)
+    if tasks is None:
+        buffer.close()
+        return None
+    return {"tasks": tasks}
+
+
+def _index_tasks(buffer):
+    start = TASKS_START.match(buffer)
+    end = buffer.rfind(b']')
+    if start is None or end < start.end() or TASKS_END.fullmatch(buffer, end) is None:
+        return None
+
+    # Chunks begin at a task, just after the comma before it, so each one decodes on its own
+    bounds = array('q', [start.end()])
+    position = start.end() + CHUNK_SIZE
+    while position < end:
+        match = NEXT_TASK.search(buffer, position, end)
+        if match is None:
+            break
+        bounds.append(buffer.find(b',', match.start()) + 1)
+        position = match.start() + CHUNK_SIZE
+    bounds.append(end)
+
+    firsts, ids = array('q'), array('q')
+    for chunk_start, chunk_end in zip(bounds, bounds[1:]):
+        chunk = buffer[chunk_start:chunk_end]
+        first = FIRST_TASK.match(chunk)
+        if first is None:
+            if chunk.strip():
+                return None
+            # An empty list of tasks
+            found = []
+        else:
+            found = [first.group(1)] + NEXT_TASK.findall(chunk, first.end())
+        # Counting braces is quicker and settles it unless a task's text contains one
+        if chunk.count(b'{') != len(found) and len(OBJECT_START.findall(chunk)) != len(found):
+            # Nested objects, or tasks whose id is not the first key
+            return None
+        firsts.append(len(ids))
+        ids.extend(map(int, found))
+
+    # Nothing but whitespace may follow the last task, or the array was not just tasks
+    tail_start = buffer.rfind(b'}', start.end(), end) + 1 if ids else start.end()
+    if buffer[tail_start:end].strip():
+        return None
+    ascending = all(map(operator.le, ids, ids[1:]))
+    return LazyTaskList(buffer, bounds, firsts, ids, ascending)
+
+
+def task_position(tasks, task_id):
+    """Returns the index of the task with task_id in a list or LazyTaskList, or None."""
+    if isinstance(tasks, LazyTaskList):
+        return tasks.position(task_id)
+    for index, task in enumerate(tasks):
+        if task['id'] == task_id:
+            return index
+    return None
+
+
+def max_task_id(tasks):
+    """Returns the largest id in a non-empty list or LazyTaskList; a lazy list of ascending ids knows it."""
+    return tasks.max_id() if isinstance(tasks, LazyTaskList) else max(task['id'] for task in tasks)
+
+
+def checkpoint_tasks(tasks):
+    if isinstance(tasks, LazyTaskList):
+        return tasks.checkpoint()
+    return [(task, dict(task)) for task in tasks]
+
+
+def rollback_tasks(tasks, state):
+    """Restores tasks, and the fields of the task objects in it, to a checkpoint_tasks() state."""
+    if isinstance(tasks, LazyTaskList):
+        tasks.rollback(state)
+        return
+    for task, fields in state:
+        task.clear()
+        task.update(fields)
+    tasks[:] = [task for task, _ in state]
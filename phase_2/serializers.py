@@ -0,0 +1,129 @@
+import json
+import pickle
+
+# Optional faster codecs, used when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+PICKLE_PROTOCOL = min(5, pickle.HIGHEST_PROTOCOL)
+
+
+def json_loads(payload):
+    """Decodes JSON bytes with the fastest decoder available."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    if msgspec is not None:
+        return msgspec.json.decode(payload)
+    return json.loads(payload)
+
+
+class Serializer:
+    """Turns the task data into the bytes stored on disk, and back."""
+
+    name = None
+
+    def dumps(self, data):
+        raise NotImplementedError
+
+    def loads(self, payload):
+        raise NotImplementedError
+
+
+class PrettyJsonSerializer(Serializer):
+    """Indented JSON, the original human-readable todo.json layout."""
+
+    name = "json"
+
+    def dumps(self, data):
+        return json.dumps(data, indent=4).encode('utf-8')
+
+    def loads(self, payload):
+        return json_loads(payload)
+
+
+class CompactJsonSerializer(Serializer):
+    """JSON without whitespace, encoded by orjson or msgspec when installed."""
+
+    name = "compact"
+
+    def dumps(self, data):
+        if orjson is not None:
+            return orjson.dumps(data)
+        if msgspec is not None:
+            return msgspec.json.encode(data)
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    def loads(self, payload):
+        return json_loads(payload)
+
+
+class PickleSerializer(Serializer):
+    """Binary pickle snapshot. Only load files you wrote: unpickling can run code."""
+
+    name = "pickle"
+
+    def dumps(self, data):
+        return pickle.dumps(data, protocol=PICKLE_PROTOCOL)
+
+    def loads(self, payload):
+        return pickle.loads(payload)
+
+
+class MsgpackSerializer(Serializer):
+    """Binary MessagePack snapshot (needs the msgpack package)."""
+
+    name = "msgpack"
+
+    def dumps(self, data):
+        return msgpack.packb(data)
+
+    def loads(self, payload):
+        return msgpack.unpackb(payload)
+
+
+SERIALIZERS = {serializer.name: serializer for serializer in (
+    PrettyJsonSerializer(), CompactJsonSerializer(), PickleSerializer(), MsgpackSerializer())}
+
+
+def available_serializers():
+    """Returns the names of the serializers that can be used here."""
+    return [name for name in SERIALIZERS if name != "msgpack" or msgpack is not None]
+
+
+def get_serializer(name):
+    if name not in available_serializers():
+        raise ValueError(f"Serializer must be one of: {', '.join(available_serializers())}")
+    return SERIALIZERS[name]
+
+
+def detect(payload, allow_pickle=False):
+    """Returns the serializer that wrote payload, judging by its first bytes.
+
+    A pickle is only recognised with allow_pickle: loading one can run any
+    code, so a file must never be unpickled just because of how it starts.
+    """
+    if payload[:1] == b'\x80' and payload[1:2] in (b'\x02', b'\x03', b'\x04', b'\x05'):
+        if not allow_pickle:
+            raise ValueError("The task file is a pickle snapshot; pass serializer=\"pickle\" to load it "
+                             "if you trust where it came from")
+        return SERIALIZERS["pickle"]
+    text = payload[:64].lstrip()
+    if text[:1] in (b'{', b'['):
+        # Indented files have whitespace after the opening bracket
+        return SERIALIZERS["json"] if text[1:2] in (b'\n', b'\r', b' ', b']', b'}') else SERIALIZERS["compact"]
+    if payload and (0x80 <= payload[0] <= 0x8f or payload[0] in (0xde, 0xdf)):
+        # A MessagePack map
+        return get_serializer("msgpack")
+    raise ValueError("Unrecognised task file format")
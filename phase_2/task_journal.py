@@ -0,0 +1,113 @@
+import json
+import os
+import shutil
+from lazy_tasks import task_position
+
+
+class TaskJournal:
+    """Append-only log of task mutations kept next to the JSON file.
+
+    Each line is one compact JSON operation:
+        {"op": "add", "task": {...}}
+        {"op": "update", "id": 1, "fields": {...}}
+        {"op": "delete", "id": 1}
+        {"op": "batch", "ops": [...]}
+    Replaying is idempotent, so operations that already reached the JSON
+    file before a crash can safely be applied again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = 0
+        self._file = None
+
+    @property
+    def size(self):
+        return self._file.tell() if self._file else 0
+
+    def replay(self, tasks, path=None):
+        """Applies the logged operations to a list of tasks in place."""
+        path = path or self.path
+        if not os.path.exists(path):
+            return 0
+        count = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    operation = json.loads(line)
+                except json.JSONDecodeError:
+                    # A write cut short by a crash; everything before it is intact
+                    break
+                apply_operation(tasks, operation)
+                count += 1
+        return count
+
+    def open(self):
+        """Opens the log for appending, counting the operations already in it."""
+        if os.path.exists(self.path):
+            with open(self.path, 'rb+') as f:
+                complete = 0
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Drop a torn last write so new operations start on a line of their own
+                        f.truncate(complete)
+                        break
+                    complete += len(line)
+                    self.entries += 1
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def append(self, operation, sync=False):
+        self._file.write(json.dumps(operation, separators=(',', ':')) + "\n")
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+        self.entries += 1
+
+    def rotate(self):
+        """Moves the current log aside for compaction and starts an empty one.
+
+        Returns the path of the old log, which can be removed once its
+        operations are in the JSON file. If a log from a compaction that
+        failed is still there, the current one is appended to it instead.
+        """
+        self._file.close()
+        rotated = self.path + ".compacting"
+        if os.path.exists(rotated):
+            # Replaying twice is harmless, so a crash before the current log is removed loses nothing
+            with open(self.path, 'rb') as current, open(rotated, 'ab') as old:
+                shutil.copyfileobj(current, old)
+                old.flush()
+                os.fsync(old.fileno())
+            os.remove(self.path)
+        else:
+            os.replace(self.path, rotated)
+        self.entries = 0
+        self._file = open(self.path, 'a', encoding='utf-8')
+        return rotated
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def apply_operation(tasks, operation):
+    op = operation['op']
+    if op == 'add':
+        # Replace rather than append so a replayed add does not duplicate the task
+        apply_operation(tasks, {'op': 'delete', 'id': operation['task']['id']})
+        tasks.append(operation['task'])
+    elif op == 'update':
+        index = task_position(tasks, operation['id'])
+        if index is not None:
+            tasks[index].update(operation['fields'])
+    elif op == 'delete':
+        index = task_position(tasks, operation['id'])
+        if index is not None:
+            del tasks[index]
+    elif op == 'batch':
+        # Written as one line, so a batch is replayed completely or not at all
+        for batched in operation['ops']:
+            apply_operation(tasks, batched)
+    else:
+        raise ValueError(f"Unknown journal operation: {op}")
@@ -0,0 +1,241 @@
+"""
+Test the journaled storage mode of the TodoManager
+"""
+import json
+import os
+import tempfile
+import threading
+import lazy_tasks
+from serializers import available_serializers
+from todo_manager import TodoManager
+
+
+def test_journal_replays_and_compacts():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'todo.json')
+        tm = TodoManager(path, journal=True, compact_every=3)
+        tm.add_task("Write report", "Work", "High")
+        tm.add_task("Buy milk", "Personal", "Low")
+        
+        # Mutations only reached the journal; a new manager replays them
+        with open(path) as f:
+            assert json.load(f) == {"tasks": []}
+        reopened = TodoManager(path, journal=True)
+        assert [task['task'] for task in reopened.get_all_tasks()] == ["Write report", "Buy milk"]
+        reopened.journal.close()
+        
+        # The third operation triggers a compaction into todo.json
+        tm.complete_task(1)
+        tm.wait_for_compaction()
+        with open(path) as f:
+            assert [task['status'] for task in json.load(f)['tasks']] == ["Completed", "Pending"]
+        assert tm.journal.entries == 0
+        
+        tm.delete_task(2)
+        tm.close()
+        with open(path) as f:
+            assert [task['id'] for task in json.load(f)['tasks']] == [1]
+        assert os.path.getsize(path + '.journal') == 0
+
+
+def test_batch_writes_once_and_rolls_back():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'todo.json')
+        tm = TodoManager(path, journal=True)
+        with tm.batch():
+            for i in range(5):
+                tm.add_task(f"Task {i}")
+            tm.complete_task(1)
+        # The whole batch is a single journal line
+        assert tm.journal.entries == 1
+        
+        try:
+            with tm.batch():
+                tm.add_task("Discarded")
+                tm.update_task(2, new_task_name="Renamed")
+                tm.delete_task(3)
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        assert [task['task'] for task in tm.get_all_tasks()] == [f"Task {i}" for i in range(5)]
+        assert tm.journal.entries == 1
+        tm.close()
+        
+        with open(path) as f:
+            assert [task['status'] for task in json.load(f)['tasks']][:2] == ["Completed", "Pending"]
+
+
+def test_group_commit_shares_writes_between_threads():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'todo.json')
+        tm = TodoManager(path, journal=True, group_commit_ms=20)
+        threads = [threading.Thread(target=tm.add_task, args=(f"Task {i}",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Every call returned after its write, and calls in the same window shared one
+        reopened = TodoManager(path, journal=True)
+        assert len(reopened.get_all_tasks()) == 8
+        reopened.journal.close()
+        assert tm.journal.entries < 8
+        tm.close()
+
+
+def test_failed_save_leaves_file_intact():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'todo.json')
+        tm = TodoManager(path, durability="always")
+        tm.add_task("Keep me")
+        
+        # A value JSON cannot encode fails halfway through the dump
+        tm.data['tasks'].append({'id': 2, 'task': object()})
+        try:
+            tm.save_data()
+            assert False, "save_data should have failed"
+        except TypeError:
+            pass
+        with open(path) as f:
+            assert [task['task'] for task in json.load(f)['tasks']] == ["Keep me"]
+        assert os.listdir(directory) == ['todo.json']
+        
+        try:
+            TodoManager(path, durability="sometimes")
+            assert False, "an unknown policy should be rejected"
+        except ValueError:
+            pass
+
+        
+        # A background compaction that fails does not fail the mutation that started it: the
+        # error is reported by the next compact(), and the journal is kept for the next one
+        tm = TodoManager(os.path.join(directory, 'journaled.json'), journal=True, compact_every=2)
+        tm.add_task("First")
+        tm.add_task("Second")
+        tm.wait_for_compaction()
+        tm.data['tasks'][0]['task'] = object()
+        tm.add_task("Third")
+        tm.add_task("Fourth")
+        tm.add_task("Fifth")
+        for wait in (False, True):
+            try:
+                tm.compact(wait)
+                assert False, "the compaction error should be raised"
+            except TypeError:
+                pass
+        reopened = TodoManager(os.path.join(directory, 'journaled.json'), journal=True)
+        assert [task['task'] for task in reopened.get_all_tasks()] == ["First", "Second", "Third", "Fourth", "Fifth"]
+        reopened.close()
+
+
+def test_serializers_round_trip_and_are_detected():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'todo.json')
+        for name in available_serializers():
+            TodoManager(path, serializer=name).add_task("Café visit", "Personal", "Low")
+            # The format is recognised on load and kept for later writes, but a pickle is
+            # only loaded when asked for
+            if name == "pickle":
+                try:
+                    TodoManager(path)
+                    assert False, "a pickle should not be loaded unasked"
+                except ValueError:
+                    pass
+            tm = TodoManager(path, serializer="pickle" if name == "pickle" else None)
+            assert tm.serializer.name == name
+            assert [task['task'] for task in tm.get_all_tasks()] == ["Café visit"]
+            os.remove(path)
+
+
+def test_lazy_load_decodes_tasks_on_demand():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'todo.json')
+        writer = TodoManager(path)
+        with writer.batch():
+            for i in range(50):
+                writer.add_task(f"Task {i} {{with braces}}", "Work" if i % 2 else "Home")
+        
+        chunk_size, lazy_tasks.CHUNK_SIZE = lazy_tasks.CHUNK_SIZE, 500
+        try:
+            tm = TodoManager(path, lazy=True, journal=True)
+        finally:
+            lazy_tasks.CHUNK_SIZE = chunk_size
+        tasks = tm.get_all_tasks()
+        assert isinstance(tasks, lazy_tasks.LazyTaskList) and len(tasks._chunks) == 0
+        
+        assert tm.find_task_by_id(30)['task'] == "Task 29 {with braces}"
+        assert len(tasks._chunks) == 1
+        assert tm.add_task("Added")['id'] == 51
+        tm.complete_task(2)
+        tm.delete_task(3)
+        try:
+            with tm.batch():
+                tm.delete_task(40)
+                tm.update_task(41, new_task_name="Renamed")
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        assert tm.find_task_by_id(41)['task'] == "Task 40 {with braces}"
+        assert len(tm.filter_tasks(category="Home")) == 24
+        tm.close()
+        # Compaction decoded the rest and unmapped the file before replacing it
+        assert tasks._buffer is None and type(tm.get_all_tasks()) is list
+        
+        # The journal replays onto a lazy list, and compaction wrote every task back out
+        for lazy in (True, False):
+            reopened = TodoManager(path, lazy=lazy, journal=True)
+            assert [task['id'] for task in reopened.get_all_tasks()][:3] == [1, 2, 4]
+            assert reopened.find_task_by_id(2)['status'] == "Completed"
+            assert reopened.find_task_by_id(51)['task'] == "Added"
+            reopened.journal.close()
+        
+        # Slices, sorting and the next id work on the lazy list as on a plain one
+        tasks = TodoManager(path, lazy=True).get_all_tasks()
+        del tasks[0:2]
+        tasks[:2] = [{'id': 2, 'task': "Second"}, {'id': 1, 'task': "First"}]
+        tasks.sort(key=lambda task: task['id'])
+        assert [task['id'] for task in tasks[:4]] == [1, 2, 6, 7]
+        tasks[:] = tasks[::-1]
+        assert tasks.position(1) == len(tasks) - 1 and tasks.max_id() == 51
+        
+        # Without a journal the first mutation rewrites the file, so the mapping goes first
+        tm = TodoManager(path, lazy=True)
+        tasks = tm.get_all_tasks()
+        tm.add_task("Rewritten")
+        assert tasks._buffer is None and type(tm.get_all_tasks()) is list
+        assert len(TodoManager(path).get_all_tasks()) == 51
+        tasks = TodoManager(path, lazy=True).get_all_tasks()
+        tasks.close()
+        try:
+            tasks[0]
+            assert False, "read after close"
+        except ValueError:
+            pass
+
+
+def test_lazy_load_falls_back_for_nested_objects():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'todo.json')
+        nested = [
+            {"tasks": [{"id": 1, "meta": {"id": 9}}, {"id": 2}]},
+            {"tasks": [{"id": 1, "subtasks": [{"id": 9}, {"id": 10}]}, {"id": 2}]},
+            {"tasks": [{"id": 1, "subtasks": [{}, {"id": 10}]}, {"id": 2}]},
+            {"tasks": [{"task": "No id first", "id": 1}]},
+        ]
+        for data in nested:
+            with open(path, 'w') as f:
+                json.dump(data, f)
+            with open(path, 'rb') as f:
+                assert lazy_tasks.load_lazy(f) is None
+            tm = TodoManager(path, lazy=True)
+            assert tm.get_all_tasks() == data["tasks"] and tm.get_next_id() == data["tasks"][-1]["id"] + 1
+
+
+if __name__ == "__main__":
+    test_journal_replays_and_compacts()
+    test_batch_writes_once_and_rolls_back()
+    test_group_commit_shares_writes_between_threads()
+    test_failed_save_leaves_file_intact()
+    test_serializers_round_trip_and_are_detected()
+    test_lazy_load_decodes_tasks_on_demand()
+    test_lazy_load_falls_back_for_nested_objects()
+    print("All tests passed!")
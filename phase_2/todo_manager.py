@@ -1,33 +1,272 @@
-import json
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from group_commit import GroupCommit
+from lazy_tasks import LazyTaskList, checkpoint_tasks, load_lazy, max_task_id, rollback_tasks, task_position
+from serializers import SERIALIZERS, detect, get_serializer
+from task_journal import TaskJournal
+
+# When writes are fsynced: every write, once per batch, group commit or compaction, or never
+DURABILITY_POLICIES = ["always", "batched", "never"]
 
 
 class TodoManager:
-    def __init__(self, file_path='todo.json'):
+    def __init__(self, file_path='todo.json', journal=False, compact_every=1000, compact_bytes=1024 * 1024,
+                 group_commit_ms=None, durability="batched", serializer=None, lazy=False):
+        """With journal=True, mutations are appended to <file_path>.journal instead of
+        rewriting the JSON file, which is brought up to date by compact() once the
+        journal holds compact_every operations or compact_bytes bytes, and on close().
+        
+        With group_commit_ms, writes from concurrent callers are gathered for that
+        many milliseconds and done together with one fsync; each call returns once
+        its change is on disk.
+        
+        durability is one of DURABILITY_POLICIES. Every write replaces the file
+        atomically, so a crash leaves either the old or the new version; fsync
+        decides whether that version also survives a power loss.
+        
+        serializer names the file format to write (see serializers.py): indented
+        "json", "compact" JSON, or a binary "pickle" or "msgpack" snapshot. The
+        format of an existing file is detected on load, and kept when serializer
+        is None; a pickle file is only loaded with serializer="pickle".
+        
+        With lazy=True a JSON file is indexed rather than decoded on load (see
+        lazy_tasks.py): each task is decoded when first read, and lookups by id
+        decode only that task. The file stays memory-mapped until its first
+        full rewrite, which decodes the rest and unmaps it, or close(); lazy
+        loading pairs well with journal=True.
+        """
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"Durability must be one of: {', '.join(DURABILITY_POLICIES)}")
         self.file_path = file_path
+        self.durability = durability
+        self.serializer = get_serializer(serializer) if serializer else None
+        self.lazy = lazy
+        self.compact_every = compact_every
+        self.compact_bytes = compact_bytes
+        self.journal = TaskJournal(file_path + '.journal') if journal else None
+        self._compaction = None
+        self._compaction_error = None
+        self._lock = threading.RLock()
+        self._batch = None
+        self._group_commit = None
+        if group_commit_ms is not None:
+            self._group_commit = GroupCommit(self._write_group, group_commit_ms / 1000)
         self.data = self.load_data()
+        if self.journal:
+            rotated = self.journal.path + '.compacting'
+            if os.path.exists(rotated):
+                # A compaction was interrupted: finish it with what was just replayed
+                self.save_data(sync=self.durability != "never")
+                os.remove(rotated)
+            self.journal.open()
     
     def load_data(self):
         if os.path.exists(self.file_path):
-            with open(self.file_path, 'r') as f:
-                return json.load(f)
+            with open(self.file_path, 'rb') as f:
+                # The format shows in the first bytes
+                # Unpickling can run code, so only a pickle asked for by name is loaded
+                detected = detect(f.read(64), allow_pickle=self.serializer is SERIALIZERS["pickle"])
+                data = None
+                if self.lazy and detected.name in ("json", "compact"):
+                    data = load_lazy(f)
+                if data is None:
+                    f.seek(0)
+                    data = detected.loads(f.read())
+            if self.serializer is None:
+                self.serializer = detected
         else:
             # Create file with default structure
-            default_data = {"tasks": []}
-            self.save_data(default_data)
-            return default_data
+            if self.serializer is None:
+                self.serializer = SERIALIZERS["json"]
+            data = {"tasks": []}
+            self.save_data(data)
+        if self.journal:
+            # Operations logged since the last compaction, oldest first
+            self.journal.replay(data['tasks'], self.journal.path + '.compacting')
+            self.journal.replay(data['tasks'])
+        return data
     
-    def save_data(self, data=None):
+    def save_data(self, data=None, sync=None):
+        """Writes the tasks to a temporary file and renames it over the JSON file.
+        
+        sync forces or skips fsync; by default only the "always" policy syncs.
+        """
         if data is None:
+            self._unmap_tasks()
             data = self.data
-        with open(self.file_path, 'w') as f:
-            json.dump(data, f, indent=4)
+        if sync is None:
+            sync = self.durability == "always"
+        if not isinstance(data['tasks'], list):
+            # Serializers only take real lists, so every lazily loaded task is decoded here
+            data = dict(data, tasks=list(data['tasks']))
+        payload = self.serializer.dumps(data)
+        # Written beside the file and renamed over it, so readers never see half of it
+        tmp_path = self.file_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+                if sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self.file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if sync:
+            sync_directory(os.path.dirname(os.path.abspath(self.file_path)))
+    
+    def _commit(self, operation, batched=False):
+        """Records a mutation already made in memory.
+        
+        Returns the pending group commit to wait on once the lock is released,
+        or None when the change has been written (or joined a batch).
+        """
+        if self._batch is not None:
+            self._batch.append(operation)
+            return None
+        if self._group_commit is not None:
+            return self._group_commit.submit(operation)
+        self._write([operation], batched)
+        return None
+    
+    def _write(self, operations, batched=False):
+        sync = self.durability == "always" or (batched and self.durability == "batched")
+        if self.journal is None:
+            # The whole file is rewritten however many operations there are
+            self.save_data(sync=sync)
+            return
+        self.journal.append(operations[0] if len(operations) == 1 else {'op': 'batch', 'ops': operations}, sync)
+        if self.journal.entries >= self.compact_every or self.journal.size >= self.compact_bytes:
+            self._compact(wait=False)
+    
+    def _write_group(self, operations):
+        with self._lock:
+            self._write(operations, batched=True)
+    
+    @contextmanager
+    def batch(self):
+        """Groups the mutations made in the block into one write when it exits.
+        
+        If the block raises, the tasks are restored to what they were before it
+        and nothing is written. Other threads wait for the batch to finish, and
+        a nested batch joins the outer one.
+        """
+        with self._lock:
+            if self._batch is not None:
+                yield self
+                return
+            saved = checkpoint_tasks(self.data['tasks'])
+            self._batch = []
+            try:
+                yield self
+            except BaseException:
+                # Put back the original task objects and their fields
+                rollback_tasks(self.data['tasks'], saved)
+                raise
+            finally:
+                operations, self._batch = self._batch, None
+            pending = self._commit({'op': 'batch', 'ops': operations}, batched=True) if operations else None
+        if pending:
+            pending.wait()
+    
+    def compact(self, wait=True):
+        """Folds the journal into the JSON file.
+        
+        The journal is swapped for an empty one and a copy of the tasks is
+        written out; with wait=False that write runs on a background thread
+        while new mutations go to the fresh journal. If a background write
+        fails, the next compact(), close() or wait_for_compaction() raises
+        its error, unless a later compaction has succeeded by then.
+        """
+        with self._lock:
+            if self.journal is None:
+                self.save_data()
+                return
+            self.wait_for_compaction()
+            self._compact(wait)
+    
+    def _compact(self, wait):
+        # Mutations compact through here so a failed background write never fails them:
+        # their operations are already in the journal, and the next compaction retries
+        self._join_compaction()
+        if self.journal.entries == 0:
+            return
+        self._unmap_tasks()
+        rotated = self.journal.rotate()
+        snapshot = dict(self.data, tasks=[dict(task) for task in self.data['tasks']])
+        
+        def write():
+            # The old journal is only removed once the tasks it holds are safely in the file
+            self.save_data(snapshot, sync=self.durability != "never")
+            os.remove(rotated)
+        
+        def write_in_background():
+            try:
+                write()
+            except Exception as e:
+                self._compaction_error = e
+            else:
+                # Earlier failed compactions are folded into this one
+                self._compaction_error = None
+        
+        if wait:
+            write()
+            self._compaction_error = None
+        else:
+            self._compaction = threading.Thread(target=write_in_background)
+            self._compaction.start()
+    
+    def _join_compaction(self):
+        if self._compaction is not None:
+            self._compaction.join()
+            self._compaction = None
+    
+    def wait_for_compaction(self):
+        """Waits for a background compaction, raising the error it failed with, if any."""
+        self._join_compaction()
+        error, self._compaction_error = self._compaction_error, None
+        if error is not None:
+            # The rotated journal was kept, so the next compaction still folds it in
+            raise error
+    
+    def _unmap_tasks(self):
+        """Decodes lazily loaded tasks into a plain list and closes the file mapping.
+        
+        Called before the file is rewritten, which Windows refuses while it is
+        mapped. Inside a batch the mapping is kept, as a rollback may need it.
+        """
+        tasks = self.data['tasks']
+        if isinstance(tasks, LazyTaskList) and self._batch is None:
+            self.data['tasks'] = list(tasks)
+            tasks.close()
+    
+    def close(self):
+        """Writes pending group commits, compacts the journal into the JSON file and closes it.
+        
+        A lazily loaded task file is released too: tasks not read by then
+        can no longer be.
+        """
+        if self._group_commit is not None:
+            # Outside the lock, which the last group commit needs
+            self._group_commit.stop()
+        with self._lock:
+            try:
+                if self.journal:
+                    try:
+                        self.compact()
+                    finally:
+                        self.journal.close()
+            finally:
+                if isinstance(self.data['tasks'], LazyTaskList):
+                    self.data['tasks'].close()
     
     def get_next_id(self):
         if not self.data['tasks']:
             return 1
-        return max(task['id'] for task in self.data['tasks']) + 1
+        return max_task_id(self.data['tasks']) + 1
     
     def add_task(self, task_name, category="General", priority="Medium"):
         if not task_name.strip():
@@ -36,58 +275,68 @@ class TodoManager:
         if priority not in ["High", "Medium", "Low"]:
             raise ValueError("Priority must be 'High', 'Medium', or 'Low'")
         
-        new_task = {
-            'id': self.get_next_id(),
-            'task': task_name.strip(),
-            'category': category.strip(),
-            'priority': priority,
-            'status': 'Pending',
-            'created_at': datetime.now().isoformat()
-        }
-        
-        self.data['tasks'].append(new_task)
-        self.save_data()
+        with self._lock:
+            new_task = {
+                'id': self.get_next_id(),
+                'task': task_name.strip(),
+                'category': category.strip(),
+                'priority': priority,
+                'status': 'Pending',
+                'created_at': datetime.now().isoformat()
+            }
+            
+            self.data['tasks'].append(new_task)
+            pending = self._commit({'op': 'add', 'task': new_task})
+        if pending:
+            pending.wait()
         return new_task
     
     def get_all_tasks(self):
         return self.data['tasks']
     
     def update_task(self, task_id, new_task_name=None, new_status=None):
-        task = self.find_task_by_id(task_id)
-        if not task:
-            raise ValueError(f"No task found with ID {task_id}")
-        
-        if new_task_name is not None:
-            task['task'] = new_task_name.strip()
-        
-        if new_status is not None:
-            if new_status not in ['Completed', 'Pending']:
-                raise ValueError("Status must be 'Completed' or 'Pending'")
-            task['status'] = new_status
-        
-        # Update the timestamp when modifying the task
-        task['updated_at'] = datetime.now().isoformat()
-        
-        self.save_data()
+        with self._lock:
+            task = self.find_task_by_id(task_id)
+            if not task:
+                raise ValueError(f"No task found with ID {task_id}")
+            
+            fields = {}
+            if new_task_name is not None:
+                fields['task'] = new_task_name.strip()
+            
+            if new_status is not None:
+                if new_status not in ['Completed', 'Pending']:
+                    raise ValueError("Status must be 'Completed' or 'Pending'")
+                fields['status'] = new_status
+            
+            # Update the timestamp when modifying the task
+            fields['updated_at'] = datetime.now().isoformat()
+            
+            task.update(fields)
+            pending = self._commit({'op': 'update', 'id': task_id, 'fields': fields})
+        if pending:
+            pending.wait()
         return task
     
     def complete_task(self, task_id):
         return self.update_task(task_id, new_status='Completed')
     
     def delete_task(self, task_id):
-        task = self.find_task_by_id(task_id)
-        if not task:
-            raise ValueError(f"No task found with ID {task_id}")
-        
-        self.data['tasks'].remove(task)
-        self.save_data()
+        with self._lock:
+            index = task_position(self.data['tasks'], task_id)
+            if index is None:
+                raise ValueError(f"No task found with ID {task_id}")
+            
+            task = self.data['tasks'][index]
+            del self.data['tasks'][index]
+            pending = self._commit({'op': 'delete', 'id': task_id})
+        if pending:
+            pending.wait()
         return task
     
     def find_task_by_id(self, task_id):
-        for task in self.data['tasks']:
-            if task['id'] == task_id:
-                return task
-        return None
+        index = task_position(self.data['tasks'], task_id)
+        return None if index is None else self.data['tasks'][index]
     
     def filter_tasks(self, **filters):
         filtered_tasks = self.data['tasks']
@@ -99,4 +348,15 @@ class TodoManager:
                     if task.get(key, '').lower() == value.lower()
                 ]
         
-        return filtered_tasks
\ No newline at end of file
+        return filtered_tasks
+
+
+def sync_directory(directory):
+    """Makes a rename in directory durable (a no-op where directories cannot be opened)."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)